@@ -8,150 +8,52 @@ __version__ = "1.1.0"
 __copyright__ = "The University of Queensland, 2019"
 
 import tkinter as tk
-from tkinter import *
 from tkinter import messagebox
-import random
-from collections import namedtuple
 import os, sys
-import pymunk
-
-from block import Block, ResourceBlock, BREAK_TABLES, LeafBlock, TrickCandleFlameBlock
-from grid import Stack, Grid, SelectableGrid, ItemGridView
-from item import Item, SimpleItem, HandItem, BlockItem, MATERIAL_TOOL_TYPES, TOOL_DURABILITIES
-from player import Player
-from dropped_item import DroppedItem
-from crafting import GridCrafter, CraftingWindow, GridCrafterView
-from world import World
-from core import positions_in_range
-from game import GameView, WorldViewRouter
-from mob import Bird
-from hotbaritem import HotbarItem
-from toolitem import ToolItem
-from craftingtable import CraftingTableBlock
-from fooditem import FoodItem
-from sheep import Sheep, mobRouter
-
-BLOCK_SIZE = 2 ** 5
-GRID_WIDTH = 2 ** 5
-GRID_HEIGHT = 2 ** 4
+import time
+import queue
+import contextlib
 
-gameTitle = 'NineDraft V0.1 Matthew Choy'
-
-# Task 3/Post-grad only:
-# Class to hold game data that is passed to each thing's step function
-# Normally, this class would be defined in a separate file
-# so that type hinting could be used on PhysicalThing & its
-# subclasses, but since it will likely need to be extended
-# for these tasks, we have defined it here
-GameData = namedtuple('GameData', ['world', 'player'])
-
-class Utils():
-    @staticmethod
-    def roundhalf(number):
-        return round(number*2)/2
-        
+from grid_view import ItemGridView
+from crafting import GridCrafter, CraftingWindow
+from game import GameView, mobRouter
+from savefile import save_game, Autosaver
+from simulation import SimulationThread
+from profiler import Profiler
+from content import PHYSICS_TIME_STEP, VIEW_SIZE, CRAFTING_RECIPES, BLOCK_COLOURS, ITEM_COLOURS
+from session import new_session, load_session
 
-def create_block(*block_id):
-    """(Block) Creates a block (this function can be thought of as a block factory)
-
-    Parameters:
-        block_id (*tuple): N-length tuple to uniquely identify the block,
-        often comprised of strings, but not necessarily (arguments are grouped
-        into a single tuple)
-
-    Examples:
-        >>> create_block("leaf")
-        LeafBlock()
-        >>> create_block("stone")
-        ResourceBlock('stone')
-        >>> create_block("mayhem", 1)
-        TrickCandleFlameBlock(1)
-    """
-    if len(block_id) == 1:
-        block_id = block_id[0]
-        if block_id == "leaf":
-            return LeafBlock()
-        elif block_id == "crafting_table":
-            return CraftingTableBlock()
-        elif block_id in BREAK_TABLES:
-            return ResourceBlock(block_id, BREAK_TABLES[block_id])
-        elif block_id == "wool":
-            return ResourceBlock(block_id, BREAK_TABLES["dirt"])
-
-    elif block_id[0] == 'mayhem':
-        return TrickCandleFlameBlock(block_id[1])
-        
+# Target time between frames, in milliseconds
+FRAME_INTERVAL = 15
 
-    raise KeyError(f"No block defined for {block_id}")
+# Whether the world is simulated on its own thread (see simulation.py), ticking every
+# PHYSICS_TIME_STEP seconds regardless of how long frames take to draw
+THREADED_SIMULATION = False
 
+# Default location of the save file
+SAVE_PATH = "ninedraft.sav"
 
-def create_item(*item_id):
-    """(Item) Creates an item (this function can be thought of as a item factory)
+# Once a game has a save file, its changes are saved to it every AUTOSAVE_INTERVAL seconds
+AUTOSAVE_INTERVAL = 30
 
-    Parameters:
-        item_id (*tuple): N-length tuple to uniquely identify the item,
-        often comprised of strings, but not necessarily (arguments are grouped
-        into a single tuple)
+# If not None, the input of each game is recorded, and written to this path on exit, so that the
+# game can be replayed (e.g. python -m session --replay ninedraft_recording.json); a loaded game's
+# save file is copied to this path plus ".sav" when recording starts, since autosaving changes it
+RECORDING_PATH = None
 
-    Examples:
-        >>> create_item("dirt")
-        BlockItem('dirt')
-        >>> create_item("hands")
-        HandItem('hands')
-        >>> create_item("pickaxe", "stone")  # *without* Task 2.1.2 implemented
-        Traceback (most recent call last):
-        ...
-        NotImplementedError: "Tool creation is not yet handled"
-        >>> create_item("pickaxe", "stone")  # *with* Task 2.1.2 implemented
-        ToolItem('stone_pickaxe')
-    """
-    if item_id == "apple":
-        return FoodItem("apple", 2)
-
-    if len(item_id) == 2:
-
-        if item_id[0] in MATERIAL_TOOL_TYPES and item_id[1] in TOOL_DURABILITIES:
-            tool_type, tool_material = item_id
-            durability = TOOL_DURABILITIES[tool_material]
-            return ToolItem(tool_type, tool_material, durability)
-
-    elif len(item_id) == 1:
-
-        item_type = item_id[0]
-        print(f"Item id: {item_id} Item type: {item_type}")
-
-        if item_type == "hands":
-            print(f"creating a hands object with {item_type}")
-            return HandItem("hands")
-
-        elif item_type == "dirt":
-            print(f"creating a dirt object with {item_type}")
-            return BlockItem(item_type)
-
-        # Task 1.4 Basic Items: Create wood & stone here
-        # ...
+# Where the profile of each frame's phases is exported to (File > Export Profile)
+PROFILE_PATH = "ninedraft_profile.csv"
 
-        elif item_type in ["stone", "wood"]:
-            return BlockItem(item_type)
-        
-        elif item_type == "apple":
-            return FoodItem("apple", 2)
+# Key that toggles the overlay of frame rate & phase times
+PROFILE_OVERLAY_KEY = "<F3>"
 
-        elif item_type == "stick":
-            return Item(item_type)
-        
-        elif item_type in ["coal", "torch", "wooden_planks", "coal_block"]:
-            return Item(item_type)   
+gameTitle = 'NineDraft V0.1 Matthew Choy'
 
-        elif item_type == "crafting_table":
-            return BlockItem(item_type)    
+class Utils():
+    @staticmethod
+    def roundhalf(number):
+        return round(number*2)/2
         
-        elif item_type == "wool":
-            return BlockItem(item_type)
-
-
-    raise KeyError(f"No item defined for {item_id}")
-
 
 # Task 1.3: Implement StatusView class here
 # ...
@@ -200,234 +102,47 @@ class StatusView(tk.Frame):
         self._foodtxt['text'] = f"Food {newfood}"
 
 
-
-BLOCK_COLOURS = {
-    'diamond': 'blue',
-    'dirt': '#552015',
-    'stone': 'grey',
-    'wood': '#723f1c',
-    'leaves': 'green',
-    'crafting_table': 'pink',
-    'furnace': 'black',
-    'wool': 'white'
-}
-
-ITEM_COLOURS = {
-    'diamond': 'blue',
-    'dirt': '#552015',
-    'stone': 'grey',
-    'wood': '#723f1c',
-    'apple': '#ff0000',
-    'leaves': 'green',
-    'crafting_table': 'pink',
-    'furnace': 'black',
-    'cooked_apple': 'red4',
-    'wool': 'white'
-}
-
-CRAFTING_RECIPES_2x2 = [
-    (
-        (
-            (None, 'wood'),
-            (None, 'wood')
-        ),
-        Stack(create_item('stick'), 4)
-    ),
-
-    (
-        (
-            ('stick', 'stick'),
-            ('stick', 'stick')
-        ),
-        Stack(create_item('wood'), 2)
-    ),
-
-    (
-        (
-            ('coal', None),
-            ('stick', None),
-        ),
-        Stack(create_item('torch'), 4)
-    ),
-
-    (
-        (
-            ('wood', 'wood'),
-            ('wood', 'wood')
-        ),
-        Stack(create_item("crafting_table"), 1)
-    ),
-
-    (
-        (
-            ('wood', None),
-            (None, None)
-        ),
-        Stack(create_item("wooden_planks"), 3)
-    )
-]
-CRAFTING_RECIPES_3x3 = {
-    (
-        (
-            (None, None, None),
-            (None, 'wood', None),
-            (None, 'wood', None)
-        ),
-        Stack(create_item('stick'), 16)
-    ),
-    (
-        (
-            ('wood', 'wood', 'wood'),
-            (None, 'stick', None),
-            (None, 'stick', None)
-        ),
-        Stack(create_item('pickaxe', 'wood'), 1)
-    ),
-    (
-        (
-            ('wood', 'wood', None),
-            ('wood', 'stick', None),
-            (None, 'stick', None)
-        ),
-        Stack(create_item('axe', 'wood'), 1)
-    ),
-    (
-        (
-            (None, 'wood', None),
-            (None, 'stick', None),
-            (None, 'stick', None)
-        ),
-        Stack(create_item('shovel', 'wood'), 1)
-    ),
-    (
-        (
-            (None, 'stone', None),
-            (None, 'stone', None),
-            (None, 'stick', None)
-        ),
-        Stack(create_item('sword', 'wood'), 1)
-    ),
-    (
-        (
-            ('coal', 'coal', 'coal'),
-            ('coal', 'coal', 'coal'),
-            ('coal', 'coal', 'coal')
-        ),
-        Stack(create_item('coal_block'), 1)
-    )
-
-}
-def load_simple_world(world):
-    """Loads blocks into a world
-
-    Parameters:
-        world (World): The game world to load with blocks
-    """
-    block_weights = [
-        (100, 'dirt'),
-        (30, 'stone'),
-    ]
-
-    cells = {}
-
-    ground = []
-
-    width, height = world.get_grid_size()
-
-    for x in range(width):
-        for y in range(height):
-            if x < 22:
-                if y <= 8:
-                    continue
-            else:
-                if x + y < 30:
-                    continue
-
-            ground.append((x, y))
-
-    weights, blocks = zip(*block_weights)
-    kinds = random.choices(blocks, weights=weights, k=len(ground))
-
-    for cell, block_id in zip(ground, kinds):
-        cells[cell] = create_block(block_id)
-
-    trunks = [(3, 8), (3, 7), (3, 6), (3, 5)]
-
-    for trunk in trunks:
-        cells[trunk] = create_block('wood')
-
-    leaves = [(4, 3), (3, 3), (2, 3), (4, 2), (3, 2), (2, 2), (4, 4), (3, 4), (2, 4)]
-
-    for leaf in leaves:
-        cells[leaf] = create_block('leaf')
-
-    for cell, block in cells.items():
-        # cell -> box
-        i, j = cell
-
-        world.add_block_to_grid(block, i, j)
-
-    world.add_block_to_grid(create_block("mayhem", 0), 14, 8)
-
-    world.add_mob(Bird("friendly_bird", (12, 12)), 400, 100)
-
-    world.add_mob(Sheep("sheep", (35, 15)), 400, 300)
-
 class Ninedraft:
     """High-level app class for Ninedraft, a 2d sandbox game"""
 
-    def __init__(self, master):
+    def __init__(self, master, save_path=None):
         """Constructor
 
         Parameters:
             master (tk.Tk): tkinter root widget
+            save_path (str): The save file to load the game from, or None to start a new game
         """
 
         self._master = master
         self._master.title(gameTitle)
-        self._world = World((GRID_WIDTH, GRID_HEIGHT), BLOCK_SIZE)
-
-        load_simple_world(self._world)
-
-        self._player = Player()
-        self._world.add_player(self._player, 250, 150)
-
-        self._world.add_collision_handler("player", "item", on_begin=self._handle_player_collide_item)
-
-        self._hot_bar = SelectableGrid(rows=1, columns=10)
-        self._hot_bar.select((0, 0))
 
-        starting_hotbar = [
-            Stack(create_item("dirt"), 20),
-            Stack(create_item("apple"), 4),
-            Stack(create_item("crafting_table"), 1)
-        ]
+        # Times the phases of each frame
+        self._profiler = Profiler()
+        self._show_profile = False
 
-        for i, item in enumerate(starting_hotbar):
-            self._hot_bar[0, i] = item
-
-        self._hands = create_item('hands')
+        if save_path is not None and os.path.exists(save_path):
+            self._load_game(save_path)
+        else:
+            self._new_game()
 
-        self.starting_inventory = [
-            ((1, 5), Stack(Item('dirt'), 10)),
-            ((0, 2), Stack(Item('wood'), 10)),
-            ((0, 0), Stack(SimpleItem('coal'), 4)),
-        ]
-        self._inventory = Grid(rows=3, columns=10)
-        for position, stack in self.starting_inventory:
-            self._inventory[position] = stack
+        self._session.set_crafting_handler(lambda craft_type: self._on_ui(lambda: self._trigger_crafting(craft_type)))
 
         self._crafting_window_size = (3,3)
         self._master.bind("e",
                           lambda e: self.run_effect(('crafting', 'basic')))
 
-        self._view = GameView(master, self._world.get_pixel_size(), mobRouter(BLOCK_COLOURS, ITEM_COLOURS))
+        world_size = self._world.get_pixel_size()
+        view_size = tuple(min(view, world) for view, world in zip(VIEW_SIZE, world_size))
+        self._view = GameView(master, view_size, mobRouter(BLOCK_COLOURS, ITEM_COLOURS), world_size=world_size)
         self._view.pack()
 
         self._menu = tk.Menu(master = self._view)
         self._master.config(menu=self._menu)
         self._filemenu = tk.Menu(self._menu, tearoff=0)
         self._filemenu.add_command(label="Restart", command=self.restart)
+        self._filemenu.add_command(label="Save", command=self.save)
+        self._filemenu.add_command(label="Load", command=self.load)
+        self._filemenu.add_command(label="Export Profile", command=self.export_profile)
         self._filemenu.add_command(label="Exit", command=self.exitapp)
         self._menu.add_cascade(label="File", menu=self._filemenu)
         
@@ -436,9 +151,9 @@ class Ninedraft:
 
         # Task 1.2 Mouse Controls: Bind mouse events here
         # ...
-        self._view.bind("<Button-1>", self._left_click)
+        self._view.bind("<Button-1>", self._queued(self._left_click))
           # Note that <Button-2> symbolises middle click.
-        self._view.bind("<Button-3>", self._right_click)
+        self._view.bind("<Button-3>", self._queued(self._right_click))
         self._view.bind("<Motion>", self._mouse_move)
         self._view.bind("<Leave>", self._mouse_leave)
 
@@ -453,14 +168,14 @@ class Ninedraft:
         # Task 1.5 Keyboard Controls: Bind to space bar for jumping here
         # ...
 
-        self._master.bind("<space>", self._jump)
+        self._master.bind("<space>", self._queued(self._jump))
 
-        self._master.bind("a", lambda e: self._move(-1, 0))
-        self._master.bind("<Left>", lambda e: self._move(-1, 0))
-        self._master.bind("d", lambda e: self._move(1, 0))
-        self._master.bind("<Right>", lambda e: self._move(1, 0))
-        self._master.bind("s", lambda e: self._move(0, 1))
-        self._master.bind("<Down>", lambda e: self._move(0, 1))
+        self._master.bind("a", self._queued(lambda e: self._move(-1, 0)))
+        self._master.bind("<Left>", self._queued(lambda e: self._move(-1, 0)))
+        self._master.bind("d", self._queued(lambda e: self._move(1, 0)))
+        self._master.bind("<Right>", self._queued(lambda e: self._move(1, 0)))
+        self._master.bind("s", self._queued(lambda e: self._move(0, 1)))
+        self._master.bind("<Down>", self._queued(lambda e: self._move(0, 1)))
 
         # Task 1.5 Keyboard Controls: Bind numbers to hotbar activation here
         # ...
@@ -474,16 +189,132 @@ class Ninedraft:
 
         self._master.bind("<Escape>", self.exitapp)
         self._master.bind("<r>", self.restart)
+        self._master.bind(PROFILE_OVERLAY_KEY, self.toggle_profile)
 
         self._target_in_range = False
         self._target_position = 0, 0
+        # Position of the mouse within the view, or None if it isn't within the view
+        self._mouse_position = None
 
         self._currently_crafting = False
 
+        # Callbacks to run on the tkinter thread, queued from the simulation thread
+        self._ui_calls = queue.Queue()
+        self._simulation = None
+
         self.redraw()
 
+        if THREADED_SIMULATION:
+            self._simulation = SimulationThread(self._session, PHYSICS_TIME_STEP, after_tick=self._after_tick)
+            self._simulation.start()
+
         self.step()
 
+    def _queued(self, handler):
+        """Returns an event callback that runs 'handler' with the event on the simulation thread
+        (between ticks), or immediately if the world isn't simulated on its own thread"""
+        return lambda event: self._submit(lambda: handler(event))
+
+    def _submit(self, command):
+        """Runs 'command' on the simulation thread (between ticks), or immediately if the world
+        isn't simulated on its own thread"""
+        if self._simulation is None:
+            command()
+        else:
+            self._simulation.submit(command)
+
+    def _on_ui(self, callback):
+        """Runs 'callback' on the tkinter thread, during the next frame if the world is simulated
+        on its own thread, or immediately otherwise"""
+        if self._simulation is None:
+            callback()
+        else:
+            self._ui_calls.put(callback)
+
+    def _world_lock(self):
+        """Returns a context manager to hold while using the world from the tkinter thread"""
+        if self._simulation is None:
+            return contextlib.nullcontext()
+        return self._simulation.lock
+
+    def _after_tick(self):
+        """Called after each tick of the world"""
+        if self._autosaver is not None:
+            self._autosaver.tick()
+
+    def _new_game(self):
+        """Creates a new world, player, hotbar & inventory"""
+        self._save_path = SAVE_PATH
+        self._autosaver = None
+
+        self._use_session(new_session())
+
+    def _load_game(self, save_path):
+        """Loads the world, player, hotbar & inventory from the save file at 'save_path'"""
+        self._use_session(load_session(save_path))
+
+        self._save_path = save_path
+        self._autosaver = None
+        self._start_autosave()
+
+    def _use_session(self, session):
+        """Plays the game 'session'"""
+        if RECORDING_PATH is not None:
+            session.start_recording(save_copy_path=f"{RECORDING_PATH}.sav")
+
+        self._session = session
+        self._world = session.get_world()
+        self._player = session.get_player()
+        self._hot_bar = session.get_hot_bar()
+        self._inventory = session.get_inventory()
+
+        # the world's own phases can only be timed as part of a frame if it's stepped during the frame
+        if not THREADED_SIMULATION:
+            self._world.set_profiler(self._profiler)
+
+    def _start_autosave(self):
+        """(Re)starts autosaving to the game's save file"""
+        if self._autosaver is not None:
+            self._autosaver.close()
+
+        self._autosaver = Autosaver(self._save_path, self._world, self._player, self._hot_bar, self._inventory,
+                                    interval=AUTOSAVE_INTERVAL)
+
+    def save(self, event=None):
+        """Saves the whole game to its save file, and autosaves to it from then on"""
+        with self._world_lock():
+            if self._autosaver is not None:
+                # ensure a pending autosave can't overwrite this save
+                self._autosaver.flush()
+
+            save_game(self._save_path, self._world, self._player, self._hot_bar, self._inventory)
+            self._start_autosave()
+
+        messagebox.showinfo("Game saved", f"Saved the game to {self._save_path}")
+
+    def toggle_profile(self, event=None):
+        """Shows or hides the overlay of frame rate & phase times"""
+        self._show_profile = not self._show_profile
+
+        if not self._show_profile:
+            self._view.hide_overlay()
+
+    def export_profile(self, event=None):
+        """Exports the phase times of recent frames to PROFILE_PATH"""
+        self._profiler.export_csv(PROFILE_PATH)
+        messagebox.showinfo("Profile exported",
+                            f"Exported {self._profiler.get_ticks()} frames to {PROFILE_PATH}")
+
+    def load(self, event=None):
+        """Restarts the game from the save file at SAVE_PATH, if it exists"""
+        if not os.path.exists(SAVE_PATH):
+            messagebox.showinfo("No saved game", f"There is no saved game at {SAVE_PATH}")
+            return
+
+        if messagebox.askokcancel("Load Game", "Do you want to load the saved game?"):
+            python = sys.executable
+            os.execl(python, python, sys.argv[0], SAVE_PATH)
+
     def exitapp(self, event=None):
         """
         Upon execution, open a dialog box and ask the user if they want to quit the app.
@@ -495,6 +326,12 @@ class Ninedraft:
         
         """
         if messagebox.askokcancel("Quit", "Do you want to quit"):
+            if self._simulation is not None:
+                self._simulation.stop()
+            if self._autosaver is not None:
+                self._autosaver.close()
+            if self._session.get_recorder() is not None:
+                self._session.get_recorder().save(RECORDING_PATH)
             self._master.destroy()
         else:
             pass
@@ -516,16 +353,9 @@ class Ninedraft:
     def reset(self):
         """
         A function designed to reset the view window.
-
-        Reset each position in the inventory to that as expected.
         """
         python = sys.executable
-        os.execl(python, python, *sys.argv)
-        #reset the items in the inventory
-        for position, stack in self.starting_inventory:
-            self._inventory[position] = stack
-
-        return
+        os.execl(python, python, sys.argv[0])
 
     
     def hotbar_select(self, key):
@@ -546,48 +376,112 @@ class Ninedraft:
         else:
             hb_slot = key-1
 
-        self._hot_bar.select((0, hb_slot))
-        print(f"Selected hotbar slot {hb_slot} with {key}, containing {self.get_holding()} ") 
+        self._submit(lambda: self._session.perform('select_hotbar_slot', hb_slot))
 
         return
     
     def redraw(self):
-        self._view.delete(tk.ALL)
-
-        # physical things
-        self._view.draw_physical(self._world.get_all_things())
+        if self._simulation is None:
+            self._draw()
+            return
+
+        snapshot = self._simulation.get_snapshot()
+
+        with self._simulation.lock:
+            self._draw(snapshot.player_position)
+
+        # other physical things, as of the latest tick
+        self._simulation.set_viewport(self._get_draw_rect())
+        with self._profiler.phase('draw_physical'):
+            self._view.draw_boxes(snapshot.things)
+
+    def _get_draw_rect(self):
+        """Returns the (left, top, right, bottom) rectangle of the world to draw: the viewport
+        & a cell around it"""
+        margin = self._world.get_cell_expanse()
+        left, top, right, bottom = self._view.get_viewport()
+        return left - margin, top - margin, right + margin, bottom + margin
+
+    def _draw(self, camera_position=None):
+        """Draws the game, centring the camera on 'camera_position' (or the player)
+
+        Dynamic things are only drawn if the world isn't simulated on its own thread"""
+        # camera
+        if camera_position is None:
+            camera_position = self._player.get_position()
+        self._view.look_at(*camera_position)
+
+        if self._mouse_position is not None:
+            # the camera may have moved beneath the mouse
+            self._target_position = self._view.to_world(*self._mouse_position)
+            self.check_target()
+
+        # terrain, within a cell of the viewport
+        left, top, right, bottom = self._get_draw_rect()
+
+        with self._profiler.phase('terrain'):
+            self._view.draw_terrain(self._world.get_chunks_in_rect(left, top, right, bottom),
+                                    self._world.get_cell_expanse(), self._world.get_sample_block)
+
+        # other physical things, drawn over the terrain
+        if self._simulation is None:
+            with self._profiler.phase('draw_physical'):
+                self._view.draw_physical(self._world.get_things_in_rect(left, top, right, bottom,
+                                                                        include_blocks=False))
 
         # target
         target_x, target_y = self._target_position
-        target = self._world.get_block(target_x, target_y)
         cursor_position = self._world.grid_to_xy_centre(*self._world.xy_to_grid(target_x, target_y))
 
         # Task 1.2 Mouse Controls: Show/hide target here
         # ...
 
+        self._view.hide_target()
+
         if self._target_in_range:
             player_position = self._player.get_position()
             self._view.show_target(player_position, cursor_position)
-        elif self._target_in_range:
-            self._view.hide_target()
         
 
         # Task 1.3 StatusView: Update StatusView values here
         # ...
-        self._StatusView.update_food(self._player.get_food())
-        self._StatusView.update_health(self._player.get_health())
+        self._update_status()
 
         # hot bar
-        self._hot_bar_view.render(self._hot_bar.items(), self._hot_bar.get_selected())
+        with self._profiler.phase('hotbar'):
+            self._hot_bar_view.render(self._hot_bar.items(), self._hot_bar.get_selected())
+
+    def _update_status(self):
+        """Updates the status view with the player's food & health"""
+        self._StatusView.update_food(self._player.get_food())
+        self._StatusView.update_health(self._player.get_health())
 
     def step(self):
-        data = GameData(self._world, self._player)
-        self._world.step(data)
-        self.redraw()
+        frame_start = time.perf_counter()
+        profiler = self._profiler
+        profiler.begin_tick()
+
+        if self._simulation is None:
+            with profiler.phase('world'):
+                self._session.step()
+            with profiler.phase('autosave'):
+                self._after_tick()
+        else:
+            while not self._ui_calls.empty():
+                self._ui_calls.get_nowait()()
+
+        with profiler.phase('redraw'):
+            self.redraw()
         try:
-            self._craftingui.redraw()
+            with profiler.phase('crafting'), self._world_lock():
+                self._craftingui.redraw()
         except:
             pass
+
+        profiler.end_tick()
+
+        if self._show_profile:
+            self._view.show_overlay(profiler.get_summary())
         # Task 1.6 File Menu & Dialogs: Handle the player's death if necessary
         # ...
 
@@ -597,294 +491,71 @@ class Ninedraft:
                 self.reset()
             else:
                 self._view.destroy()
-                
-        self._master.after(15, self.step)
+
+        # Schedule the next frame relative to when this one started, so that slow frames
+        # aren't further delayed; the world catches up on any lost time with fixed steps
+        elapsed = int((time.perf_counter() - frame_start) * 1000)
+        self._master.after(max(1, FRAME_INTERVAL - elapsed), self.step)
 
     def _move(self, dx, dy):
-        self.check_target()
-        velocity = self._player.get_velocity()
-        self._player.set_velocity((velocity.x + dx * 80, velocity.y + dy * 80))
+        # the target is rechecked on the tkinter thread as the next frame is drawn
+        self._session.perform('move', dx, dy)
 
     def _jump(self, event):
-        
-        velocity = self._player.get_velocity()
-        # Task 1.2: Update the player's velocity here
-        # ...
-
-        xvel = velocity[0]*0.5
-        yvel = velocity[1]-150
-
-        self._player.set_velocity((xvel, yvel))
-
-    def mine_block(self, block, x, y):
-
-        luck = random.random()
-        active_item, effective_item = self.get_holding()
-
-        was_item_suitable, was_attack_successful = block.mine(effective_item, active_item, luck)
-
-        effective_item.attack(was_attack_successful)
-
-        # food_decrease_factor = -0.2
-        # health_decrease_factor = -0.1
-
-        food_decrease_factor = -1
-        health_decrease_factor = -1
-
-        if block.is_mined():
-            # Task 1.2 Mouse Controls: Reduce the player's food/health appropriately
-
-            if self._player.get_food() > 0:
-                # If the player still has food, decrease the food
-                self._player.change_food(food_decrease_factor)
-            else:
-                # If the player does not have food left, then decrease their health
-                self._player.change_health(health_decrease_factor)
-            # Update the status view bar
-            # self._StatusView.updateSV()
-
-            # Task 1.2 Mouse Controls: Remove the block from the world & get its drops
-            # ...   
-               
-
-            drops = block.get_drops(luck, was_item_suitable)
-            self._world.remove_block(block)
-
-            if not drops:
-                return
-
-            x0, y0 = block.get_position()
-
-            for i, (drop_category, drop_types) in enumerate(drops):
-                print(f'Dropped {drop_category}, {drop_types}')
-
-                if drop_category == "item":
-                    physical = DroppedItem(create_item(*drop_types))
-
-                    # this is so bleh
-                    x = x0 - BLOCK_SIZE // 2 + 5 + (i % 3) * 11 + random.randint(0, 2)
-                    y = y0 - BLOCK_SIZE // 2 + 5 + ((i // 3) % 3) * 11 + random.randint(0, 2)
-
-                    self._world.add_item(physical, x, y)
-                elif drop_category == "block":
-                    self._world.add_block(create_block(*drop_types), x, y)
-                else:
-                    raise KeyError(f"Unknown drop category {drop_category}")
-    
-    def attack_mob(self, mob, x, y):
-        """
-        A function adapted from mine_block used to attack the mob. 
-
-        Parameters:
-            mob: the mob object
-            x: the x position of the cursor
-            y: the y position of the cursor
-        """
-        drops = mob.get_drops()
-
-        x0, y0 = mob.get_position()
-
-        for i, (drop_category, drop_types) in enumerate(drops):
-            print(f'Dropped {drop_category}, {drop_types}')
-
-            if drop_category == "item":
-                physical = DroppedItem(create_item(*drop_types))
-
-                # this is so bleh
-                x = x0 - BLOCK_SIZE // 2 + 5 + (i % 3) * 11 + random.randint(0, 2)
-                y = y0 - BLOCK_SIZE // 2 + 5 + ((i // 3) % 3) * 11 + random.randint(0, 2)
-
-                self._world.add_item(physical, x, y)
-            elif drop_category == "block":
-                self._world.add_block(create_block(*drop_types), x, y)
-            else:
-                raise KeyError(f"Unknown drop category {drop_category}")
-
-    def get_holding(self):
-        active_stack = self._hot_bar.get_selected_value()
-        active_item = active_stack.get_item() if active_stack else self._hands
-
-        effective_item = active_item if active_item.can_attack() else self._hands
-
-        return active_item, effective_item
+        self._session.perform('jump')
 
     def check_target(self):
-        # select target block, if possible
-        active_item, effective_item = self.get_holding()
-
-        pixel_range = active_item.get_attack_range() * self._world.get_cell_expanse()
+        """Selects the target block, if it's in range of the player
 
-        self._target_in_range = positions_in_range(self._player.get_position(),
-                                                   self._target_position,
-                                                   pixel_range)
+        Must only be called from the tkinter thread, which owns the target"""
+        with self._world_lock():
+            self._target_in_range = self._session.is_in_range(*self._target_position)
 
     def _mouse_move(self, event):
-        self._target_position = event.x, event.y
+        self._mouse_position = event.x, event.y
+        self._target_position = self._view.to_world(event.x, event.y)
         self.check_target()
 
     def _mouse_leave(self, event):
         # hide the target if it leaves the screen
+        self._mouse_position = None
         self._target_in_range = False
         self._view.hide_target()
 
     def _left_click(self, event):
-        # Invariant: (event.x, event.y) == self._target_position
+        # Invariant: self._view.to_world(event.x, event.y) == self._target_position
         #  => Due to mouse move setting target position to cursor
-        x, y = self._target_position
-
-        if self._target_in_range:
-            block = self._world.get_block(x, y)
-            if block:
-                self.mine_block(block, x, y)
-            else:
-                target = self._world.get_thing(x, y)
-                if target:
-                    self.attack_mob(target, x, y)
+        self._session.perform('primary_action', *self._target_position)
 
     def _trigger_crafting(self, craft_type):
         print(f"Crafting with {craft_type}")
 
         if craft_type == "basic":
-            crafter = GridCrafter(CRAFTING_RECIPES_2x2)
+            crafter = GridCrafter(CRAFTING_RECIPES)
         else:
-             crafter = GridCrafter(CRAFTING_RECIPES_3x3, rows=3, columns=3)
+             crafter = GridCrafter(CRAFTING_RECIPES, rows=3, columns=3)
         # (self, master, title, hot_bar: Grid, inventory: Grid, crafter: GridCrafter)
 
 
         # Crafting menu is not currently open
-        self._craftingui = CraftingWindow(self._master, "Ninedraft Crafting Menu", self._hot_bar, self._inventory, crafter)
+        # clicks move stacks between the hotbar & inventory, which the simulation thread may be
+        # changing at the same time (e.g. picking up items)
+        self._craftingui = CraftingWindow(self._master, "Ninedraft Crafting Menu", self._hot_bar, self._inventory,
+                                          crafter, lock=self._world_lock)
         self._craftingui.bind("e", lambda e: self._craftingui.destroy())
         # self._currently_crafting = True
 
     def run_effect(self, effect):
-        if len(effect) == 2:
-            if effect[0] == "crafting":
-                craft_type = effect[1]
-
-                if craft_type == "basic":
-                    print("Can't craft much on a 2x2 grid :/")
-
-                elif craft_type == "crafting_table":
-                    print("Let's get our kraft® on! King of the brands")
-
-                self._trigger_crafting(craft_type)
-                return
-            elif effect[0] in ("food", "health"):
-                print(f"Effect: {effect}, Effect[0]: {effect[0]}")
-                stat, strength = effect
-                
-
-                if (self._player.get_food() < self._player.get_max_food()):
-                    effect_to_change = "food"
-                else:
-                    effect_to_change = "health"
-                getattr(self._player, f"change_{effect_to_change}")(strength)
-                
-                print(f"Gaining {strength} {effect_to_change}!")
-
-                self._StatusView.update_food(self._player.get_food())
-                self._StatusView.update_health(self._player.get_health())
-                return
-
-        raise KeyError(f"No effect defined for {effect}")
+        self._submit(lambda: self._session.perform('run_effect', effect))
 
     def _right_click(self, event):
-
-        x, y = self._target_position
-        target = self._world.get_thing(x, y)
-
-        if target:
-            # use this thing
-            print(f'using {target}')
-            effect = target.use()
-            print(f'used {target} and got {effect}')
-
-            if effect:
-                self.run_effect(effect)
-
-        else:
-            # place active item
-            # selected = self.get_holding()
-            selected = self._hot_bar.get_selected()
-
-            if not selected:
-                return
-
-            stack = self._hot_bar[selected]
-            drops = stack.get_item().place()
-            print(f"Stack: {stack}, Drops: {drops}, GetItem: {stack.get_item()}")
-
-            stack.subtract(1)
-            if stack.get_quantity() == 0:
-                # remove from hotbar
-                self._hot_bar[selected] = None
-
-            if not drops:
-                return
-
-            # handling multiple drops would be somewhat finicky, so prevent it
-            if len(drops) > 1:
-                raise NotImplementedError("Cannot handle dropping more than 1 thing")
-
-            drop_category, drop_types = drops[0]
-
-            x, y = event.x, event.y
-
-            if drop_category == "block":
-                if not self._target_in_range:
-                    # If trying to place outside range
-                    return None
-                existing_block = self._world.get_block(x, y)
-
-                if not existing_block:
-                    self._world.add_block(create_block(drop_types[0]), x, y)
-                else:
-                    raise NotImplementedError(
-                        "Automatically placing a block nearby if the target cell is full is not yet implemented")
-
-            elif drop_category == "effect":
-                self.run_effect(drop_types)
-
-            else:
-                raise KeyError(f"Unknown drop category {drop_category}")
+        self._session.perform('secondary_action', *self._target_position)
 
     def _activate_item(self, index):
         print(f"Activating {index}")
 
         self._hot_bar.toggle_selection((0, index))
 
-    def _handle_player_collide_item(self, player: Player, dropped_item: DroppedItem, data,
-                                    arbiter: pymunk.Arbiter):
-        """Callback to handle collision between the player and a (dropped) item. If the player has sufficient space in
-        their to pick up the item, the item will be removed from the game world.
-
-        Parameters:
-            player (Player): The player that was involved in the collision
-            dropped_item (DroppedItem): The (dropped) item that the player collided with
-            data (dict): data that was added with this collision handler (see data parameter in
-                         World.add_collision_handler)
-            arbiter (pymunk.Arbiter): Data about a collision
-                                      (see http://www.pymunk.org/en/latest/pymunk.html#pymunk.Arbiter)
-                                      NOTE: you probably won't need this
-        Return:
-             bool: False (always ignore this type of collision)
-                   (more generally, collision callbacks return True iff the collision should be considered valid; i.e.
-                   returning False makes the world ignore the collision)
-        """
-
-        item = dropped_item.get_item()
-
-        if self._hot_bar.add_item(item):
-            print(f"Added 1 {item!r} to the hotbar")
-        elif self._inventory.add_item(item):
-            print(f"Added 1 {item!r} to the inventory")
-        else:
-            print(f"Found 1 {item!r}, but both hotbar & inventory are full")
-            return True
-
-        self._world.remove_item(dropped_item)
-        return False
-
 # Task 1.1 App class: Add a main function to instantiate the GUI here
 # ...
 
@@ -893,9 +564,11 @@ def main():
 
     The starting point of the game loop. Creates the tkinter root/master object, instantiates Ninedraft and starts the main loop.
 
+    If a path is given as the first command line argument, the game is loaded from that save file.
+
     """
     root = tk.Tk()
-    Ninedraft(root)
+    Ninedraft(root, sys.argv[1] if len(sys.argv) > 1 else None)
     root.mainloop()
 
 if __name__ == "__main__":
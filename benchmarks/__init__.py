@@ -0,0 +1,18 @@
+"""
+Benchmarks of Ninedraft's hot paths, for tracking performance regressions between versions
+
+Each benchmark runs against a generated world of a given (columns, rows) size, filled with
+blocks via World.add_block_to_grid, with a number of mobs & dropped items around the player
+(see fixtures.py). Benchmarks cover:
+    - stepping the world (World.step)
+    - looking up blocks & things by point (World.get_block & World.get_things)
+    - matching crafting recipes (GridCrafter.find_match)
+    - adding stacks to an inventory (Grid.add_items)
+    - generating terrain & adding it to a world (generator.py & World.add_cells_bulk)
+    - drawing physical things (GameView.draw_physical, on a stub canvas; see stub_view.py)
+    - the memory of each block, stack, dropped item & tool (see memory.py)
+
+Run from the directory containing app.py, writing results as JSON:
+    python -m benchmarks --sizes 32x16 256x64 1024x256 --mobs 50 --items 200 --output results.json
+    python -m benchmarks --compare results.json
+"""
@@ -0,0 +1,126 @@
+"""
+Runs the benchmarks, writing results as JSON (see benchmarks/__init__.py)
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+from benchmarks.fixtures import build_session, parse_size
+from benchmarks.memory import MEMORY_BENCHMARKS
+from benchmarks.suite import BENCHMARKS
+
+# Version of the JSON results format
+RESULTS_VERSION = 1
+
+
+def run(sizes, mobs, items, seed=0, repeat=5, scale=1., only=None):
+    """(list<dict>) Runs the benchmarks against a game of each size, returning their results
+
+    Parameters:
+        sizes (list<tuple<int, int>>): The (columns, rows) size of each world to benchmark
+        mobs (int): The number of mobs in each world
+        items (int): The number of dropped items in each world
+        seed (int): The seed used to generate each world
+        repeat (int): The number of times to repeat each benchmark
+        scale (float): Multiplies the number of calls timed by each benchmark
+        only (set<str>): The names of the benchmarks to run, or None to run all of them
+    """
+    results = []
+
+    for index, size in enumerate(sizes):
+        start = time.perf_counter()
+        session = build_session(size, mobs=mobs, items=items, seed=seed)
+        build_seconds = time.perf_counter() - start
+
+        print(f"{size[0]}x{size[1]} world built in {build_seconds:.2f}s", file=sys.stderr)
+
+        for name, benchmark, number, sized in BENCHMARKS:
+            if only is not None and name not in only:
+                continue
+
+            # benchmarks that don't depend on the world only need to run once
+            if not sized and index > 0:
+                continue
+
+            timings = benchmark(session, max(int(number * scale), 1), repeat)
+
+            result = {'name': name, 'size': f"{size[0]}x{size[1]}" if sized else None}
+            result.update(timings)
+            results.append(result)
+
+            print(f"  {name}: {timings['best_us']:.2f} us ({timings['ops_per_second']:.0f}/s)", file=sys.stderr)
+
+        results.append({'name': 'build_world', 'size': f"{size[0]}x{size[1]}", 'seconds': build_seconds})
+
+    for name, benchmark in MEMORY_BENCHMARKS:
+        if only is not None and name not in only:
+            continue
+
+        result = {'name': name, 'size': None}
+        result.update(benchmark())
+        results.append(result)
+
+        print(f"  {name}: {result['bytes_per_object']:.1f} bytes", file=sys.stderr)
+
+    return results
+
+
+def compare(results, baseline):
+    """Prints how much slower or larger (+), or faster or smaller (-), each result is than the
+    same result in 'baseline'"""
+    previous = {(result['name'], result['size']): result for result in baseline['results']}
+
+    for result in results:
+        old = previous.get((result['name'], result['size']))
+        if old is None:
+            continue
+
+        for key, unit in (('best_us', 'us'), ('bytes_per_object', 'bytes')):
+            if key in result and key in old:
+                change = (result[key] / old[key] - 1) * 100
+                label = result['name'] if result['size'] is None else f"{result['name']} @ {result['size']}"
+                print(f"{label}: {old[key]:.2f} -> {result[key]:.2f} {unit} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks Ninedraft's hot paths")
+    parser.add_argument('--sizes', nargs='+', type=parse_size, default=[(32, 16), (256, 64)],
+                        help="(columns)x(rows) size of each world, e.g. 32x16 1024x256")
+    parser.add_argument('--mobs', type=int, default=20, help="number of mobs in each world")
+    parser.add_argument('--items', type=int, default=50, help="number of dropped items in each world")
+    parser.add_argument('--seed', type=int, default=0, help="seed used to generate each world")
+    parser.add_argument('--repeat', type=int, default=5, help="number of times to repeat each benchmark")
+    parser.add_argument('--scale', type=float, default=1., help="multiplies the number of calls timed")
+    parser.add_argument('--only', nargs='+', choices=[name for name, *_ in BENCHMARKS + MEMORY_BENCHMARKS],
+                        help="only run these benchmarks")
+    parser.add_argument('--output', default="benchmark_results.json", help="JSON file to write the results to")
+    parser.add_argument('--compare', help="JSON results of a previous run to compare against")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.mobs, args.items, seed=args.seed, repeat=args.repeat, scale=args.scale,
+                  only=set(args.only) if args.only else None)
+
+    report = {
+        'version': RESULTS_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': {'mobs': args.mobs, 'items': args.items, 'seed': args.seed, 'repeat': args.repeat,
+                    'scale': args.scale},
+        'results': results,
+    }
+
+    # the results are written to a file, since creating items prints to standard output
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare, encoding='utf-8') as file:
+            compare(results, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
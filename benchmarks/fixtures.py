@@ -0,0 +1,100 @@
+"""
+Generated games to benchmark against
+"""
+
+import random
+from typing import Tuple
+
+from content import BLOCK_SIZE, WORLD_OPTIONS, create_block, create_item
+from dropped_item import DroppedItem
+from grid import Grid, SelectableGrid
+from mob import Bird
+from player import Player
+from session import GameSession
+from sheep import Sheep
+from world import World
+
+# (weight, block id) of the blocks that the ground is made of
+GROUND_BLOCKS = [
+    (100, 'dirt'),
+    (30, 'stone'),
+]
+
+# Ids of the items that are dropped around the player
+DROPPED_ITEMS = ['dirt', 'stone', 'wood', 'apple']
+
+
+def parse_size(text: str) -> Tuple[int, int]:
+    """(tuple<int, int>) Returns the (columns, rows) size written as 'text', e.g. '32x16'
+
+    Raises:
+        ValueError: if 'text' isn't two positive integers separated by an 'x'
+    """
+    try:
+        columns, rows = (int(part) for part in text.lower().split('x'))
+    except ValueError:
+        raise ValueError(f"Expected a size such as 32x16, but got {text!r}")
+
+    if columns < 1 or rows < 1:
+        raise ValueError(f"Expected a positive size, but got {text!r}")
+
+    return columns, rows
+
+
+def build_session(size: Tuple[int, int], mobs: int = 0, items: int = 0, seed: int = 0) -> GameSession:
+    """(GameSession) Returns a game in a generated world of 'size'
+
+    The bottom half of the world is ground, added block by block via World.add_block_to_grid.
+    The player stands in the middle of the ground, with the mobs & dropped items scattered
+    in the air within the player's active chunks (see WORLD_OPTIONS), so that all of them are
+    stepped.
+
+    Parameters:
+        size (tuple<int, int>): The (columns, rows) size of the world's grid
+        mobs (int): The number of mobs to add, alternating between birds & sheep
+        items (int): The number of dropped items to add
+        seed (int): The seed used to generate the world, & of the game's random number generator
+    """
+    rng = random.Random(seed)
+
+    columns, rows = size
+    world = World(size, BLOCK_SIZE, block_factory=create_block, **WORLD_OPTIONS)
+
+    ground_row = rows // 2
+    weights, block_ids = zip(*GROUND_BLOCKS)
+
+    for column in range(columns):
+        kinds = rng.choices(block_ids, weights=weights, k=rows - ground_row)
+        for row, block_id in zip(range(ground_row, rows), kinds):
+            world.add_block_to_grid(create_block(block_id), column, row)
+
+    width, _ = world.get_pixel_size()
+    ground_y = ground_row * BLOCK_SIZE
+
+    player = Player()
+    player_x = width / 2
+    world.add_player(player, player_x, ground_y - BLOCK_SIZE)
+
+    # scatter things within the chunks that are active around the player
+    reach = (WORLD_OPTIONS.get('active_chunk_radius') or columns) * world.get_chunk_size() * BLOCK_SIZE
+    left = max(player_x - reach, BLOCK_SIZE)
+    right = min(player_x + reach, width - BLOCK_SIZE)
+
+    def random_position():
+        return rng.uniform(left, right), rng.uniform(BLOCK_SIZE, max(ground_y - BLOCK_SIZE, BLOCK_SIZE))
+
+    for i in range(mobs):
+        if i % 2 == 0:
+            mob = Bird("friendly_bird", (12, 12))
+        else:
+            mob = Sheep("sheep", (35, 15))
+        world.add_mob(mob, *random_position())
+
+    for _ in range(items):
+        world.add_item(DroppedItem(create_item(rng.choice(DROPPED_ITEMS))), *random_position())
+
+    hot_bar = SelectableGrid(rows=1, columns=10)
+    hot_bar.select((0, 0))
+    inventory = Grid(rows=3, columns=10)
+
+    return GameSession(world, player, hot_bar, inventory, seed, rng=rng)
@@ -0,0 +1,125 @@
+"""
+Memory used by each instance of Ninedraft's most numerous model objects
+"""
+
+import gc
+import tracemalloc
+from typing import Callable
+
+import numpy as np
+
+from content import BLOCK_SIZE, REGISTRY, create_block, create_item
+from block import ResourceBlock
+from chunk import PALETTE_DTYPE
+from dropped_item import DroppedItem
+from grid import Stack
+from world import World
+
+# Number of objects allocated to measure the memory of each
+MEMORY_OBJECTS = 10000
+
+# (columns, rows) size of the world, filled with blocks, used to measure the memory of each cell
+MEMORY_WORLD_SIZE = (64, 64)
+
+
+def measure_memory(create: Callable[[], object], number: int = MEMORY_OBJECTS) -> dict:
+    """(dict) Returns the memory allocated per object by 'create'
+
+    Parameters:
+        create (callable): Creates a new object, called with no arguments
+        number (int): The number of objects to create (& keep alive) at once
+
+    Return:
+        dict: With keys:
+                  'number': as given
+                  'bytes_per_object': the memory allocated (& not freed) per object, in bytes
+    """
+    # warms up anything allocated only once, such as caches & free lists
+    create()
+
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        objects = [create() for _ in range(number)]
+
+        # frees temporary objects kept in free lists, which aren't part of the objects' memory
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # excludes the list holding the objects
+    list_size = objects.__sizeof__()
+
+    return {
+        'number': number,
+        'bytes_per_object': (after - before - list_size) / number,
+    }
+
+
+def memory_block() -> dict:
+    """(dict) Returns the memory of each resource block, excluding its physics shape"""
+    break_table = REGISTRY.blocks['stone']['break_table']
+    return measure_memory(lambda: ResourceBlock('stone', break_table))
+
+
+def memory_stack() -> dict:
+    """(dict) Returns the memory of each stack of a (shared) item"""
+    item = create_item('dirt')
+    return measure_memory(lambda: Stack(item, 1))
+
+
+def memory_dropped_item() -> dict:
+    """(dict) Returns the memory of each dropped item, excluding its physics shape"""
+    item = create_item('dirt')
+    return measure_memory(lambda: DroppedItem(item))
+
+
+def memory_tool() -> dict:
+    """(dict) Returns the memory of each tool, which unlike other items, has its own state"""
+    return measure_memory(lambda: create_item('pickaxe', 'wood'))
+
+
+def _memory_cell(compact_blocks: bool) -> dict:
+    """(dict) Returns the memory of each cell of an active world that is full of blocks
+
+    Both kinds of world are given the same cells (see World.add_cells_bulk), so the blocks that
+    each creates & keeps are measured alike. Memory allocated by the physics engine itself (i.e.
+    outside of Python) isn't measured, so blocks with their own shapes cost more than is reported"""
+    columns, rows = MEMORY_WORLD_SIZE
+    cells = np.ones((rows, columns), dtype=PALETTE_DTYPE)
+
+    def create_world():
+        world = World(MEMORY_WORLD_SIZE, BLOCK_SIZE, mesh_blocks=True, block_factory=create_block,
+                      compact_blocks=compact_blocks)
+        world.add_cells_bulk(cells, [None, ('stone',)])
+        return world
+
+    result = measure_memory(create_world, number=1)
+
+    result['cells'] = cells.size
+    result['bytes_per_object'] /= cells.size
+    return result
+
+
+def memory_cell() -> dict:
+    """(dict) Returns the memory of each cell of a world that holds a block per cell"""
+    return _memory_cell(False)
+
+
+def memory_cell_compact() -> dict:
+    """(dict) Returns the memory of each cell of a world with compact blocks (see World)"""
+    return _memory_cell(True)
+
+
+# (name, benchmark) for each memory benchmark, in the order they run
+MEMORY_BENCHMARKS = [
+    ('memory_block', memory_block),
+    ('memory_stack', memory_stack),
+    ('memory_dropped_item', memory_dropped_item),
+    ('memory_tool', memory_tool),
+    ('memory_cell', memory_cell),
+    ('memory_cell_compact', memory_cell_compact),
+]
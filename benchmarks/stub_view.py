@@ -0,0 +1,44 @@
+"""
+A GameView that draws onto a stub canvas, so that drawing can be benchmarked without a display
+"""
+
+import itertools
+
+from game import GameView
+
+
+class StubGameView(GameView):
+    """A GameView whose canvas only counts the items it would draw
+
+    Only the canvas methods used to draw physical things are stubbed (see GameView.draw_physical
+    & WorldViewRouter), so the cost measured is that of the view's own bookkeeping & routing.
+    """
+
+    def __init__(self, physical_view_router):
+        """Constructor
+
+        Parameters:
+            physical_view_router (WorldViewRouter): The router used to draw physical things
+
+        Note: deliberately doesn't call GameView.__init__, which would create a tkinter canvas
+        """
+        self._world_view_router = physical_view_router
+        self._drawn = {}
+
+        self._ids = itertools.count(1)
+        self.created = self.moved = self.deleted = 0
+
+    def _create(self, *args, **kwargs):
+        self.created += 1
+        return next(self._ids)
+
+    create_rectangle = create_oval = create_polygon = create_line = _create
+
+    def move(self, item, dx, dy):
+        self.moved += 1
+
+    def delete(self, *items):
+        self.deleted += len(items)
+
+    def tag_lower(self, item, below=None):
+        pass
@@ -0,0 +1,190 @@
+"""
+The benchmarks of Ninedraft's hot paths
+
+Each benchmark takes a game (see fixtures.build_session) & returns its timings (see
+timing.measure), with any extra details of what was measured.
+"""
+
+import itertools
+import random
+
+from content import (BLOCK_SIZE, BLOCK_COLOURS, ITEM_COLOURS, VIEW_SIZE, CRAFTING_RECIPES, WORLD_OPTIONS,
+                     create_block, create_item)
+from crafting import GridCrafter
+from game import mobRouter
+from generator import NoiseTerrainGenerator, generate_chunks, generate_world
+from grid import Grid, Stack
+from session import GameSession
+from world import World
+
+from benchmarks.stub_view import StubGameView
+from benchmarks.timing import measure
+
+# Number of random points looked up by the query benchmarks
+QUERY_POINTS = 1000
+
+# (item id, quantity) of each stack added to an empty inventory by the inventory benchmark
+INVENTORY_STACKS = [
+    ('dirt', 20), ('stone', 7), ('wood', 64), ('apple', 3), ('dirt', 50),
+    ('stone', 33), ('stick', 16), ('wood', 1), ('apple', 12), ('dirt', 64),
+]
+
+
+def bench_world_step(session: GameSession, number: int, repeat: int) -> dict:
+    """(dict) Times stepping the game by a single fixed time step (see World.step)"""
+    timings = measure(lambda: session.step(substeps=1), number, repeat)
+    timings['things'] = sum(1 for _ in session.get_world().get_all_things())
+    return timings
+
+
+def _random_points(session: GameSession, seed: int):
+    """Returns an endless cycle of random points within the world"""
+    rng = random.Random(seed)
+    width, height = session.get_world().get_pixel_size()
+    return itertools.cycle([(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(QUERY_POINTS)])
+
+
+def bench_get_block(session: GameSession, number: int, repeat: int) -> dict:
+    """(dict) Times looking up the block on a random point (see World.get_block)"""
+    world = session.get_world()
+    points = _random_points(session, session.get_seed())
+    return measure(lambda: world.get_block(*next(points)), number, repeat)
+
+
+def bench_get_things(session: GameSession, number: int, repeat: int) -> dict:
+    """(dict) Times looking up all things on a random point (see World.get_things)"""
+    world = session.get_world()
+    points = _random_points(session, session.get_seed())
+    return measure(lambda: world.get_things(*next(points)), number, repeat)
+
+
+def bench_find_match(session: GameSession, number: int, repeat: int) -> dict:
+    """(dict) Times matching the pattern of every recipe, & a pattern that matches none
+    (see GridCrafter.find_match)
+
+    Independent of the game, which is only given for consistency with other benchmarks"""
+    patterns = []
+
+    for size in (2, 3):
+        crafter = GridCrafter(CRAFTING_RECIPES, rows=size, columns=size)
+        miss = tuple(tuple('diamond' for _ in range(size)) for _ in range(size))
+
+        for recipe in CRAFTING_RECIPES:
+            pattern = recipe[0]
+            if len(pattern) <= size and len(pattern[0]) <= size:
+                # placed in the bottom-right corner of the grid
+                padding = (None,) * (size - len(pattern[0]))
+                rows = [(None,) * size] * (size - len(pattern)) + [padding + tuple(row) for row in pattern]
+                patterns.append((crafter, tuple(rows)))
+
+        patterns.append((crafter, miss))
+
+    cycle = itertools.cycle(patterns)
+
+    def find_match():
+        crafter, pattern = next(cycle)
+        crafter.find_match(pattern)
+
+    timings = measure(find_match, number, repeat)
+    timings['patterns'] = len(patterns)
+    return timings
+
+
+def bench_add_items(session: GameSession, number: int, repeat: int) -> dict:
+    """(dict) Times filling an empty inventory with stacks of items (see Grid.add_items)
+
+    Independent of the game, which is only given for consistency with other benchmarks"""
+    rows, columns = session.get_inventory().get_size()
+    stacks = [(create_item(item_id), quantity) for item_id, quantity in INVENTORY_STACKS]
+
+    def fill_inventory():
+        inventory = Grid(rows=rows, columns=columns)
+        for item, quantity in stacks:
+            inventory.add_items(Stack(item, quantity))
+
+    timings = measure(fill_inventory, number, repeat)
+    timings['add_items_per_second'] = timings['ops_per_second'] * len(stacks)
+    return timings
+
+
+def _visible_things(session: GameSession) -> list:
+    """Returns the non-block things within a view of VIEW_SIZE, centred on the player"""
+    x, y = session.get_player().get_position()
+    width, height = VIEW_SIZE
+    return list(session.get_world().get_things_in_rect(x - width / 2, y - height / 2, x + width / 2,
+                                                       y + height / 2, include_blocks=False))
+
+
+def bench_draw_physical(session: GameSession, number: int, repeat: int) -> dict:
+    """(dict) Times redrawing the visible things, when none have moved since the last frame
+    (see GameView.draw_physical)"""
+    things = _visible_things(session)
+    view = StubGameView(mobRouter(BLOCK_COLOURS, ITEM_COLOURS))
+    view.draw_physical(things)
+
+    timings = measure(lambda: view.draw_physical(things), number, repeat)
+    timings['things'] = len(things)
+    return timings
+
+
+def bench_draw_physical_cold(session: GameSession, number: int, repeat: int) -> dict:
+    """(dict) Times drawing the visible things onto an empty view (see GameView.draw_physical)"""
+    things = _visible_things(session)
+    router = mobRouter(BLOCK_COLOURS, ITEM_COLOURS)
+
+    timings = measure(lambda: StubGameView(router).draw_physical(things), number, repeat)
+    timings['things'] = len(things)
+    return timings
+
+
+def bench_generate_terrain(session: GameSession, number: int, repeat: int) -> dict:
+    """(dict) Times generating the terrain of a world the size of the game's, & adding it to a new
+    world with compact blocks (see generator.py & World.add_cells_bulk)"""
+    size = session.get_world().get_grid_size()
+    generator = NoiseTerrainGenerator()
+    options = dict(WORLD_OPTIONS, compact_blocks=True)
+
+    def generate():
+        world = World(size, BLOCK_SIZE, block_factory=create_block, **options)
+        generate_world(world, generator, session.get_seed())
+
+    timings = measure(generate, number, repeat)
+    timings['cells'] = size[0] * size[1]
+    return timings
+
+
+def bench_generate_terrain_parallel(session: GameSession, number: int, repeat: int) -> dict:
+    """(dict) Times generating the terrain of a world the size of the game's, a chunk at a time in
+    a pool of worker processes, including starting the pool (see generator.generate_chunks)
+
+    The number of workers actually used is reported, which is 1 if the terrain was generated
+    in-process"""
+    size = session.get_world().get_grid_size()
+    generator = NoiseTerrainGenerator()
+    options = dict(WORLD_OPTIONS, compact_blocks=True)
+    workers = []
+
+    def generate():
+        world = World(size, BLOCK_SIZE, block_factory=create_block, **options)
+        workers.append(generate_chunks(world, generator, session.get_seed()))
+
+    timings = measure(generate, number, repeat)
+    timings['cells'] = size[0] * size[1]
+    timings['workers'] = max(workers)
+    return timings
+
+
+# (name, benchmark, calls per repeat, whether it depends on the world's size) for each benchmark,
+# in the order they run
+BENCHMARKS = [
+    ('get_block', bench_get_block, 20000, True),
+    ('get_things', bench_get_things, 5000, True),
+    ('draw_physical', bench_draw_physical, 2000, True),
+    ('draw_physical_cold', bench_draw_physical_cold, 500, True),
+    # stepping moves things, so it runs after everything else that uses the world
+    ('world_step', bench_world_step, 60, True),
+    ('generate_terrain', bench_generate_terrain, 2, True),
+    ('generate_terrain_parallel', bench_generate_terrain_parallel, 2, True),
+    ('find_match', bench_find_match, 20000, False),
+    ('add_items', bench_add_items, 5000, False),
+]
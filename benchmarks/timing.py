@@ -0,0 +1,50 @@
+"""
+Timing of benchmarked operations
+"""
+
+import statistics
+import time
+from typing import Callable
+
+
+def measure(operation: Callable[[], None], number: int, repeat: int = 5) -> dict:
+    """(dict) Times 'operation', returning the time taken per call
+
+    The operation is called 'number' times in a row, 'repeat' times over. The best repeat is
+    the least disturbed by anything else running on the machine, so it is used for the rate.
+
+    Parameters:
+        operation (callable): The operation to time, called with no arguments
+        number (int): The number of calls per repeat
+        repeat (int): The number of repeats
+
+    Return:
+        dict: With keys:
+                  'number' & 'repeat': as given
+                  'best_us' & 'median_us': the best & median time per call over all repeats,
+                                           in microseconds
+                  'ops_per_second': the number of calls per second, in the best repeat
+
+    Raises:
+        ValueError: if number or repeat is less than 1
+    """
+    if number < 1 or repeat < 1:
+        raise ValueError(f"Expected at least one call & repeat, but got {number} & {repeat}")
+
+    times = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        times.append((time.perf_counter() - start) / number)
+
+    best = min(times)
+
+    return {
+        'number': number,
+        'repeat': repeat,
+        'best_us': best * 1e6,
+        'median_us': statistics.median(times) * 1e6,
+        'ops_per_second': 1 / best if best > 0 else float('inf'),
+    }
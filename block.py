@@ -9,45 +9,11 @@ __copyright__ = "The University of Queensland, 2019"
 
 from physical_thing import PhysicalThing
 
-# Mappings of block_id to its break table
-# A break table is a mapping of item_ids to (time, correct) pairs, where
-#   - time: higher time increases the difficulty to mine (break) a block
-#           with the item
-#   - correct: is True iff the item is the correct item for breaking the block
-#                (usually this indicates whether the block should drop an item
-#                 form of itself)
-BREAK_TABLES = {
-    "dirt": {
-        "hand": (.75, True),
-        "wood_shovel": (.4, True),
-        "stone_shovel": (.2, True),
-        "iron_shovel": (.15, True),
-        "diamond_shovel": (.1, True),
-        "golden_shovel": (.1, True)
-    },
-
-    "wood": {
-        "hand": (3, True),
-        "wood_axe": (1.5, True),
-        "stone_axe": (.75, True),
-        "iron_axe": (.5, True),
-        "diamond_axe": (.4, True),
-        "golden_axe": (.25, True)
-    },
-
-    "stone": {
-        "hand": (7.5, False),
-        "wood_pickaxe": (1.15, True),
-        "stone_pickaxe": (0.6, True),
-        "iron_pickaxe": (0.4, True),
-        "diamond_pickaxe": (0.3, True),
-        "golden_pickaxe": (0.2, True)
-    }
-}
-
 
 class Block(PhysicalThing):
     """One of the building blocks in the sandbox game"""
+    __slots__ = ('_hitpoints', '_max_hitpoints')
+
     # The unique identifier for this block
     _id = None
 
@@ -74,10 +40,24 @@ class Block(PhysicalThing):
         """(str) Returns the unique id of this block"""
         return self._id
 
+    def get_factory_id(self) -> tuple:
+        """(tuple) Returns the id that recreates this block when passed to a block factory
+
+        E.g. app.create_block(*block.get_factory_id()) creates a new copy of this block"""
+        return self._id,
+
     def get_hitpoints(self) -> float:
         """(float) Returns the block's remaining hitpoints"""
         return self._hitpoints
 
+    def set_hitpoints(self, hitpoints: float):
+        """Sets the block's remaining hitpoints, i.e. when restoring a partially mined block"""
+        self._hitpoints = hitpoints
+
+    def get_max_hitpoints(self) -> float:
+        """(float) Returns the block's maximum hitpoints"""
+        return self._max_hitpoints
+
     def get_position(self):
         """(float, float) Returns the (x, y) position of the block's centre"""
         x, y = self.get_shape().bb.center()
@@ -87,6 +67,12 @@ class Block(PhysicalThing):
         """(bool) Returns True, since blocks are always mineable"""
         return True
 
+    def is_steppable(self):
+        """(bool) Returns False, since blocks are static by default
+
+        A Block subclass that changes over time should override this to return True"""
+        return False
+
     def get_drops(self, luck, correct_item_used):
         """
         Returns the things this block drops
@@ -158,6 +144,8 @@ class Block(PhysicalThing):
 
 class LeafBlock(Block):
     """Swaying in the breeze, perhaps it hides a tasty surprise"""
+    __slots__ = ()
+
     _id = 'leaves'
 
     _break_table = {
@@ -185,6 +173,9 @@ class LeafBlock(Block):
                 print("apple should drop")
                 return [('item', ('apple',))]
 
+    def get_factory_id(self):
+        return 'leaf',
+
     def __repr__(self):
         return f"LeafBlock()"
 
@@ -192,6 +183,8 @@ class LeafBlock(Block):
 class ResourceBlock(Block):
     """A simple block content with a simple life that drops an
     item form itself when mined"""
+    # shadows the class attributes of Block, since each resource block has its own
+    __slots__ = ('_id', '_break_table')
 
     def __init__(self, block_id, break_table):
         """Constructor
@@ -199,7 +192,7 @@ class ResourceBlock(Block):
         Parameters:
             block_id (str): The unique id of this block
             break_table (dict<str, tuple<float, bool>>):
-                    The block's break table; see comment on BREAK_TABLES above
+                    The block's break table; see the comment on break tables in registry.py
         """
         self._id = block_id
         self._break_table = break_table
@@ -229,6 +222,7 @@ class ResourceBlock(Block):
 
 class TrickCandleFlameBlock(Block):
     """Just when you thought you've blown it out, it comes back again"""
+    __slots__ = ('_i',)
 
     _id = "mayhem"
 
@@ -255,6 +249,9 @@ class TrickCandleFlameBlock(Block):
 
     # The following methods have not been commented, and their comments
     # are inherited from Block
+    def get_factory_id(self):
+        return 'mayhem', self._i
+
     def use(self):
         pass
 
@@ -0,0 +1,457 @@
+"""
+Classes to partition the world's grid into square chunks of cells, which can be suspended
+into a compact form while far from the player
+"""
+
+from array import array
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from block import Block
+from core import EffectSubID
+from physical_thing import DynamicThing
+
+# Palette indices are stored as unsigned 16-bit integers
+PALETTE_TYPECODE = 'H'
+PALETTE_DTYPE = np.uint16
+MAX_PALETTE_SIZE = 2 ** 16
+
+# A block factory creates a block from its factory id; e.g. app.create_block
+BlockFactory = Callable[..., Block]
+
+# The compact form of a chunk's cells: a pair of (palette indices, hitpoints of damaged blocks),
+# where both are indexed by row * chunk size + column
+CompactCells = Tuple[array, Dict[int, float]]
+
+# A chunk loader reads the compact form of the chunk at a (column, row) position, in chunks
+ChunkLoader = Callable[[Tuple[int, int]], CompactCells]
+
+
+class BlockPalette:
+    """Assigns a small, unique integer (palette index) to each distinct block factory id
+
+    Index 0 always represents an empty cell"""
+
+    def __init__(self, factory_ids: Iterable[EffectSubID] = ()):
+        """Constructor
+
+        Parameters:
+            factory_ids (iterable<tuple>): Factory ids to assign indices to, in order, after
+                                           the empty cell (see Block.get_factory_id)
+        """
+        self._factory_ids = [None]
+        self._indices = {None: 0}
+
+        for factory_id in factory_ids:
+            self.get_index(factory_id)
+
+    def get_index(self, factory_id: EffectSubID) -> int:
+        """(int) Returns the palette index of 'factory_id', assigning a new one if necessary
+
+        Parameters:
+            factory_id (tuple): The factory id of a block, or None for an empty cell
+
+        Raises:
+            OverflowError: if the palette has no more indices to assign
+        """
+        index = self._indices.get(factory_id)
+
+        if index is None:
+            index = len(self._factory_ids)
+
+            if index >= MAX_PALETTE_SIZE:
+                raise OverflowError(f"Palette is full; cannot assign an index to {factory_id}")
+
+            self._factory_ids.append(factory_id)
+            self._indices[factory_id] = index
+
+        return index
+
+    def get_factory_id(self, index: int) -> EffectSubID:
+        """(tuple) Returns the factory id with palette 'index', or None for an empty cell"""
+        return self._factory_ids[index]
+
+    def __len__(self):
+        """(int) Returns the number of indices in this palette, including the empty cell"""
+        return len(self._factory_ids)
+
+    def __iter__(self):
+        """Yields each factory id in order of palette index, starting with None (empty)"""
+        yield from self._factory_ids
+
+
+class Chunk:
+    """A square region of grid cells
+
+    An active chunk holds a Block (or None) for each of its cells. A suspended chunk holds
+    only the palette index of each cell, the hitpoints of any damaged blocks, and the dynamic
+    things that were within it when it was suspended.
+
+    A compact chunk holds its cells in compact form even while active, as a NumPy array of
+    palette indices. Its blocks only exist once they're materialised (see materialise), and
+    are forgotten, along with their shapes, when it is suspended.
+
+    A chunk created with a loader starts suspended, and only reads its compact form from the
+    loader once it is first needed."""
+
+    def __init__(self, position: Tuple[int, int], size: int, loader: ChunkLoader = None,
+                 compact: bool = False):
+        """Constructor
+
+        Parameters:
+            position (tuple<int, int>): The (column, row) position of this chunk, in chunks
+            size (int): The width/height of this chunk, in cells
+            loader (callable): If not None, reads this chunk's initial compact form on demand
+            compact (bool): If True, this chunk's cells stay in compact form while it's active
+        """
+        self._position = position
+        self._size = size
+
+        self._compact = compact
+        self._active = loader is None
+        self._blocks = None if loader or compact else [None] * (size * size)
+        self._loader = loader
+
+        # Compact form, while suspended or compact
+        self._cells = None
+        self._hitpoints = None
+        self._things = []
+
+        if compact and loader is None:
+            self._cells = np.zeros(size * size, dtype=PALETTE_DTYPE)
+            self._hitpoints = {}
+
+        # Blocks of a compact chunk that have been materialised, by cell index
+        self._materialised = {}
+
+        # Merged collision shapes, if the world meshes its blocks
+        self._shapes = []
+
+        # Incremented whenever the blocks in this chunk change (see get_revision)
+        self._revision = 0
+
+    def get_position(self) -> Tuple[int, int]:
+        """(tuple<int, int>) Returns the (column, row) position of this chunk, in chunks"""
+        return self._position
+
+    def get_size(self) -> int:
+        """(int) Returns the width/height of this chunk, in cells"""
+        return self._size
+
+    def get_origin(self) -> Tuple[int, int]:
+        """(tuple<int, int>) Returns the (column, row) grid position of this chunk's top-left cell"""
+        column, row = self._position
+        return column * self._size, row * self._size
+
+    def get_revision(self) -> int:
+        """(int) Returns this chunk's revision, which increases whenever a cell's block is set, or
+        this chunk is suspended or activated
+
+        Useful for caching anything derived from this chunk's blocks (e.g. rendered terrain)"""
+        return self._revision
+
+    def is_active(self) -> bool:
+        """(bool) Returns True iff this chunk is active (i.e. not suspended)"""
+        return self._active
+
+    def is_loaded(self) -> bool:
+        """(bool) Returns True iff this chunk has read its compact form from its loader, or never
+        had a loader"""
+        return self._loader is None
+
+    def is_compact(self) -> bool:
+        """(bool) Returns True iff this chunk's cells stay in compact form while it's active"""
+        return self._compact
+
+    def has_cells(self) -> bool:
+        """(bool) Returns True iff this chunk's cells are in compact form (i.e. it's suspended or
+        compact), so that get_cell, set_cell & cells can be used"""
+        return self._compact or not self._active
+
+    def get_block(self, column: int, row: int) -> Block:
+        """(Block) Returns the block at the local ('column', 'row') position in this chunk, or None
+        if the cell is empty, this chunk is suspended, or the block hasn't been materialised"""
+        if not self._active:
+            return None
+
+        index = row * self._size + column
+
+        if self._compact:
+            return self._materialised.get(index)
+        return self._blocks[index]
+
+    def set_block(self, column: int, row: int, block: Block):
+        """Sets the block at the local ('column', 'row') position in this active chunk
+
+        In a compact chunk, the block is only kept as the cell's materialised block; its cell
+        must be set separately (see set_cell)
+
+        Parameters:
+            block (Block): The block to set, or None to empty the cell
+        """
+        index = row * self._size + column
+
+        if self._compact:
+            if block is None:
+                self._materialised.pop(index, None)
+            else:
+                self._materialised[index] = block
+        else:
+            self._blocks[index] = block
+
+        self._revision += 1
+
+    def _load(self):
+        """Reads this chunk's compact form from its loader, if it hasn't been already"""
+        if self._loader is not None:
+            self._cells, self._hitpoints = self._loader(self._position)
+            self._loader = None
+
+            if self._compact:
+                self._cells = np.array(self._cells, dtype=PALETTE_DTYPE)
+
+    def set_cell(self, column: int, row: int, palette_index: int):
+        """Sets the palette index at the local ('column', 'row') position in this suspended or
+        compact chunk, forgetting any block that was materialised there"""
+        self._load()
+
+        index = row * self._size + column
+        self._cells[index] = palette_index
+        self._hitpoints.pop(index, None)
+        self._materialised.pop(index, None)
+        self._revision += 1
+
+    def get_cell(self, column: int, row: int) -> int:
+        """(int) Returns the palette index at the local ('column', 'row') position in this suspended
+        or compact chunk"""
+        self._load()
+        return int(self._cells[row * self._size + column])
+
+    def get_cells(self) -> np.ndarray:
+        """(np.ndarray) Returns the palette index of every cell of this suspended or compact chunk,
+        as a (rows, columns) array
+
+        The array is a view of this chunk's cells, so it must not be modified"""
+        self._load()
+        return np.asarray(self._cells).reshape(self._size, self._size)
+
+    def write_cells(self, column: int, row: int, cells: np.ndarray):
+        """Copies the occupied cells of 'cells' into this suspended or compact chunk, with the top-left
+        cell at the local ('column', 'row') position, leaving the cells under empty ones unchanged
+
+        The cells written to must be empty
+
+        Parameters:
+            cells (np.ndarray): A (rows, columns) array of palette indices, where 0 is empty
+        """
+        self._load()
+
+        rows, columns = cells.shape
+        region = np.asarray(self._cells).reshape(self._size, self._size)[row:row + rows, column:column + columns]
+
+        occupied = cells != 0
+        region[occupied] = cells[occupied]
+        self._revision += 1
+
+    def cells(self) -> Iterable[Tuple[int, int, int]]:
+        """Yields (column, row, palette index) for each occupied cell of this suspended or compact
+        chunk, with local positions"""
+        self._load()
+
+        cells = np.asarray(self._cells)
+        size = self._size
+
+        for index in np.flatnonzero(cells).tolist():
+            yield index % size, index // size, int(cells[index])
+
+    def get_palette_indices(self) -> List[int]:
+        """(list<int>) Returns each palette index used by an occupied cell of this suspended or
+        compact chunk, in ascending order"""
+        self._load()
+        indices = np.unique(self._cells).tolist()
+        return indices[1:] if indices and indices[0] == 0 else indices
+
+    def materialise(self, column: int, row: int, palette: BlockPalette, block_factory: BlockFactory) -> Block:
+        """Returns the block at the local ('column', 'row') position in this active compact chunk,
+        creating it from its compact form if it hasn't been materialised already
+
+        A newly materialised block has no shape; the caller is responsible for giving it one
+
+        Parameters:
+            palette (BlockPalette): The palette used to decode the cell
+            block_factory (callable): Creates a block from its factory id
+
+        Return:
+            Block: The block, or None if the cell is empty
+        """
+        index = row * self._size + column
+
+        block = self._materialised.get(index)
+        if block is not None:
+            return block
+
+        palette_index = self._cells[index]
+        if not palette_index:
+            return None
+
+        block = self._materialised[index] = block_factory(*palette.get_factory_id(palette_index))
+
+        # the block holds its own hitpoints while materialised (see encode)
+        hitpoints = self._hitpoints.pop(index, None)
+        if hitpoints is not None:
+            block.set_hitpoints(hitpoints)
+
+        return block
+
+    def encode(self, palette: BlockPalette) -> CompactCells:
+        """Returns the compact form of this chunk's cells, whether it is active or suspended
+
+        The compact form of a suspended chunk is returned directly, not copied, unless the
+        chunk is compact
+
+        Parameters:
+            palette (BlockPalette): The palette used to encode blocks
+
+        Return:
+            tuple<array, dict<int, float>>: (palette indices, hitpoints of damaged blocks)
+        """
+        if self._compact:
+            self._load()
+            return array(PALETTE_TYPECODE, self._cells.tobytes()), self._get_compact_hitpoints()
+
+        if self._blocks is None:
+            self._load()
+            return self._cells, self._hitpoints
+
+        cells = array(PALETTE_TYPECODE, bytes(2 * len(self._blocks)))
+        hitpoints = {}
+
+        for index, block in enumerate(self._blocks):
+            if block is None:
+                continue
+
+            cells[index] = palette.get_index(block.get_factory_id())
+
+            if block.get_hitpoints() < block.get_max_hitpoints():
+                hitpoints[index] = block.get_hitpoints()
+
+        return cells, hitpoints
+
+    def _get_compact_hitpoints(self) -> Dict[int, float]:
+        """(dict<int, float>) Returns the hitpoints of the damaged blocks of this compact chunk,
+        including those that have been materialised"""
+        hitpoints = dict(self._hitpoints)
+
+        for index, block in self._materialised.items():
+            if block.get_hitpoints() < block.get_max_hitpoints():
+                hitpoints[index] = block.get_hitpoints()
+
+        return hitpoints
+
+    def blocks(self) -> Iterable[Tuple[int, int, Block]]:
+        """Yields (column, row, block) for each block in this active chunk, with local positions
+
+        Only the materialised blocks of a compact chunk are yielded"""
+        if not self._active:
+            return
+
+        size = self._size
+
+        if self._compact:
+            for index, block in sorted(self._materialised.items(), key=lambda item: item[0]):
+                yield index % size, index // size, block
+            return
+
+        for index, block in enumerate(self._blocks):
+            if block is not None:
+                yield index % size, index // size, block
+
+    def get_shapes(self) -> list:
+        """(list<pymunk.Shape>) Returns the merged collision shapes of this chunk"""
+        return self._shapes
+
+    def set_shapes(self, shapes: list):
+        """Sets the merged collision shapes of this chunk"""
+        self._shapes = shapes
+
+    def get_suspended_things(self) -> List[DynamicThing]:
+        """(list<DynamicThing>) Returns the dynamic things suspended with this chunk"""
+        return self._things
+
+    def suspend(self, palette: BlockPalette, things: Iterable[DynamicThing] = ()):
+        """Suspends this chunk, converting its blocks into compact form
+
+        The caller is responsible for removing this chunk's shapes & 'things' from the world
+
+        Parameters:
+            palette (BlockPalette): The palette used to encode blocks
+            things (iterable<DynamicThing>): Dynamic things to keep with this chunk
+        """
+        if self._compact:
+            self._hitpoints = self._get_compact_hitpoints()
+            self._materialised = {}
+        else:
+            self._cells, self._hitpoints = self.encode(palette)
+
+        self._things = list(things)
+        self._blocks = None
+        self._active = False
+        self._revision += 1
+
+    def activate(self, palette: BlockPalette, block_factory: BlockFactory) -> List[Tuple[int, int, Block]]:
+        """Activates this suspended chunk, recreating its blocks from their compact form
+
+        The caller is responsible for adding the recreated blocks' shapes & this chunk's
+        suspended things back into the world
+
+        Parameters:
+            palette (BlockPalette): The palette used to decode blocks
+            block_factory (callable): Creates a block from its factory id
+
+        Return:
+            list<tuple<int, int, Block>>: (column, row, block) for each recreated block, with local
+                                          positions; always empty for a compact chunk, whose
+                                          blocks are only materialised when they're needed
+        """
+        self._load()
+
+        if self._compact:
+            self._active = True
+            self._revision += 1
+            return []
+
+        size = self._size
+        blocks = [None] * (size * size)
+        created = []
+
+        for index, palette_index in enumerate(self._cells):
+            if not palette_index:
+                continue
+
+            block = block_factory(*palette.get_factory_id(palette_index))
+
+            if index in self._hitpoints:
+                block.set_hitpoints(self._hitpoints[index])
+
+            blocks[index] = block
+            created.append((index % size, index // size, block))
+
+        self._blocks = blocks
+        self._cells = self._hitpoints = None
+        self._active = True
+        self._revision += 1
+
+        return created
+
+    def add_suspended_thing(self, thing: DynamicThing):
+        """Keeps 'thing' with this suspended chunk, until it is next activated"""
+        self._things.append(thing)
+
+    def take_suspended_things(self) -> List[DynamicThing]:
+        """(list<DynamicThing>) Removes & returns the dynamic things suspended with this chunk"""
+        things, self._things = self._things, []
+        return things
+
+    def __repr__(self):
+        return f"Chunk({self._position!r}, {self._size!r})"
@@ -0,0 +1,244 @@
+"""
+The content of Ninedraft: its blocks, items, recipes & starting world
+
+Kept free of any user interface, so that games can be run headlessly (see session.py)
+"""
+
+import functools
+import inspect
+import random
+from collections import namedtuple
+
+from block import ResourceBlock, LeafBlock, TrickCandleFlameBlock
+from generator import NoiseTerrainGenerator, SimpleTerrainGenerator, generate_world
+from grid import Stack
+from item import Item, BlockItem, HandItem, SimpleItem, MATERIAL_TOOL_TYPES, TOOL_DURABILITIES
+from mob import Bird
+from toolitem import ToolItem
+from craftingtable import CraftingTableBlock
+from fooditem import FoodItem
+from registry import load_registry
+from sheep import Sheep
+
+BLOCK_SIZE = 2 ** 5
+GRID_WIDTH = 2 ** 5
+GRID_HEIGHT = 2 ** 4
+
+# Maximum (width, height) of the game view, in pixels; the camera follows the player around larger worlds
+VIEW_SIZE = (800, 480)
+
+# Physics is simulated in fixed steps of PHYSICS_TIME_STEP seconds, independent of the frame rate
+PHYSICS_TIME_STEP = 1 / 60
+# Maximum number of physics steps to catch up on in a single frame
+PHYSICS_MAX_SUBSTEPS = 5
+
+# Whether contiguous blocks are merged into a few large collision shapes (see mesher.py)
+MESH_BLOCKS = True
+
+# Width/height of each chunk of a new game's world, in cells (see chunk.py)
+CHUNK_SIZE = 16
+
+# Only chunks within this many chunks of the player are active (see chunk.py)
+ACTIVE_CHUNK_RADIUS = 2
+
+# When a new game's world is generated (other than the simple world), the chunks within this many
+# columns of chunks of the player are generated as the game starts, split between a pool of worker
+# processes when there are enough processors (see generator.generate_regions); the rest are only
+# generated once they're first needed (see generator.TerrainLoader)
+SPAWN_CHUNK_RADIUS = 32
+
+# Whether active chunks keep their cells as palette indices, only creating blocks when they're
+# needed (see World); requires MESH_BLOCKS
+COMPACT_BLOCKS = False
+
+# Class to hold game data that is passed to each thing's step function
+#   rng (random.Random): The random number generator used by things as they step, so that a
+#                        seeded game can be reproduced; defaults to the random module itself
+GameData = namedtuple('GameData', ['world', 'player', 'rng'], defaults=(random,))
+
+
+# Definitions of blocks, items & recipes, loaded from the data directory (see registry.py)
+REGISTRY = load_registry()
+
+# Colours of blocks & items, by the id that they report
+BLOCK_COLOURS = REGISTRY.block_colours
+ITEM_COLOURS = REGISTRY.item_colours
+
+# Constructors of each kind of block, given the block id, its definition & any further parts of
+# its factory id
+BLOCK_KINDS = {
+    'resource': lambda block_id, definition: ResourceBlock(block_id, definition['break_table']),
+    'leaf': lambda block_id, definition: LeafBlock(),
+    'crafting_table': lambda block_id, definition: CraftingTableBlock(),
+    'mayhem': lambda block_id, definition, stage: TrickCandleFlameBlock(stage),
+}
+
+# Constructors of each kind of item, given the item id & its definition
+ITEM_KINDS = {
+    'item': lambda item_id, definition: Item(item_id),
+    'simple': lambda item_id, definition: SimpleItem(item_id),
+    'block': lambda item_id, definition: BlockItem(item_id),
+    'hand': lambda item_id, definition: HandItem(item_id),
+    'food': lambda item_id, definition: FoodItem(item_id, definition['strength']),
+}
+
+
+def _compile_block_factories(blocks: dict) -> dict:
+    """(dict<tuple<str, int>, callable>) Returns a factory for each block definition (see
+    registry.Registry), by (block id, number of further parts of its factory id), which is called
+    with those further parts
+
+    Raises:
+        KeyError: if a block is of an unknown kind
+    """
+    factories = {}
+
+    for block_id, definition in blocks.items():
+        if definition['kind'] not in BLOCK_KINDS:
+            raise KeyError(f"Block {block_id!r} is of unknown kind {definition['kind']!r}")
+
+        kind = BLOCK_KINDS[definition['kind']]
+        parts = len(inspect.signature(kind).parameters) - 2
+        factories[block_id, parts] = functools.partial(kind, block_id, definition)
+
+    return factories
+
+
+def _compile_item_factories(items: dict) -> dict:
+    """(dict<tuple, callable>) Returns a factory for each item definition (see registry.Registry)
+    & each tool, by factory id, which is called with no arguments
+
+    Items without state of their own (i.e. all but tools) are immutable, so a single instance
+    of each is shared by every stack & dropped item, rather than creating one per call.
+
+    Raises:
+        KeyError: if an item is of an unknown kind
+    """
+    factories = {}
+
+    for item_id, definition in items.items():
+        if definition['kind'] not in ITEM_KINDS:
+            raise KeyError(f"Item {item_id!r} is of unknown kind {definition['kind']!r}")
+        item = ITEM_KINDS[definition['kind']](item_id, definition)
+        factories[item_id,] = functools.partial(_identity, item)
+
+    for tool_type in MATERIAL_TOOL_TYPES:
+        for tool_material, durability in TOOL_DURABILITIES.items():
+            factories[tool_type, tool_material] = functools.partial(ToolItem, tool_type, tool_material, durability)
+
+    return factories
+
+
+def _identity(value):
+    """Returns 'value'"""
+    return value
+
+
+# Factories of each block & item, by factory id (see create_block & create_item)
+BLOCK_FACTORIES = _compile_block_factories(REGISTRY.blocks)
+ITEM_FACTORIES = _compile_item_factories(REGISTRY.items)
+
+
+def create_block(*block_id):
+    """(Block) Creates a block (this function can be thought of as a block factory)
+
+    Blocks are defined in data/blocks.json (see registry.py), & constructed according to their
+    kind (see BLOCK_KINDS).
+
+    Parameters:
+        block_id (*tuple): N-length tuple to uniquely identify the block,
+        often comprised of strings, but not necessarily (arguments are grouped
+        into a single tuple)
+
+    Examples:
+        >>> create_block("leaf")
+        LeafBlock()
+        >>> create_block("stone")
+        ResourceBlock('stone')
+        >>> create_block("mayhem", 1)
+        TrickCandleFlameBlock(1)
+
+    Raises:
+        KeyError: if no block is defined for 'block_id'
+    """
+    factory = BLOCK_FACTORIES.get((block_id[0], len(block_id) - 1)) if block_id else None
+
+    if factory is None:
+        raise KeyError(f"No block defined for {block_id}")
+
+    return factory(*block_id[1:])
+
+
+def create_item(*item_id):
+    """(Item) Creates an item (this function can be thought of as a item factory)
+
+    Tools are identified by their (type, material), e.g. ("pickaxe", "stone"); all other items
+    are defined in data/items.json (see registry.py), & constructed according to their kind
+    (see ITEM_KINDS). Items other than tools have no state of their own, so the same instance
+    is returned for each call with the same id.
+
+    Parameters:
+        item_id (*tuple): N-length tuple to uniquely identify the item,
+        often comprised of strings, but not necessarily (arguments are grouped
+        into a single tuple)
+
+    Examples:
+        >>> create_item("dirt")
+        BlockItem('dirt')
+        >>> create_item("hands")
+        HandItem('hands')
+        >>> create_item("pickaxe", "stone")
+        ToolItem('pickaxe')
+
+    Raises:
+        KeyError: if no item is defined for 'item_id'
+    """
+    try:
+        factory = ITEM_FACTORIES[item_id]
+    except KeyError:
+        raise KeyError(f"No item defined for {item_id}") from None
+
+    return factory()
+
+
+# Recipes for every crafting grid; each matches wherever it's placed on a grid that it fits on
+# (see recipes.py)
+CRAFTING_RECIPES = [(pattern, Stack(create_item(*result), count), flags)
+                    for pattern, result, count, flags in REGISTRY.recipes]
+
+# Keyword arguments used to create every world
+WORLD_OPTIONS = {
+    'fixed_time_step': PHYSICS_TIME_STEP,
+    'max_substeps': PHYSICS_MAX_SUBSTEPS,
+    'mesh_blocks': MESH_BLOCKS,
+    'active_chunk_radius': ACTIVE_CHUNK_RADIUS,
+    'compact_blocks': COMPACT_BLOCKS,
+}
+
+# Generators of the terrain of new worlds, by name (see generator.py); the simple world, which new
+# games start in by default, is also populated with mobs (see load_simple_world)
+TERRAIN_GENERATORS = {
+    'simple': SimpleTerrainGenerator,
+    'noise': NoiseTerrainGenerator,
+}
+DEFAULT_TERRAIN = 'simple'
+
+# Mob classes that can be restored from a save file, by class name
+MOB_CLASSES = {
+    'Bird': Bird,
+    'Sheep': Sheep,
+}
+
+
+def load_simple_world(world, rng=random):
+    """Loads blocks into a world
+
+    Parameters:
+        world (World): The game world to load with blocks
+        rng (random.Random): The random number generator used to choose blocks
+    """
+    generate_world(world, SimpleTerrainGenerator(), rng.getrandbits(32))
+
+    world.add_mob(Bird("friendly_bird", (12, 12)), 400, 100)
+
+    world.add_mob(Sheep("sheep", (35, 15)), 400, 300)
@@ -7,10 +7,13 @@ __version__ = "1.1.0"
 __date__ = "26/04/2019"
 __copyright__ = "The University of Queensland, 2019"
 
+import contextlib
 import tkinter as tk
 
 from core import TK_MOUSE_EVENTS
-from grid import Grid, SelectableGrid, ItemGridView
+from grid import Grid, SelectableGrid
+from grid_view import ItemGridView
+from recipes import MIRRORED, SHAPELESS, trim_pattern, mirror_pattern, get_ingredients
 from core import get_modifiers
 
 
@@ -18,6 +21,10 @@ class GridCrafter:
     def __init__(self, recipes, rows=2, columns=2):
         """Initialises a row x column grid crafter with certain recipes
 
+        Recipes match wherever their pattern is placed on the grid, since patterns are compared
+        once trimmed of empty rows & columns (see trim_pattern). So the same recipes can be used
+        by crafters of any size; recipes that are too large for this crafter are ignored.
+
         Parameters:
             recipes (list<
                         tuple<
@@ -26,27 +33,56 @@ class GridCrafter:
                                     str
                                 >
                             >,
-                            Stack
+                            Stack,
+                            [set<str>]
                         >
                     >):
-                    A list of pairs of (ingredients & result)
-                    See CRAFTING_RECIPES_2x2, etc. in app.py
+                    A list of pairs of (ingredients & result), each optionally followed by
+                    a collection of flags (MIRRORED and/or SHAPELESS)
+                    See CRAFTING_RECIPES in content.py & recipes.py
             rows (int): The number of rows in the crafting input
             columns (int): The number of rows in the crafting output
+
+        Raises:
+            ValueError: if a recipe has no ingredients, or an unknown flag
         """
         self._input = SelectableGrid(rows=rows, columns=columns)
         self._output = None
         self._selected = None
 
-        # Updated according to https://piazza.com/class/js9u1pw5tfl6f3?cid=1125
-        for recipe, result in recipes:
-            if len(recipe) != rows or len(recipe[0]) != columns:
-                raise ValueError(f"Wrong recipe dimensions; expecting {rows}x{columns} but "
-                                f"got {len(recipe)}x{len(recipe[0])} with {recipe}")
         self._recipes = recipes
 
+        # Recipes by their trimmed pattern & by their sorted ingredients (for shapeless recipes),
+        # computed up front so that matching is a single lookup; where patterns are repeated,
+        # the first recipe takes precedence, as in recipes
+        self._recipe_index = {}
+        self._shapeless_index = {}
+
+        for recipe in recipes:
+            pattern = trim_pattern(recipe[0])
+            flags = set(recipe[2]) if len(recipe) > 2 else set()
+
+            if not pattern:
+                raise ValueError(f"Recipe for {recipe[1]} has no ingredients")
+            if not flags <= {MIRRORED, SHAPELESS}:
+                raise ValueError(f"Unknown recipe flags {flags - {MIRRORED, SHAPELESS}} for {recipe[1]}")
+
+            ingredients = get_ingredients(pattern)
+
+            if SHAPELESS in flags:
+                if len(ingredients) <= rows * columns:
+                    self._shapeless_index.setdefault(ingredients, recipe)
+                continue
+
+            if len(pattern) > rows or len(pattern[0]) > columns:
+                continue
+
+            self._recipe_index.setdefault(pattern, recipe)
+            if MIRRORED in flags:
+                self._recipe_index.setdefault(mirror_pattern(pattern), recipe)
+
     def find_match(self, ingredients):
-        """Finds the first recipe that matches ingredients
+        """Finds the first recipe that matches ingredients, wherever they are placed
 
         Parameters:
             ingredients (tuple<
@@ -67,11 +103,13 @@ class GridCrafter:
             >: The result of crafting with these ingredients, or None
             (Recipes parameter of __init__ is a list of these)
         """
-        for recipe in self._recipes:
-            if ingredients == recipe[0]:
-                return recipe
+        pattern = trim_pattern(ingredients)
 
-        return None
+        recipe = self._recipe_index.get(pattern)
+        if recipe is None and self._shapeless_index:
+            recipe = self._shapeless_index.get(get_ingredients(pattern))
+
+        return recipe
 
     def craft(self):
         """Crafts the input to the output"""
@@ -323,7 +361,7 @@ class CraftingWindow(tk.Toplevel):
     """Tkinter widget to manage a the three relevant widgets for a crafting window:
         crafter, inventory, and hotbar"""
 
-    def __init__(self, master, title, hot_bar: Grid, inventory: Grid, crafter: GridCrafter):
+    def __init__(self, master, title, hot_bar: Grid, inventory: Grid, crafter: GridCrafter, lock=None):
         """Constructor
 
         Parameters:
@@ -332,11 +370,16 @@ class CraftingWindow(tk.Toplevel):
             hotbar (Grid): The hotbar to show at the bottom of the window
             inventory (Grid): The inventory to show above the hotbar, below the crafting widget
             crafter (GridCraft): The crafter that powers the crafting widget
+            lock (callable): Returns a context manager that is held while a click moves stacks,
+                             since the hotbar & inventory may be changed by another thread
+                             (e.g. when the player picks up an item), or None if they aren't
         """
         super().__init__(master)
 
         self.title(title)
 
+        self._lock = lock if lock is not None else contextlib.nullcontext
+
         self._sources = {
             'hot_bar': hot_bar,
             'inventory': inventory,
@@ -366,7 +409,12 @@ class CraftingWindow(tk.Toplevel):
         self._GridCrafter = self._source_views['crafter']
         self._GridCrafterView = self._sources['crafter']
 
-        self._GridCrafter.set_button_method(self._GridCrafterView.craft)
+        self._GridCrafter.set_button_method(self._craft)
+
+    def _craft(self):
+        """Crafts the crafter's current pattern, holding the lock (see __init__)"""
+        with self._lock():
+            self._GridCrafterView.craft()
 
     def _load_crafter_view(self):
         """Loads the appropriate crafter view"""
@@ -488,12 +536,13 @@ class CraftingWindow(tk.Toplevel):
         print(f"Left clicked on {widget_key} @ {key}")
         selection = widget_key, key
 
-        if selection == ('crafter', 'craft'):
-            self._sources['crafter'].craft()
-        else:
-            self.move1(selection, get_modifiers(mouse_event.state))
+        with self._lock():
+            if selection == ('crafter', 'craft'):
+                self._sources['crafter'].craft()
+            else:
+                self.move1(selection, get_modifiers(mouse_event.state))
 
-        self.redraw()
+            self.redraw()
 
     def _handle_right_click(self, widget_key, key, mouse_event):
         """Handles a right click on any cell in any widget
@@ -509,7 +558,7 @@ class CraftingWindow(tk.Toplevel):
 
         if selection == ('crafter', 'craft'):
             return
-        else:
-            self.move2(selection, get_modifiers(mouse_event.state))
 
-        self.redraw()
+        with self._lock():
+            self.move2(selection, get_modifiers(mouse_event.state))
+            self.redraw()
@@ -2,14 +2,14 @@ from block import ResourceBlock
 
 
 class CraftingTableBlock(ResourceBlock):
+    __slots__ = ()
+
     def __init__(self):
 
         break_table = {
             "hand": (.35, False),
         }
-        self._block_id = "crafting_table"
-
-        super().__init__(self._block_id, break_table)
+        super().__init__("crafting_table", break_table)
     
     def use(self):
         return('crafting', 'crafting_table')
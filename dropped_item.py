@@ -9,6 +9,7 @@ __copyright__ = "The University of Queensland, 2019"
 
 class DroppedItem(DynamicThing):
     """A physical representation of an Item"""
+    __slots__ = ('_item',)
 
     def __init__(self, item: Item):
         """Constructor
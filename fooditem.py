@@ -1,10 +1,11 @@
 from item import Item
 
 class FoodItem(Item):
+    __slots__ = ('_strength',)
+
     def __init__(self, item_id:str, strength:float):
         self._strength = strength
-        self._id = item_id
-        super().__init__(id_="apple")
+        super().__init__(id_=item_id)
 
     def get_strength(self) -> float:
         return self._strength
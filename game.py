@@ -8,21 +8,30 @@ __date__ = "26/04/2019"
 __copyright__ = "The University of Queensland, 2019"
 
 import tkinter as tk
-from typing import Iterable
+from collections import namedtuple
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pymunk
 
 from instance_router import InstanceRouter
 from physical_thing import PhysicalThing
 from block import Block, TrickCandleFlameBlock
+from chunk import Chunk
 from dropped_item import DroppedItem
 from player import Player
 from physical_thing import BoundaryWall
-from mob import Mob, Bird
+from mob import Bird
+from sheep import Sheep
+
+# Stands in for a thing's shape, so that the view router draws the thing at a given bounding box
+_BoxedShape = namedtuple('_BoxedShape', ['bb'])
 
 
 class GameView(tk.Canvas):
     """A view class for the sandbox game, with convenience methods to draw various parts of the UI"""
 
-    def __init__(self, master, size, physical_view_router: InstanceRouter):
+    def __init__(self, master, size, physical_view_router: InstanceRouter, world_size=None):
         """Constructor
 
         Parameters:
@@ -32,12 +41,62 @@ class GameView(tk.Canvas):
                     View router that facilitates drawing of physical items through
                     calling route_and_call method with:
                         (physical thing, physical thing's shape, self (canvas))
+            world_size (tuple<int, int>): The (width, height) size of the world, in pixels, which
+                                          the view's camera can scroll over; defaults to 'size'
         """
         width, height = size
         super().__init__(master, width=width, height=height)
 
+        if world_size is None:
+            world_size = size
+
+        # Items are drawn in world coordinates; the camera scrolls the canvas over them
+        self._size = size
+        self._world_size = world_size
+        self.config(scrollregion=(0, 0, *world_size), xscrollincrement=1, yscrollincrement=1)
+        self._camera = 0, 0
+
         self._world_view_router = physical_view_router
 
+        # Canvas items drawn for each physical thing, with the bounding box they were drawn at,
+        # so that things are only redrawn when they move
+        self._drawn: Dict[PhysicalThing, Tuple[List[int], Tuple[float, float, float, float]]] = {}
+
+        # Rasterised terrain for each chunk position, as (chunk, chunk revision, image, canvas item),
+        # so that a chunk is only rasterised again when its blocks change
+        self._terrain: Dict[Tuple[int, int], Tuple[Chunk, int, tk.PhotoImage, int]] = {}
+        # (red, green, blue) bytes of each colour name used for terrain
+        self._rgb = {}
+
+    def look_at(self, x: float, y: float):
+        """Moves the camera so that it is centred on the world position ('x', 'y'), as far as the
+        edges of the world allow"""
+        width, height = self._size
+        world_width, world_height = self._world_size
+
+        left = int(min(max(x - width / 2, 0), max(world_width - width, 0)))
+        top = int(min(max(y - height / 2, 0), max(world_height - height, 0)))
+
+        if (left, top) != self._camera:
+            self._camera = left, top
+            self.xview_moveto(left / world_width)
+            self.yview_moveto(top / world_height)
+
+    def get_viewport(self) -> Tuple[int, int, int, int]:
+        """(tuple<int, int, int, int>) Returns the (left, top, right, bottom) rectangle of the world
+        that is visible, in world coordinates"""
+        left, top = self._camera
+        width, height = self._size
+        return left, top, left + width, top + height
+
+    def to_world(self, x: float, y: float) -> Tuple[float, float]:
+        """(tuple<float, float>) Returns the world position of the view position ('x', 'y'),
+        such as that of a mouse event
+
+        Items are drawn in world coordinates, so the canvas coordinates of the position are its
+        world position; they account for the camera's scrolling & the canvas's border & highlight"""
+        return self.canvasx(x), self.canvasy(y)
+
     def show_target(self, player_position, target_position, cursor_position=None,
                     target_radius=14, target_thickness=2, crosshair_radius=4,
                     target_colour='purple', cursor_bg_colour='grey', cursor_fg_colour='white'):
@@ -97,17 +156,218 @@ class GameView(tk.Canvas):
         """Removes the target & cursor from the screen"""
         self.delete('cursor', 'target')
 
+    def show_overlay(self, lines: Iterable[str], margin=4, fill='white', background='black',
+                     font=('Courier', 9)):
+        """Shows 'lines' of text over the top-left corner of the view, above everything else
+
+        Parameters:
+            lines (iterable<str>): The lines of text to show
+            margin (int): The distance between the text and the corner of the view
+            fill (str): The colour of the text
+            background (str): The colour of the box behind the text
+            font (tuple): The font of the text
+        """
+        left, top = self._camera
+        text = "\n".join(lines)
+
+        texts = self.find_withtag('overlay_text')
+        if texts:
+            self.coords(texts[0], left + margin, top + margin)
+            self.itemconfigure(texts[0], text=text)
+        else:
+            self.create_text(left + margin, top + margin, text=text, anchor=tk.NW, fill=fill, font=font,
+                             tag=('overlay', 'overlay_text'))
+            self.create_rectangle(0, 0, 0, 0, fill=background, outline='', tag=('overlay', 'overlay_box'))
+
+        x1, y1, x2, y2 = self.bbox('overlay_text')
+        self.coords('overlay_box', x1 - margin, y1 - margin, x2 + margin, y2 + margin)
+
+        self.tag_raise('overlay_box')
+        self.tag_raise('overlay_text')
+
+    def hide_overlay(self):
+        """Removes the overlay from the screen"""
+        self.delete('overlay')
+
     def draw_physical(self, things: Iterable[PhysicalThing]):
         """Draws all physical things, according to their draw method (on the view router)
 
+        Canvas items are retained between calls: things that are new are drawn, things that
+        have moved are moved, and things that are no longer given have their items deleted.
+        Things that haven't moved are left untouched.
+
         Parameters:
             things (iterable<PhysicalThing>): The physical things to draw.
         """
-        for thing in things:
-            shape = thing.get_shape()
+        def boxes():
+            for thing in things:
+                bb = thing.get_shape().bb
+                yield thing, (bb.left, bb.top, bb.right, bb.bottom)
+
+        self.draw_boxes(boxes())
+
+    def draw_boxes(self, boxes: Iterable[Tuple[PhysicalThing, Tuple[float, float, float, float]]]):
+        """Draws physical things at given bounding boxes, rather than where their shapes currently are
+
+        Useful for drawing a snapshot of things (see simulation.WorldSnapshot); otherwise,
+        equivalent to draw_physical
+
+        Parameters:
+            boxes (iterable<tuple<PhysicalThing, tuple<float, float, float, float>>>):
+                    (thing, (left, top, right, bottom) bounding box) for each thing to draw
+        """
+        previous = self._drawn
+        self._drawn = drawn = {}
+
+        for thing, box in boxes:
+            entry = previous.pop(thing, None)
+
+            if entry is None:
+                drawn[thing] = self._draw_thing_at(thing, box), box
+                continue
+
+            items, old_box = entry
+
+            if box != old_box:
+                left, top, right, bottom = old_box
+
+                if (box[2] - box[0], box[3] - box[1]) == (right - left, bottom - top):
+                    for item in items:
+                        self.move(item, box[0] - left, box[1] - top)
+                else:
+                    # resized, so redraw from scratch
+                    self.delete(*items)
+                    items = self._draw_thing_at(thing, box)
+
+            drawn[thing] = items, box
+
+        # things that have been removed
+        for items, _ in previous.values():
+            self.delete(*items)
+
+    def _draw_thing_at(self, thing: PhysicalThing, box: Tuple[float, float, float, float]) -> List[int]:
+        """(list<int>) Draws 'thing' via the view router at 'box', rather than at its shape's current
+        bounding box, returning its canvas item ids"""
+        left, top, right, bottom = box
+        return self._draw_thing(thing, _BoxedShape(pymunk.BB(left, bottom, right, top)))
+
+    def draw_terrain(self, chunks: Iterable[Chunk], cell_expanse: int, sample_block=None):
+        """Draws the blocks of each chunk as a single image, beneath all other things
+
+        Images are retained between calls: a chunk is only rasterised again when its revision
+        changes, and the images of chunks that are no longer given are deleted.
+
+        Parameters:
+            chunks (iterable<Chunk>): The active chunks to draw
+            cell_expanse (int): The width/height of each cell, in pixels
+            sample_block (callable): Returns a block with a given palette index, used to colour
+                                     the cells of compact chunks (see World.get_sample_block)
+        """
+        previous = self._terrain
+        self._terrain = terrain = {}
+
+        for chunk in chunks:
+            position = chunk.get_position()
+            revision = chunk.get_revision()
+
+            entry = previous.pop(position, None)
+
+            if entry is not None and entry[0] is chunk and entry[1] == revision:
+                terrain[position] = entry
+                continue
+
+            image = self._rasterise_chunk(chunk, cell_expanse, sample_block)
+
+            if entry is None:
+                column, row = chunk.get_origin()
+                item = self.create_image(column * cell_expanse, row * cell_expanse, image=image,
+                                         anchor=tk.NW, tags='terrain')
+                self.tag_lower(item)
+            else:
+                item = entry[3]
+                self.itemconfig(item, image=image)
 
-            # QUERY: cache these?
-            items = self._world_view_router.route_and_call(thing, shape, self)
+            terrain[position] = chunk, revision, image, item
+
+        # chunks that are no longer visible
+        for _, _, _, item in previous.values():
+            self.delete(item)
+
+    def _get_rgb(self, colour: str) -> Tuple[int, int, int]:
+        """(tuple<int, int, int>) Returns the (red, green, blue) bytes of the named 'colour'"""
+        rgb = self._rgb.get(colour)
+
+        if rgb is None:
+            rgb = self._rgb[colour] = tuple(channel >> 8 for channel in self.winfo_rgb(colour))
+
+        return rgb
+
+    def _rasterise_chunk(self, chunk: Chunk, cell_expanse: int, sample_block=None) -> tk.PhotoImage:
+        """(tk.PhotoImage) Returns an image of the blocks in 'chunk', each outlined in black like
+        a canvas rectangle; empty cells are filled with the background colour
+
+        A compact chunk is coloured by palette index, via 'sample_block' (see draw_terrain), so
+        that none of its blocks need to be materialised"""
+        size = chunk.get_size()
+
+        # colour index of each cell, where 0 is the background
+        colours = [self._get_rgb(self.cget('background'))]
+        colour_indices = {}
+
+        def get_colour_index(block):
+            colour = self._world_view_router.get_block_colour(block)
+            index = colour_indices.get(colour)
+
+            if index is None:
+                index = colour_indices[colour] = len(colours)
+                colours.append(self._get_rgb(colour))
+
+            return index
+
+        if chunk.is_compact():
+            palette_indices = chunk.get_palette_indices()
+
+            lookup = np.zeros(max(palette_indices, default=0) + 1, dtype=np.intp)
+            for palette_index in palette_indices:
+                lookup[palette_index] = get_colour_index(sample_block(palette_index))
+
+            cells = lookup[chunk.get_cells()]
+        else:
+            cells = np.zeros((size, size), dtype=np.intp)
+
+            for column, row, block in chunk.blocks():
+                cells[row, column] = get_colour_index(block)
+
+        cells = cells.repeat(cell_expanse, axis=0).repeat(cell_expanse, axis=1)
+        pixels = np.array(colours, dtype=np.uint8)[cells]
+
+        edge = np.zeros(cell_expanse, dtype=bool)
+        edge[[0, -1]] = True
+        edges = np.tile(edge, size)
+        pixels[(edges[:, np.newaxis] | edges[np.newaxis, :]) & (cells != 0)] = 0
+
+        height, width = cells.shape
+        header = f"P6 {width} {height} 255\n".encode('ascii')
+        return tk.PhotoImage(master=self, data=header + pixels.tobytes(), format='PPM')
+
+    def _draw_thing(self, thing: PhysicalThing, shape) -> List[int]:
+        """(list<int>) Draws 'thing' via the view router, returning its canvas item ids
+
+        Blocks are kept beneath all other things, as if all blocks were drawn first
+        """
+        items = self._world_view_router.route_and_call(thing, shape, self)
+
+        if isinstance(thing, Block):
+            for item in items:
+                self.tag_lower(item)
+
+        return items
+
+    def clear_physical(self):
+        """Removes all drawn physical things from the screen"""
+        for items, _ in self._drawn.values():
+            self.delete(*items)
+        self._drawn = {}
 
 
 class WorldViewRouter(InstanceRouter):
@@ -151,6 +411,12 @@ class WorldViewRouter(InstanceRouter):
     #   instance (PhysicalThing): The physical thing to draw
     #   shape (pymunk.Shape): The physical thing's shape in the world
     #   view (tk.Canvas): The canvas on which to draw the thing
+    def get_block_colour(self, instance: Block) -> str:
+        """(str) Returns the colour of a block, as used when rasterising terrain"""
+        if isinstance(instance, TrickCandleFlameBlock):
+            return instance.colours[instance._i]
+        return self._block_colours[instance.get_id()]
+
     def _draw_block(self, instance, shape, view):
         return [view.create_rectangle(shape.bb.left, shape.bb.top, shape.bb.right, shape.bb.bottom,
                                       fill=self._block_colours[instance.get_id()], tags='block')]
@@ -182,3 +448,21 @@ class WorldViewRouter(InstanceRouter):
     def _draw_undefined(self, instance, shape, view):
         return [view.create_rectangle(shape.bb.left, shape.bb.top, shape.bb.right, shape.bb.bottom,
                                       fill='black', tag='undefined')]
+
+
+class mobRouter(WorldViewRouter):
+    _routing_table = [
+        # (class, method name)
+        (Block, '_draw_block'),
+        (TrickCandleFlameBlock, '_draw_mayhem_block'),
+        (DroppedItem, '_draw_physical_item'),
+        (Player, '_draw_player'),
+        (Bird, '_draw_bird'),
+        (BoundaryWall, '_draw_undefined'),
+        (None.__class__, '_draw_undefined'),
+        (Sheep, '_draw_sheep')
+    ]
+
+    def _draw_sheep(self, instance, shape, view):
+        return [view.create_oval(shape.bb.left, shape.bb.top, shape.bb.right, shape.bb.bottom,
+                                 fill='white', tags=('mob', 'sheep'))]
@@ -0,0 +1,502 @@
+"""
+Generators of the terrain of new worlds
+
+A generator computes a world's blocks as whole arrays of cells (see Terrain), rather than block
+by block, so that they can be added to a world all at once (see World.add_cells_bulk &
+generate_world).
+
+The terrain of a region of a world must be the same as that part of the whole world's terrain,
+so that a world can also be generated a region (e.g. a chunk) at a time, including in parallel
+by a pool of processes (see generate_regions), or only as each chunk is needed (see TerrainLoader).
+"""
+
+import os
+from array import array
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from chunk import PALETTE_DTYPE, PALETTE_TYPECODE, BlockPalette, CompactCells
+
+# The terrain of a region of a world
+#   cells (np.ndarray): (rows, columns) array of indices into factory_ids, where 0 is an empty cell
+#   factory_ids (list<tuple>): The factory id of the block for each index (see Block.get_factory_id),
+#                              starting with None for an empty cell
+Terrain = namedtuple('Terrain', ['cells', 'factory_ids'])
+
+# A region of a world's grid: (column, row, columns, rows), with its top-left cell at (column, row)
+Region = Tuple[int, int, int, int]
+
+# (wavelength, amplitude) of each octave of noise that shapes the surface, where wavelength is in
+# columns & amplitude is a fraction of the world's height
+SURFACE_OCTAVES = ((96, .12), (32, .05), (8, .015))
+
+# Average row of the surface, as a fraction of the world's height
+SURFACE_LEVEL = .5
+
+# Number of cells of dirt beneath the surface, above stone
+DIRT_DEPTH = 4
+
+# (block id, minimum depth, wavelength, threshold) of each ore; ore replaces stone at least
+# minimum depth cells beneath the surface, wherever noise of the given wavelength (in cells)
+# exceeds the threshold (between 0 & 1; higher is rarer)
+ORES = (('coal', 6, 4, .8),)
+
+# Chance that any column has a tree, although trees are never within two columns of each other
+TREE_CHANCE = .1
+
+# Number of cells of wood in the trunk of each tree, beneath three rows of leaves
+TREE_HEIGHT = 4
+
+# Minimum number of cells generated by each worker process (see generate_regions); starting a
+# worker & sending back its terrain costs roughly as much as generating this many cells of noise
+# terrain, so smaller regions are generated faster in-process
+MIN_CELLS_PER_WORKER = 2 ** 15
+
+# Distinguish the random values of each use of noise, so that they're independent
+_SURFACE_CHANNEL = 0
+_TREE_CHANNEL = 100
+_ORE_CHANNEL = 200
+
+
+def _random(seed: int, *coordinates: np.ndarray) -> np.ndarray:
+    """(np.ndarray) Returns a pseudo-random number in [0, 1) for each element of the (broadcast)
+    integer arrays 'coordinates', depending only on 'seed' & the coordinates themselves"""
+    values = np.full(np.broadcast(*coordinates).shape, seed & 0xFFFFFFFFFFFFFFFF, dtype=np.uint64)
+
+    # each coordinate is mixed in by a round of splitmix64
+    for coordinate in coordinates:
+        values ^= np.asarray(coordinate).astype(np.uint64)
+        values += 0x9E3779B97F4A7C15
+        values = (values ^ (values >> 30)) * 0xBF58476D1CE4E5B9
+        values = (values ^ (values >> 27)) * 0x94D049BB133111EB
+        values ^= values >> 31
+
+    return (values >> 11) * 2. ** -53
+
+
+def _smooth(t: np.ndarray) -> np.ndarray:
+    """(np.ndarray) Returns the smoothstep of each 't' in [0, 1], for interpolating smoothly"""
+    return t * t * (3 - 2 * t)
+
+
+def value_noise(seed: int, xs: np.ndarray, wavelength: float, channel: int = 0) -> np.ndarray:
+    """(np.ndarray) Returns smooth noise in [0, 1) at each integer position in 'xs'
+
+    Parameters:
+        seed (int): The seed of the noise
+        xs (np.ndarray): The positions of the noise to return
+        wavelength (float): The distance between the noise's random values, which are
+                            interpolated between
+        channel (int): Distinguishes independent noise with the same seed
+    """
+    position = xs / wavelength
+    lattice = np.floor(position).astype(np.int64)
+    t = _smooth(position - lattice)
+
+    before = _random(seed, lattice, channel)
+    after = _random(seed, lattice + 1, channel)
+
+    return before + (after - before) * t
+
+
+def value_noise_2d(seed: int, xs: np.ndarray, ys: np.ndarray, wavelength: float, channel: int = 0) -> np.ndarray:
+    """(np.ndarray) Returns smooth noise in [0, 1) at each integer (x, y) position, as a
+    (len(ys), len(xs)) array; see value_noise for parameters"""
+    x_position = xs / wavelength
+    y_position = (ys / wavelength)[:, np.newaxis]
+
+    x_lattice = np.floor(x_position).astype(np.int64)
+    y_lattice = np.floor(y_position).astype(np.int64)
+
+    tx = _smooth(x_position - x_lattice)
+    ty = _smooth(y_position - y_lattice)
+
+    top = _random(seed, x_lattice, y_lattice, channel)
+    top = top + (_random(seed, x_lattice + 1, y_lattice, channel) - top) * tx
+
+    bottom = _random(seed, x_lattice, y_lattice + 1, channel)
+    bottom = bottom + (_random(seed, x_lattice + 1, y_lattice + 1, channel) - bottom) * tx
+
+    return top + (bottom - top) * ty
+
+
+class TerrainGenerator:
+    """Generates the terrain of worlds
+
+    Should not be instantiated directly"""
+
+    def generate(self, grid_size: Tuple[int, int], seed: int, region: Region = None) -> Terrain:
+        """(Terrain) Returns the terrain of a region of a world
+
+        The terrain of a region must be the same as that part of the whole world's terrain
+
+        Parameters:
+            grid_size (tuple<int, int>): The (column, row) size of the world's grid
+            seed (int): The seed of the world; the same seed always generates the same terrain
+            region (tuple<int, int, int, int>): The (column, row, columns, rows) region of the
+                                                grid to generate, or None for the whole grid
+        """
+        raise NotImplementedError("A TerrainGenerator subclass must implement a generate method")
+
+
+class NoiseTerrainGenerator(TerrainGenerator):
+    """Generates rolling hills of dirt over stone, with veins of ore & trees, from noise
+
+    Every array of cells is computed at once with NumPy, so generating is fast regardless of
+    the size of the world"""
+
+    # The block of each layer of terrain
+    _DIRT, _STONE, _WOOD, _LEAF = 1, 2, 3, 4
+    _FACTORY_IDS = [None, ('dirt',), ('stone',), ('wood',), ('leaf',)]
+
+    def __init__(self, surface_level: float = SURFACE_LEVEL, octaves=SURFACE_OCTAVES, dirt_depth: int = DIRT_DEPTH,
+                 ores=ORES, tree_chance: float = TREE_CHANCE, tree_height: int = TREE_HEIGHT):
+        """Constructor
+
+        Parameters:
+            surface_level (float): see SURFACE_LEVEL
+            octaves (tuple<tuple<float, float>>): see SURFACE_OCTAVES
+            dirt_depth (int): see DIRT_DEPTH
+            ores (tuple<tuple<str, int, float, float>>): see ORES
+            tree_chance (float): see TREE_CHANCE
+            tree_height (int): see TREE_HEIGHT
+        """
+        self._surface_level = surface_level
+        self._octaves = octaves
+        self._dirt_depth = dirt_depth
+        self._ores = ores
+        self._tree_chance = tree_chance
+        self._tree_height = tree_height
+
+    def get_surface(self, grid_size: Tuple[int, int], seed: int, columns: np.ndarray) -> np.ndarray:
+        """(np.ndarray) Returns the row of the surface (i.e. the top row of the ground) in each
+        column of 'columns'"""
+        _, rows = grid_size
+
+        surface = np.full(columns.shape, self._surface_level * rows)
+        for octave, (wavelength, amplitude) in enumerate(self._octaves):
+            noise = value_noise(seed, columns, wavelength, _SURFACE_CHANNEL + octave)
+            surface += (2 * noise - 1) * amplitude * rows
+
+        return np.clip(np.rint(surface), 0, rows - 1).astype(np.int64)
+
+    def generate(self, grid_size: Tuple[int, int], seed: int, region: Region = None) -> Terrain:
+        column, row, columns, rows = region if region is not None else (0, 0) + tuple(grid_size)
+
+        xs = np.arange(column, column + columns)
+        ys = np.arange(row, row + rows)
+
+        # depth of each cell beneath the surface; negative above it
+        depth = ys[:, np.newaxis] - self.get_surface(grid_size, seed, xs)
+
+        cells = np.zeros((rows, columns), dtype=PALETTE_DTYPE)
+        cells[depth >= 0] = self._DIRT
+        cells[depth >= self._dirt_depth] = self._STONE
+
+        factory_ids = list(self._FACTORY_IDS)
+
+        for index, (block_id, min_depth, wavelength, threshold) in enumerate(self._ores):
+            noise = value_noise_2d(seed, xs, ys, wavelength, _ORE_CHANNEL + index)
+            cells[(depth >= min_depth) & (depth >= self._dirt_depth) & (noise > threshold)] = len(factory_ids)
+            factory_ids.append((block_id,))
+
+        self._grow_trees(grid_size, seed, (column, row, columns, rows), cells)
+
+        return Terrain(cells, factory_ids)
+
+    def _grow_trees(self, grid_size: Tuple[int, int], seed: int, region: Region, cells: np.ndarray):
+        """Adds trees to the empty 'cells' of 'region', including parts of trees that grow from
+        just outside it"""
+        column, row, columns, rows = region
+
+        # each tree's leaves spread a column either side of its trunk, & trees are only
+        # grown where their random value is the least of those within two columns, so that
+        # neighbouring trees never touch
+        padding = 3
+        xs = np.arange(column - padding, column + columns + padding)
+        chances = _random(seed, xs, _TREE_CHANNEL)
+
+        neighbourhood = np.lib.stride_tricks.sliding_window_view(chances, 5).min(axis=1)
+        is_tree = (chances[2:-2] < self._tree_chance) & (chances[2:-2] == neighbourhood)
+
+        trees = xs[2:-2][is_tree]
+        surface = self.get_surface(grid_size, seed, trees)
+
+        # (columns, rows, block) of the parts of every tree, as parallel arrays
+        parts = []
+        for height in range(1, self._tree_height + 1):
+            parts.append((trees, surface - height, self._WOOD))
+
+        for offset in (-1, 0, 1):
+            for height in range(self._tree_height + 1, self._tree_height + 4):
+                parts.append((trees + offset, surface - height, self._LEAF))
+
+        for part_columns, part_rows, block in parts:
+            inside = ((part_columns >= column) & (part_columns < column + columns)
+                      & (part_rows >= row) & (part_rows < row + rows))
+
+            local_rows, local_columns = part_rows[inside] - row, part_columns[inside] - column
+            empty = cells[local_rows, local_columns] == 0
+            cells[local_rows[empty], local_columns[empty]] = block
+
+
+class SimpleTerrainGenerator(TerrainGenerator):
+    """Generates the small, hand-made world that new games start in: a hill of dirt & stone,
+    with a single tree & a trick candle
+
+    Only the mix of dirt & stone depends on the seed"""
+
+    # The block of each part of the terrain
+    _WOOD, _LEAF, _MAYHEM, _DIRT, _STONE = 1, 2, 3, 4, 5
+    _FACTORY_IDS = [None, ('wood',), ('leaf',), ('mayhem', 0), ('dirt',), ('stone',)]
+
+    # (block, (column, row) of each cell) of each fixed part of the terrain
+    _FEATURES = (
+        (_WOOD, ((3, 8), (3, 7), (3, 6), (3, 5))),
+        (_LEAF, ((4, 3), (3, 3), (2, 3), (4, 2), (3, 2), (2, 2), (4, 4), (3, 4), (2, 4))),
+        (_MAYHEM, ((14, 8),)),
+    )
+
+    def __init__(self, dirt_weight: float = 100, stone_weight: float = 30):
+        """Constructor
+
+        Parameters:
+            dirt_weight (float): The relative chance that each cell of the ground is dirt
+            stone_weight (float): The relative chance that each cell of the ground is stone
+        """
+        self._dirt_chance = dirt_weight / (dirt_weight + stone_weight)
+
+    def generate(self, grid_size: Tuple[int, int], seed: int, region: Region = None) -> Terrain:
+        column, row, columns, rows = region if region is not None else (0, 0) + tuple(grid_size)
+
+        xs = np.arange(column, column + columns)
+        ys = np.arange(row, row + rows)[:, np.newaxis]
+
+        # flat to the left, sloping up to the right
+        ground = np.where(xs < 22, ys > 8, xs + ys >= 30)
+        dirt = _random(seed, xs, ys, _SURFACE_CHANNEL) < self._dirt_chance
+
+        cells = np.zeros((rows, columns), dtype=PALETTE_DTYPE)
+        cells[ground] = np.where(dirt, self._DIRT, self._STONE)[ground]
+
+        for block, positions in self._FEATURES:
+            for x, y in positions:
+                if column <= x < column + columns and row <= y < row + rows:
+                    cells[y - row, x - column] = block
+
+        return Terrain(cells, list(self._FACTORY_IDS))
+
+
+def generate_world(world, generator: TerrainGenerator, seed: int) -> Terrain:
+    """(Terrain) Generates the terrain of the whole of 'world' with 'generator', adding its blocks
+    all at once (see World.add_cells_bulk)
+
+    Raises:
+        ValueError: if any cell of the terrain is already occupied by a block
+    """
+    terrain = generator.generate(world.get_grid_size(), seed)
+    world.add_cells_bulk(terrain.cells, terrain.factory_ids)
+    return terrain
+
+
+def _generate_region(generator: TerrainGenerator, grid_size: Tuple[int, int], seed: int,
+                     region: Region) -> Terrain:
+    """(Terrain) Returns the terrain of a region of a world; run by each worker of generate_regions"""
+    return generator.generate(grid_size, seed, region)
+
+
+def get_chunk_regions(grid_size: Tuple[int, int], chunk_size: int,
+                      chunks: Iterable[Tuple[int, int]]) -> List[Region]:
+    """(list<tuple<int, int, int, int>>) Returns the regions of a grid covered by 'chunks', with
+    each run of vertically adjacent chunks merged into a single region, in order of position
+
+    Parameters:
+        grid_size (tuple<int, int>): The (column, row) size of the grid
+        chunk_size (int): The width/height of each chunk, in cells
+        chunks (iterable<tuple<int, int>>): The (column, row) position of each chunk, in chunks
+
+    Raises:
+        ValueError: if any chunk isn't in the grid
+    """
+    columns, rows = grid_size
+
+    regions = []
+    run = None
+
+    for i, j in sorted(set(chunks)):
+        if not (0 <= i * chunk_size < columns and 0 <= j * chunk_size < rows):
+            raise ValueError(f"Chunk {(i, j)} isn't in the world")
+
+        if run is not None and run[0] == i and run[2] == j:
+            run[2] = j + 1
+            continue
+
+        if run is not None:
+            regions.append(run)
+        run = [i, j, j + 1]
+
+    if run is not None:
+        regions.append(run)
+
+    return [(i * chunk_size, start * chunk_size, min(chunk_size, columns - i * chunk_size),
+             min((end - start) * chunk_size, rows - start * chunk_size))
+            for i, start, end in regions]
+
+
+def get_worker_count(regions: List[Region], max_workers: int = None) -> int:
+    """(int) Returns the number of worker processes that generate_regions uses to generate
+    'regions', where 1 means that they're generated in this process
+
+    Parameters:
+        max_workers (int): The maximum number of worker processes, or None for one per processor.
+                           Each worker is given at least MIN_CELLS_PER_WORKER cells
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    cells = sum(columns * rows for _, _, columns, rows in regions)
+    return max(min(max_workers, len(regions), cells // MIN_CELLS_PER_WORKER), 1)
+
+
+def generate_regions(generator: TerrainGenerator, grid_size: Tuple[int, int], seed: int, regions: List[Region],
+                     max_workers: int = None) -> Iterable[Terrain]:
+    """Yields the terrain of each of 'regions' of a world, in order, generating them in a pool of
+    processes
+
+    Each region's terrain depends only on the seed & its position (see TerrainGenerator.generate),
+    so the terrain is the same however the work is divided.
+
+    Like any use of multiprocessing, on platforms that start workers by spawning new interpreters
+    (e.g. Windows & macOS), the calling script's main module must be importable without side effects.
+
+    Parameters:
+        max_workers (int): The maximum number of worker processes (see get_worker_count)
+
+    Yield:
+        Terrain
+    """
+    max_workers = get_worker_count(regions, max_workers)
+
+    if max_workers <= 1:
+        for region in regions:
+            yield _generate_region(generator, grid_size, seed, region)
+        return
+
+    # each worker is sent a few regions at a time, & returns each as an array of palette indices
+    # (see Terrain), which is much cheaper to send back than blocks
+    batch = max(1, len(regions) // (max_workers * 4))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(_generate_region, [generator] * len(regions), [grid_size] * len(regions),
+                                [seed] * len(regions), regions, chunksize=batch)
+
+
+def generate_chunks(world, generator: TerrainGenerator, seed: int, chunks: Iterable[Tuple[int, int]] = None,
+                    max_workers: int = None) -> int:
+    """(int) Generates the terrain of some of the chunks of 'world' in a pool of processes, adding
+    their blocks as each is returned (see generate_regions), & returns the number of worker
+    processes used (see get_worker_count)
+
+    The terrain is the same as that of generate_world. Regions are added in order of position, so
+    the world's palette is too.
+
+    Parameters:
+        chunks (iterable<tuple<int, int>>): The position of each chunk to generate (see
+                                            World.get_chunk), or None for every chunk
+        max_workers (int): The maximum number of worker processes (see generate_regions)
+
+    Raises:
+        ValueError: if any chunk isn't in the world, or any cell of the terrain is already occupied
+                    by a block
+    """
+    if chunks is None:
+        chunks = (chunk.get_position() for chunk in world.get_chunks())
+
+    grid_size = world.get_grid_size()
+    regions = get_chunk_regions(grid_size, world.get_chunk_size(), chunks)
+
+    for region, terrain in zip(regions, generate_regions(generator, grid_size, seed, regions, max_workers)):
+        world.add_cells_bulk(terrain.cells, terrain.factory_ids, region[0], region[1])
+
+    return get_worker_count(regions, max_workers)
+
+
+class TerrainLoader:
+    """Generates the compact form of each chunk of a world when it's first needed (see
+    chunk.ChunkLoader & World), so that a large world needn't be generated all at once
+
+    Chunks that are sure to be needed soon (e.g. around where the player starts) can be generated
+    ahead of time, in parallel (see pregenerate)"""
+
+    def __init__(self, generator: TerrainGenerator, grid_size: Tuple[int, int], chunk_size: int, seed: int,
+                 palette: BlockPalette):
+        """Constructor
+
+        Parameters:
+            generator (TerrainGenerator): Generates the world's terrain
+            grid_size (tuple<int, int>): The (column, row) size of the world's grid
+            chunk_size (int): The width/height of each of the world's chunks, in cells
+            seed (int): The seed of the world
+            palette (BlockPalette): The world's palette, which the loaded cells are indices into
+        """
+        self._generator = generator
+        self._grid_size = grid_size
+        self._chunk_size = chunk_size
+        self._seed = seed
+        self._palette = palette
+
+        # Compact cells of the chunks generated ahead of time, by position, until they're loaded
+        self._generated = {}
+
+    def pregenerate(self, chunks: Iterable[Tuple[int, int]], max_workers: int = None) -> int:
+        """(int) Generates the chunks at each of the positions in 'chunks', in a pool of processes if
+        there are enough of them (see generate_regions), keeping them until they're loaded, & returns
+        the number generated
+
+        Raises:
+            ValueError: if any chunk isn't in the world
+        """
+        regions = get_chunk_regions(self._grid_size, self._chunk_size, chunks)
+        terrains = generate_regions(self._generator, self._grid_size, self._seed, regions, max_workers)
+
+        size = self._chunk_size
+        generated = 0
+
+        for (column, row, _, rows), terrain in zip(regions, terrains):
+            for top in range(0, rows, size):
+                position = column // size, (row + top) // size
+                self._generated[position] = self._encode(terrain, top)
+                generated += 1
+
+        return generated
+
+    def _encode(self, terrain: Terrain, top: int = 0) -> array:
+        """(array) Returns the palette indices of the chunk whose top row is row 'top' of 'terrain',
+        padded with empty cells if the chunk is at the edge of the world"""
+        size = self._chunk_size
+        lookup = np.array([self._palette.get_index(factory_id) for factory_id in terrain.factory_ids],
+                          dtype=PALETTE_DTYPE)
+
+        cells = np.zeros((size, size), dtype=PALETTE_DTYPE)
+        region = terrain.cells[top:top + size]
+        cells[:region.shape[0], :region.shape[1]] = lookup[region]
+
+        return array(PALETTE_TYPECODE, cells.tobytes())
+
+    def __call__(self, position: Tuple[int, int]) -> CompactCells:
+        """(tuple<array, dict<int, float>>) Returns the compact form of the chunk at 'position',
+        generating it if it wasn't generated ahead of time"""
+        cells = self._generated.pop(position, None)
+
+        if cells is None:
+            size = self._chunk_size
+            columns, rows = self._grid_size
+            column, row = position[0] * size, position[1] * size
+
+            region = column, row, min(size, columns - column), min(size, rows - row)
+            cells = self._encode(self._generator.generate(self._grid_size, self._seed, region))
+
+        return cells, {}
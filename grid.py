@@ -1,5 +1,7 @@
 """
-Classes to manage modelling & displaying the hotbar & inventory
+Classes to manage modelling the hotbar & inventory
+
+The view of these models is in grid_view.py, so that this module doesn't depend on tkinter
 """
 
 __author__ = "Benjamin Martin and Paul Haley"
@@ -7,17 +9,18 @@ __version__ = "1.1.0"
 __date__ = "26/04/2019"
 __copyright__ = "The University of Queensland, 2019"
 
-import tkinter as tk
-from typing import Tuple, Generator
+from typing import Dict, List, Tuple, Generator
+import bisect
 import json
 
-from core import TK_MOUSE_EVENTS
 from item import Item
 
 
 class Stack(object):
     """Stacks are used to store Items with a stack quantity. Stacks appear in the inventory (and
     similar) as to combine items of the same size up to a maximum limit defined by the Item"""
+    # Slots, rather than a __dict__, since every cell of every grid may hold a stack
+    __slots__ = ('_item', '_quantity')
 
     def __init__(self, item: Item, quantity: int):
         """Constructor of Stack
@@ -141,172 +144,9 @@ class Stack(object):
         return "Stack(" + self._item.get_id() + ", " + str(self._quantity) + ")"
 
 
-class ItemGridView(tk.Canvas):
-    """Class defining constants and draw methods for rendering item orientated views. The methods
-    in in this class allow for a grid view of items to be easily drawn and be added to the master
-    view given.
-
-    This class is intended to be extended upon when defining specific item view contexts."""
-
-    BORDER = 100  # BORDER//2 + |item grid| + BORDER//2
-    CELL_LENGTH = 64  # pixel width of grid cell
-    CELL_SPACING = 5  # pixel spacing between grid cells
-
-    CONTENT_GAP = CELL_LENGTH // 20  # gap between cell outside border and where to render contents
-
-    def __init__(self, master, size,
-                 deselected_colour='#e6e8ed',
-                 selected_colour='#6CB2D1',
-                 major_font=("Arial", 14),
-                 minor_font=("Arial", 10),
-                 **kwargs):
-        """Constructor for item based views.
-
-        Parameters:
-            master: Container to add this view to
-            size (tuple<int, int>): Number of (rows, columns) for the grid
-            kwargs: kwargs (key word arguments) to be given to the tk.Canvas on creation
-        """
-
-        self._major_font = major_font
-        self._minor_font = minor_font
-
-        rows, columns = size
-
-        height = rows * (self.CELL_LENGTH + self.CELL_SPACING) + self.BORDER
-        width = columns * (self.CELL_LENGTH + self.CELL_SPACING) + self.BORDER
-
-        super().__init__(master, width=width, height=height, **kwargs)
-
-        self._selected_colour = selected_colour
-        self._deselected_colour = deselected_colour
-
-        self._slots = Grid(rows=rows, columns=columns)
-
-        for key in self._slots:
-            self._slots[key] = self.create_oval(self.grid_to_xy_centre(key), self.grid_to_xy_centre(key))
-
-    def grid_to_xy_box(self, grid_position):
-        """Returns the coordinates of the bounding box of the cell at 'grid_position'
-
-        Parameters:
-            grid_position (tuple<int, int>): Cell's (row, column) grid position
-
-        Return:
-            (tuple<float, float, float, float>):
-                    The (left, top, right, bottom) coordinates of the bounding box
-        """
-        row, column = grid_position
-
-        x0 = self.BORDER // 2 + (self.CELL_LENGTH + self.CELL_SPACING) * column
-        y0 = self.BORDER // 2 + (self.CELL_LENGTH + self.CELL_SPACING) * row
-
-        x1 = x0 + self.CELL_LENGTH
-        y1 = y0 + self.CELL_LENGTH
-
-        return x0, y0, x1, y1
-
-    def grid_to_xy_centre(self, grid_position):
-        """Returns the coordinates of the centre of the cell at 'grid_position'
-
-        Parameters:
-            grid_position (tuple<int, int>): Cell's (row, column) grid position
-
-        Return:
-            (tuple<float, float>): The (x, y) coordinates of the centre
-        """
-        x0, y0, x1, y1 = self.grid_to_xy_box(grid_position)
-
-        return (x0 + x1) // 2, (y0 + y1) // 2
-
-    def xy_to_grid(self, xy_position):
-        """Returns the grid position of the cell that contains the 'xy_position'
-
-        Parameters:
-            xy_position (tuple<float, float>):
-                    (x, y) coordinates contained by some cell
-
-        Return:
-            (tuple<int, int>): The (row, column) grid position of the cell
-        """
-        x, y = xy_position
-
-        column = (x - self.BORDER // 2) // (self.CELL_LENGTH + self.CELL_SPACING)
-        row = (y - self.BORDER // 2) // (self.CELL_LENGTH + self.CELL_SPACING)
-
-        return row, column
-
-    def draw_cell(self, grid_position, stack, active=False):
-        """Draws a stack in a cell
-
-        Parameters:
-            grid_position (tuple<int, int>):
-                    The (row, column) position of the cell to draw on
-            stack (Stack): The stack to draw, or None for empty
-            active (bool): Whether the cell is active or not
-        """
-        box = self.grid_to_xy_box(grid_position)
-
-        text = stack.get_item().get_id().replace('_', '\n') if stack else ""
-
-        colour = self._selected_colour if active else self._deselected_colour
-
-        centre = self.grid_to_xy_centre(grid_position)
-        left, top, right, bottom = self.grid_to_xy_box(grid_position)
-
-        self.create_rectangle(box, fill=colour, tag='cell')
-
-        if stack:
-            item = stack.get_item()
-
-            self.create_text(centre, text=text, font=self._major_font, tag='cell')
-
-            if item.is_stackable():
-                sub_text = f"{len(stack)}"
-                x = right
-                anchor = tk.SE
-            else:
-                sub_text = f"{item.get_durability()}/{item.get_max_durability()}"
-                x = left
-                anchor = tk.SW
-
-            self.create_text(x, bottom, text=sub_text, anchor=anchor, font=self._minor_font, tag='cell')
-
-    def bind_for_id(self, event, callback):
-        """Binds to tkinter mouse event and also provides position of
-        cell where event was triggered to callback
-
-        Callback is called similarly to callbacks to tk.bind, except grid_position of
-        relevant cell is also inserted:
-            tk_callback(mouse_event)
-            =>
-            callback(grid_position, mouse_event),
-                where 'grid_position' is the (row, column) position of the cell where
-                the event was triggered
-
-        Parameters:
-             event (str): The tkinter mouse event to bind to
-             callback (function): The callback to bind
-        """
-        if event not in TK_MOUSE_EVENTS:
-            return
-
-        self.bind(event, lambda e: callback(self.xy_to_grid((e.x, e.y)), e))
-
-    def render(self, items, active_position):
-        """Re-render the Hot Bar
-
-        Parameters:
-            items list<Stack>: items to be displayed in Hot Bar
-            active_position (int): id of currently active cell
-        """
-        self.delete(tk.ALL)
-        for position, stack in items:
-            self.draw_cell(position, stack, position == active_position)
-
-    
 class Grid:
     """A 2d grid to hold items"""
+    __slots__ = ('_items', '_positions', '_free')
 
     def __init__(self, rows=4, columns=5):
         self._items = [
@@ -315,6 +155,13 @@ class Grid:
             ] for i in range(rows)
         ]
 
+        # Positions of the stacks of each item id, & of the empty cells, each in row-major order,
+        # so that adding items doesn't need to search the grid (see add_items)
+        # Stacks are indexed whether full or not, since their quantities change without the
+        # grid knowing; an item id's stacks are few, so checking them for space is cheap
+        self._positions: Dict[str, List[Tuple[int, int]]] = {}
+        self._free = [(i, j) for i in range(rows) for j in range(columns)]
+
     def __repr__(self):
         return json.dumps([[repr(stack) for stack in row] for row in self._items], indent=4)
 
@@ -353,7 +200,26 @@ class Grid:
             stack (Stack): The stack to set, or None
         """
         row, column = position
-        self._items[row][column] = stack
+        cells = self._items[row]
+        previous = cells[column]
+
+        cells[column] = stack
+
+        # normalise negative indices
+        position = row % len(self._items), column % len(cells)
+
+        if previous is None:
+            del self._free[bisect.bisect_left(self._free, position)]
+        else:
+            positions = self._positions[previous.get_item().get_id()]
+            del positions[bisect.bisect_left(positions, position)]
+            if not positions:
+                del self._positions[previous.get_item().get_id()]
+
+        if stack is None:
+            bisect.insort(self._free, position)
+        else:
+            bisect.insort(self._positions.setdefault(stack.get_item().get_id(), []), position)
 
     def __len__(self):
         """(int) Returns the total number of elements in this grid"""
@@ -426,20 +292,17 @@ class Grid:
              Stack: Remaining (sub-)stack that could not be added, or None if all was added"""
 
         # fill existing stacks
-        for position, this_stack in self.items():
-            if this_stack and this_stack.matches(stack):  # stacks match
+        for row, column in self._positions.get(stack.get_item().get_id(), ()):
+            this_stack = self._items[row][column]
+            if this_stack:  # not depleted
                 this_stack.absorb(stack)
                 if stack.get_quantity() == 0:
                     break
 
         # fill empty stacks, if necessary
-        if stack:
-            for position, this_stack in self.items():
-                if this_stack is None:
-                    self[position] = this_stack = Stack(stack.get_item(), 0)
-                    this_stack.absorb(stack)
-                if stack.get_quantity() == 0:
-                    break
+        while stack and self._free:
+            self[self._free[0]] = this_stack = Stack(stack.get_item(), 0)
+            this_stack.absorb(stack)
 
         if stack and stack.get_quantity() > 0:
             return stack
@@ -447,6 +310,7 @@ class Grid:
 
 class SelectableGrid(Grid):
     """A grid that can have a single cell selected"""
+    __slots__ = ('_selected',)
 
     def __init__(self, rows=4, columns=5):
         super().__init__(rows=rows, columns=columns)
@@ -0,0 +1,177 @@
+"""
+Class to display the hotbar & inventory (see grid.py)
+"""
+
+__author__ = "Benjamin Martin and Paul Haley"
+__version__ = "1.1.0"
+__date__ = "26/04/2019"
+__copyright__ = "The University of Queensland, 2019"
+
+import tkinter as tk
+
+from core import TK_MOUSE_EVENTS
+from grid import Grid
+
+
+class ItemGridView(tk.Canvas):
+    """Class defining constants and draw methods for rendering item orientated views. The methods
+    in in this class allow for a grid view of items to be easily drawn and be added to the master
+    view given.
+
+    This class is intended to be extended upon when defining specific item view contexts."""
+
+    BORDER = 100  # BORDER//2 + |item grid| + BORDER//2
+    CELL_LENGTH = 64  # pixel width of grid cell
+    CELL_SPACING = 5  # pixel spacing between grid cells
+
+    CONTENT_GAP = CELL_LENGTH // 20  # gap between cell outside border and where to render contents
+
+    def __init__(self, master, size,
+                 deselected_colour='#e6e8ed',
+                 selected_colour='#6CB2D1',
+                 major_font=("Arial", 14),
+                 minor_font=("Arial", 10),
+                 **kwargs):
+        """Constructor for item based views.
+
+        Parameters:
+            master: Container to add this view to
+            size (tuple<int, int>): Number of (rows, columns) for the grid
+            kwargs: kwargs (key word arguments) to be given to the tk.Canvas on creation
+        """
+
+        self._major_font = major_font
+        self._minor_font = minor_font
+
+        rows, columns = size
+
+        height = rows * (self.CELL_LENGTH + self.CELL_SPACING) + self.BORDER
+        width = columns * (self.CELL_LENGTH + self.CELL_SPACING) + self.BORDER
+
+        super().__init__(master, width=width, height=height, **kwargs)
+
+        self._selected_colour = selected_colour
+        self._deselected_colour = deselected_colour
+
+        self._slots = Grid(rows=rows, columns=columns)
+
+        for key in self._slots:
+            self._slots[key] = self.create_oval(self.grid_to_xy_centre(key), self.grid_to_xy_centre(key))
+
+    def grid_to_xy_box(self, grid_position):
+        """Returns the coordinates of the bounding box of the cell at 'grid_position'
+
+        Parameters:
+            grid_position (tuple<int, int>): Cell's (row, column) grid position
+
+        Return:
+            (tuple<float, float, float, float>):
+                    The (left, top, right, bottom) coordinates of the bounding box
+        """
+        row, column = grid_position
+
+        x0 = self.BORDER // 2 + (self.CELL_LENGTH + self.CELL_SPACING) * column
+        y0 = self.BORDER // 2 + (self.CELL_LENGTH + self.CELL_SPACING) * row
+
+        x1 = x0 + self.CELL_LENGTH
+        y1 = y0 + self.CELL_LENGTH
+
+        return x0, y0, x1, y1
+
+    def grid_to_xy_centre(self, grid_position):
+        """Returns the coordinates of the centre of the cell at 'grid_position'
+
+        Parameters:
+            grid_position (tuple<int, int>): Cell's (row, column) grid position
+
+        Return:
+            (tuple<float, float>): The (x, y) coordinates of the centre
+        """
+        x0, y0, x1, y1 = self.grid_to_xy_box(grid_position)
+
+        return (x0 + x1) // 2, (y0 + y1) // 2
+
+    def xy_to_grid(self, xy_position):
+        """Returns the grid position of the cell that contains the 'xy_position'
+
+        Parameters:
+            xy_position (tuple<float, float>):
+                    (x, y) coordinates contained by some cell
+
+        Return:
+            (tuple<int, int>): The (row, column) grid position of the cell
+        """
+        x, y = xy_position
+
+        column = (x - self.BORDER // 2) // (self.CELL_LENGTH + self.CELL_SPACING)
+        row = (y - self.BORDER // 2) // (self.CELL_LENGTH + self.CELL_SPACING)
+
+        return row, column
+
+    def draw_cell(self, grid_position, stack, active=False):
+        """Draws a stack in a cell
+
+        Parameters:
+            grid_position (tuple<int, int>):
+                    The (row, column) position of the cell to draw on
+            stack (Stack): The stack to draw, or None for empty
+            active (bool): Whether the cell is active or not
+        """
+        box = self.grid_to_xy_box(grid_position)
+
+        text = stack.get_item().get_id().replace('_', '\n') if stack else ""
+
+        colour = self._selected_colour if active else self._deselected_colour
+
+        centre = self.grid_to_xy_centre(grid_position)
+        left, top, right, bottom = self.grid_to_xy_box(grid_position)
+
+        self.create_rectangle(box, fill=colour, tag='cell')
+
+        if stack:
+            item = stack.get_item()
+
+            self.create_text(centre, text=text, font=self._major_font, tag='cell')
+
+            if item.is_stackable():
+                sub_text = f"{len(stack)}"
+                x = right
+                anchor = tk.SE
+            else:
+                sub_text = f"{item.get_durability()}/{item.get_max_durability()}"
+                x = left
+                anchor = tk.SW
+
+            self.create_text(x, bottom, text=sub_text, anchor=anchor, font=self._minor_font, tag='cell')
+
+    def bind_for_id(self, event, callback):
+        """Binds to tkinter mouse event and also provides position of
+        cell where event was triggered to callback
+
+        Callback is called similarly to callbacks to tk.bind, except grid_position of
+        relevant cell is also inserted:
+            tk_callback(mouse_event)
+            =>
+            callback(grid_position, mouse_event),
+                where 'grid_position' is the (row, column) position of the cell where
+                the event was triggered
+
+        Parameters:
+             event (str): The tkinter mouse event to bind to
+             callback (function): The callback to bind
+        """
+        if event not in TK_MOUSE_EVENTS:
+            return
+
+        self.bind(event, lambda e: callback(self.xy_to_grid((e.x, e.y)), e))
+
+    def render(self, items, active_position):
+        """Re-render the Hot Bar
+
+        Parameters:
+            items list<Stack>: items to be displayed in Hot Bar
+            active_position (int): id of currently active cell
+        """
+        self.delete(tk.ALL)
+        for position, stack in items:
+            self.draw_cell(position, stack, position == active_position)
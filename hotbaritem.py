@@ -1,8 +1,9 @@
 from item import Item
 
 class HotbarItem(Item):
+    __slots__ = ()
+
     def __init__(self, item_id:str):
-        self._id = item_id
         super().__init__(id_=item_id, attack_range=0)
     
     def can_attack(self):
@@ -10,11 +10,34 @@ __version__ = "1.1.0"
 __date__ = "26/04/2019"
 __copyright__ = "The University of Queensland, 2019"
 
+from collections import namedtuple
+
 from core import EffectID
 
+# The immutable properties of an item, shared by every item with the same properties
+# (see get_item_definition)
+ItemDefinition = namedtuple('ItemDefinition', ['id', 'max_stack', 'attack_range'])
+
+# Every definition created so far, by its properties
+_ITEM_DEFINITIONS = {}
+
+
+def get_item_definition(id_: str, max_stack: int = 64, attack_range: float = 10) -> ItemDefinition:
+    """(ItemDefinition) Returns the shared definition of items with the given properties"""
+    key = id_, max_stack, attack_range
+
+    definition = _ITEM_DEFINITIONS.get(key)
+    if definition is None:
+        definition = _ITEM_DEFINITIONS[key] = ItemDefinition(*key)
+
+    return definition
+
 
 class Item:
     """A conceptual, non-physical item in the game"""
+    # Slots, rather than a __dict__, keep the memory of each item small; subclasses should define
+    # __slots__ for any attributes they add
+    __slots__ = ('_definition',)
 
     def __init__(self, id_: str, max_stack: int = 64, attack_range: float = 10):
         """Constructor
@@ -24,14 +47,29 @@ class Item:
             max_stack (int): The maximum stack size of this item
             attack_range (float): The item's range when attacking, in block spans
         """
-        self._id = id_
-        self._max_stack_size = max_stack
-        self._range = attack_range
+        # only state specific to an item (e.g. a tool's durability) is kept on the item itself
+        self._definition = get_item_definition(id_, max_stack, attack_range)
+
+    # The properties of the item's definition, as attributes
+    _id = property(lambda self: self._definition.id)
+    _max_stack_size = property(lambda self: self._definition.max_stack)
+    _range = property(lambda self: self._definition.attack_range)
+
+    def get_definition(self) -> ItemDefinition:
+        """(ItemDefinition) Returns the immutable properties of this item, which are shared by
+        every item with the same properties"""
+        return self._definition
 
     def get_id(self) -> str:
         """(str) Returns the unique id of this item"""
         return self._id
 
+    def get_factory_id(self) -> tuple:
+        """(tuple) Returns the id that recreates this item when passed to an item factory
+
+        E.g. app.create_item(*item.get_factory_id()) creates a new copy of this item"""
+        return self._id,
+
     def __repr__(self):
         return f"{self.__class__.__name__}({self._id!r})"
 
@@ -89,6 +127,7 @@ class Item:
 
 class HandItem(Item):
     """The player's hands, infinitely durable and the item used to attack by default"""
+    __slots__ = ()
 
     def __init__(self, id_):
         super().__init__(id_, max_stack=1)
@@ -113,6 +152,7 @@ class HandItem(Item):
 
 class SimpleItem(Item):
     """An item that drops a Block form of itself when used"""
+    __slots__ = ()
 
     # The following methods have not been documented, as their purpose is simple
     # and their docstrings are inherited from Item's methods
@@ -134,6 +174,7 @@ class SimpleItem(Item):
 
 class BlockItem(Item):
     """An item that drops a Block form of itself when used"""
+    __slots__ = ()
 
     def can_attack(self) -> bool:
         """(bool) Returns False, since BlockItems cannot be used to attack"""
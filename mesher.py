@@ -0,0 +1,77 @@
+"""
+Greedy meshing of grid cells into large rectangles, used to give contiguous blocks
+a handful of collision shapes rather than one per cell
+"""
+
+from typing import Callable, List, Tuple
+
+# A rectangle of cells, as (column, row, width, height), where (column, row) is its top-left cell
+CellRectangle = Tuple[int, int, int, int]
+
+
+def greedy_rectangles(left: int, top: int, columns: int, rows: int,
+                      key: Callable[[int, int], object]) -> List[CellRectangle]:
+    """Covers the cells in a region with as few rectangles as can be found greedily
+
+    Each rectangle only covers cells that share the same (non-None) key, and every such
+    cell is covered by exactly one rectangle. Cells are claimed row by row, left to right;
+    each rectangle is first grown as wide as possible, and then as tall as possible.
+
+    Parameters:
+        left (int): The column of the region's left-most cells
+        top (int): The row of the region's top-most cells
+        columns (int): The width of the region, in cells
+        rows (int): The height of the region, in cells
+        key (callable<int, int>): Returns the key of the cell at (column, row), or None if
+                                  that cell should not be covered (i.e. it is empty)
+
+    Return:
+        list<tuple<int, int, int, int>>: (column, row, width, height) rectangles
+    """
+    keys = [[key(left + i, top + j) for i in range(columns)] for j in range(rows)]
+    return greedy_rectangles_from_keys(left, top, keys)
+
+
+def greedy_rectangles_from_keys(left: int, top: int, keys: List[List[object]]) -> List[CellRectangle]:
+    """Covers the cells in a region with as few rectangles as can be found greedily, given the
+    key of every cell in the region up front; see greedy_rectangles
+
+    Parameters:
+        left (int): The column of the region's left-most cells
+        top (int): The row of the region's top-most cells
+        keys (list<list<object>>): The key of each cell, by row then column, or None if that
+                                   cell should not be covered
+
+    Return:
+        list<tuple<int, int, int, int>>: (column, row, width, height) rectangles
+    """
+    rows = len(keys)
+    columns = len(keys[0]) if keys else 0
+
+    claimed = [[False] * columns for _ in range(rows)]
+
+    rectangles = []
+
+    for j in range(rows):
+        for i in range(columns):
+            cell_key = keys[j][i]
+
+            if cell_key is None or claimed[j][i]:
+                continue
+
+            width = 1
+            while i + width < columns and not claimed[j][i + width] and keys[j][i + width] == cell_key:
+                width += 1
+
+            height = 1
+            while j + height < rows and all(not claimed[j + height][i + k] and keys[j + height][i + k] == cell_key
+                                            for k in range(width)):
+                height += 1
+
+            for dj in range(height):
+                for di in range(width):
+                    claimed[j + dj][i + di] = True
+
+            rectangles.append((left + i, top + j, width, height))
+
+    return rectangles
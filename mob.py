@@ -8,7 +8,6 @@ __date__ = "26/04/2019"
 __copyright__ = "The University of Queensland, 2019"
 
 
-import random
 import cmath
 
 from physical_thing import DynamicThing
@@ -25,6 +24,7 @@ class Mob(DynamicThing):
     Can be friend, foe, or neither
 
     Should not be instantiated directly"""
+    __slots__ = ('_id', '_size', '_tempo', '_steps')
 
     def __init__(self, mob_id, size, tempo=MOB_DEFAULT_TEMPO, max_health=20):
         """Constructor
@@ -70,6 +70,7 @@ class Mob(DynamicThing):
 
 class Bird(Mob):
     """A friendly bird, nonchalant with a dash of cheerfulness"""
+    __slots__ = ()
 
     def step(self, time_delta, game_data):
         """Advance this bird by one time step
@@ -80,7 +81,7 @@ class Bird(Mob):
             # a random point on a movement circle (radius=tempo), scaled by the percentage
             # of health remaining
             health_percentage = self._health / self._max_health
-            z = cmath.rect(self._tempo * health_percentage, random.uniform(0, 2 * cmath.pi))
+            z = cmath.rect(self._tempo * health_percentage, game_data.rng.uniform(0, 2 * cmath.pi))
 
             # stretch that random point onto an ellipse that is wider on the x-axis
             dx, dy = z.real * BIRD_X_SCALE, z.imag
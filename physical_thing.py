@@ -17,6 +17,9 @@ class PhysicalThing:
     """The highest-level abstract representation of a physical thing in the game world
 
     Should not be instantiated directly"""
+    # Slots, rather than a __dict__, keep the memory of each of the world's many things small;
+    # subclasses should define __slots__ for any attributes they add
+    __slots__ = ('_shape',)
 
     def __init__(self):
         self._shape: pymunk.Shape = None
@@ -42,6 +45,13 @@ class PhysicalThing:
         """
         raise NotImplementedError("A PhysicalThing subclass must implement a use method")
 
+    def is_steppable(self) -> bool:
+        """(bool) Returns True iff this thing needs its step method called on every time step
+
+        Things that never change on their own (i.e. blocks & walls) should return False, so that
+        the world can skip them entirely when stepping"""
+        return True
+
     def set_shape(self, shape: pymunk.Shape):
         self._shape = shape
 
@@ -69,6 +79,7 @@ class DynamicThing(PhysicalThing):
     """A physical thing that can move
 
     Should not be instantiated directly"""
+    __slots__ = ('_health', '_max_health')
 
     def __init__(self, max_health=20):
 
@@ -121,6 +132,7 @@ class DynamicThing(PhysicalThing):
 
 class BoundaryWall(PhysicalThing):
     """A boundary wall to prevent movement off the edge of the game world"""
+    __slots__ = ('_id',)
 
     def __init__(self, wall_id: str):
         """Constructor
@@ -144,6 +156,10 @@ class BoundaryWall(PhysicalThing):
         """(bool) Returns False, since walls cannot be used"""
         return False
 
+    def is_steppable(self) -> bool:
+        """(bool) Returns False, since walls never move"""
+        return False
+
     def use(self):
         pass
 
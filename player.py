@@ -8,6 +8,7 @@ __copyright__ = "The University of Queensland, 2019"
 
 class Player(DynamicThing):
     """A player in the game"""
+    __slots__ = ('_name', '_food', '_max_food')
 
     def __init__(self, name: str = "Allan", max_food: float = 20, max_health: float = 20):
         """Constructor
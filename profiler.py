@@ -0,0 +1,182 @@
+"""
+Per-tick instrumentation of where frame time goes
+
+A Profiler times named phases (e.g. physics, redraw) within each tick (i.e. frame). It keeps
+rolling percentiles of each phase over recent ticks, for an on-screen overlay, and a longer
+history of per-tick samples that can be exported to CSV for offline analysis.
+
+Phases may nest (e.g. collision callbacks happen during physics), in which case the time of
+the inner phase is also included in the outer phase.
+"""
+
+import csv
+import time
+from collections import deque
+from typing import List, Sequence
+
+# Name of the phase that spans each whole tick
+FRAME_PHASE = 'frame'
+
+
+class _Phase:
+    """Context manager that adds the time spent within it to a phase of a profiler's current tick"""
+
+    def __init__(self, profiler: 'Profiler', name: str):
+        self._profiler = profiler
+        self._name = name
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._profiler.add_sample(self._name, time.perf_counter() - self._start)
+
+
+class _NullPhase:
+    """Context manager that does nothing, for when profiling is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class NullProfiler:
+    """A profiler that records nothing; used wherever profiling is disabled"""
+
+    _phase = _NullPhase()
+
+    def phase(self, name: str) -> _NullPhase:
+        """Returns a context manager that does nothing"""
+        return self._phase
+
+
+# Shared profiler for when profiling is disabled
+NULL_PROFILER = NullProfiler()
+
+
+class Profiler:
+    """Times the phases of each tick"""
+
+    def __init__(self, window: int = 120, history: int = 36000):
+        """Constructor
+
+        Parameters:
+            window (int): The number of most recent ticks that percentiles are taken over
+            history (int): The maximum number of ticks kept for exporting to CSV
+        """
+        self._window = deque(maxlen=window)
+        # (tick number, start time, phase times) for each kept tick
+        self._history = deque(maxlen=history)
+
+        # Names of all phases recorded, in the order they were first seen
+        self._phases = [FRAME_PHASE]
+
+        self._ticks = 0
+        self._tick_start = None
+        # Time spent in each phase during the current tick, in seconds
+        self._current = None
+
+    def begin_tick(self):
+        """Starts timing a new tick"""
+        self._tick_start = time.perf_counter()
+        self._current = {}
+
+    def end_tick(self):
+        """Finishes timing the current tick, recording its samples
+
+        Does nothing if no tick has begun"""
+        if self._current is None:
+            return
+
+        samples = self._current
+        samples[FRAME_PHASE] = time.perf_counter() - self._tick_start
+
+        self._window.append((self._tick_start, samples))
+        self._history.append((self._ticks, self._tick_start, samples))
+
+        self._ticks += 1
+        self._current = None
+
+    def phase(self, name: str) -> _Phase:
+        """Returns a context manager that times a phase of the current tick
+
+        Time spent in the same phase more than once during a tick is summed"""
+        return _Phase(self, name)
+
+    def add_sample(self, name: str, seconds: float):
+        """Adds 'seconds' to the time spent in phase 'name' during the current tick
+
+        Ignored if no tick has begun"""
+        if self._current is None:
+            return
+
+        if name not in self._phases:
+            self._phases.append(name)
+
+        self._current[name] = self._current.get(name, 0.) + seconds
+
+    def get_phases(self) -> List[str]:
+        """(list<str>) Returns the names of all phases recorded, in the order they were first seen"""
+        return list(self._phases)
+
+    def get_ticks(self) -> int:
+        """(int) Returns the number of ticks recorded"""
+        return self._ticks
+
+    def get_percentile(self, name: str, percentile: float) -> float:
+        """(float) Returns a percentile of the time spent in phase 'name' per tick, in seconds,
+        over recent ticks (ticks where the phase didn't happen count as 0)
+
+        Parameters:
+            percentile (float): The percentile, between 0 & 100 (e.g. 50 for the median)
+        """
+        if not self._window:
+            return 0.
+
+        times = sorted(samples.get(name, 0.) for _, samples in self._window)
+
+        # nearest rank
+        rank = max(int(-(-percentile * len(times) // 100)), 1)
+        return times[rank - 1]
+
+    def get_fps(self) -> float:
+        """(float) Returns the rate of recent ticks, per second"""
+        if len(self._window) < 2:
+            return 0.
+
+        first, _ = self._window[0]
+        last, _ = self._window[-1]
+
+        if last == first:
+            return 0.
+
+        return (len(self._window) - 1) / (last - first)
+
+    def get_summary(self, percentiles: Sequence[float] = (50, 95, 99)) -> List[str]:
+        """(list<str>) Returns lines summarising recent ticks: the tick rate, then the given
+        percentiles of each phase, in milliseconds"""
+        lines = [f"{self.get_fps():.1f} FPS    " + " / ".join(f"p{percentile:g}" for percentile in percentiles)]
+
+        for name in self._phases:
+            times = " / ".join(f"{self.get_percentile(name, percentile) * 1000:.2f}" for percentile in percentiles)
+            lines.append(f"{name}: {times} ms")
+
+        return lines
+
+    def export_csv(self, path: str):
+        """Writes the samples of every kept tick to a CSV file at 'path'
+
+        Each row is a tick, with its number, start time (in seconds) and the time spent in each
+        phase (in milliseconds; empty if the phase didn't happen during that tick)"""
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(['tick', 'start'] + [f"{name}_ms" for name in self._phases])
+
+            for tick, start, samples in self._history:
+                row = [tick, f"{start:.6f}"]
+                row.extend(f"{samples[name] * 1000:.4f}" if name in samples else '' for name in self._phases)
+                writer.writerow(row)
@@ -0,0 +1,44 @@
+"""
+Canonical forms of crafting patterns, shared by every size of crafting grid
+
+A recipe is a pair of (pattern, result Stack), optionally followed by a collection of flags,
+where a pattern is rows of item ids (or None for an empty cell). Patterns are compared once
+trimmed of empty rows & columns, so a recipe matches wherever it is placed on a grid, and one
+recipe serves grids of every size that it fits on (see crafting.GridCrafter).
+"""
+
+# Recipe flags
+# The recipe also matches its pattern mirrored left to right
+MIRRORED = 'mirrored'
+# The recipe matches its ingredients in any arrangement
+SHAPELESS = 'shapeless'
+
+
+def trim_pattern(pattern):
+    """(tuple<tuple<str>>) Returns 'pattern' without its leading & trailing empty rows & columns,
+    as a tuple of row tuples; i.e. the smallest rectangle containing every ingredient
+
+    Returns an empty tuple if 'pattern' has no ingredients.
+
+    Parameters:
+        pattern (sequence<sequence<str>>): Rows of item ids (or None for an empty cell)
+    """
+    filled_rows = [i for i, row in enumerate(pattern) if row.count(None) != len(row)]
+    if not filled_rows:
+        return ()
+
+    rows = pattern[filled_rows[0]:filled_rows[-1] + 1]
+    filled_columns = [j for j, column in enumerate(zip(*rows)) if column.count(None) != len(column)]
+    left, right = filled_columns[0], filled_columns[-1] + 1
+
+    return tuple(tuple(row[left:right]) for row in rows)
+
+
+def mirror_pattern(pattern):
+    """(tuple<tuple<str>>) Returns 'pattern' mirrored left to right"""
+    return tuple(tuple(reversed(row)) for row in pattern)
+
+
+def get_ingredients(pattern):
+    """(tuple<str>) Returns the ingredients of 'pattern' in sorted order, regardless of arrangement"""
+    return tuple(sorted(cell for row in pattern for cell in row if cell is not None))
@@ -0,0 +1,268 @@
+"""
+Data-driven definitions of Ninedraft's blocks, items & crafting recipes
+
+Definitions are read from the data directory, followed by each content pack (a subdirectory
+of data/packs, in order of name). Each directory may contain any of the following files, as
+JSON (.json) or, with Python 3.11+, TOML (.toml):
+    blocks: {block id: definition}, where a definition has a "kind" (see content.create_block),
+            & optionally a "colour", a "break_table" (see the comment on break tables below) &
+            an "id" that the block reports, if different to its block id
+    items: {item id: definition}, where a definition has a "kind" (see content.create_item),
+           & optionally a "colour", along with any properties of its kind (e.g. "strength")
+    recipes: {"recipes": [recipe, ...]}, where a recipe has a "pattern" (rows of item ids, with
+             null or "" for an empty cell), a "result" item id (as a list of its parts), & optionally
+             a "count" (default 1) & "flags" (see recipes.py)
+
+Definitions in later directories replace those with the same id in earlier directories, while
+recipes are added to those already defined.
+
+The definitions are compiled into lookup tables (see Registry), which are cached on disk, keyed by
+a hash of every definition file, so that the files only need to be parsed again when they change.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from collections import namedtuple
+from typing import List
+
+from recipes import MIRRORED, SHAPELESS
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+# Directory of the base definitions
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# Subdirectory of the data directory that holds content packs
+PACKS_DIRECTORY = 'packs'
+
+# Names of the definition files in each directory, without their extension
+SECTIONS = ('blocks', 'items', 'recipes')
+
+# Extensions of definition files, in order of preference
+EXTENSIONS = ('.json', '.toml')
+
+# Increased whenever the compiled form changes, so that old caches are ignored
+REGISTRY_VERSION = 1
+
+# A block's break table maps item ids to (time, correct) pairs, where
+#   - time: higher time increases the difficulty to mine (break) a block
+#           with the item
+#   - correct: is True iff the item is the correct item for breaking the block
+#                (usually this indicates whether the block should drop an item
+#                 form of itself)
+# In definition files, each pair is a list, and a break table may instead be the block id of
+# another block to share the break table of
+
+# Compiled definitions
+#   blocks (dict<str, dict>): Definition of each block, by block id; each has a "kind", an "id",
+#                             a "colour" (or None) & a "break_table" (or None)
+#   items (dict<str, dict>): Definition of each item, by item id; each has a "kind" & a "colour"
+#                            (or None), along with any properties of its kind
+#   recipes (list<tuple<tuple<tuple<str>>, tuple<str>, int, frozenset<str>>>):
+#           (pattern, result item id, count, flags) of each recipe, in order
+#   block_colours (dict<str, str>): The colour of each block, by the id that the block reports
+#   item_colours (dict<str, str>): The colour of each item, by item id
+Registry = namedtuple('Registry', ['blocks', 'items', 'recipes', 'block_colours', 'item_colours'])
+
+
+def find_definition_files(data_path: str = DATA_PATH) -> List[str]:
+    """(list<str>) Returns the paths of all definition files, in the order they're loaded"""
+    directories = [data_path]
+
+    packs_path = os.path.join(data_path, PACKS_DIRECTORY)
+    if os.path.isdir(packs_path):
+        directories.extend(os.path.join(packs_path, name) for name in sorted(os.listdir(packs_path))
+                           if os.path.isdir(os.path.join(packs_path, name)))
+
+    paths = []
+    for directory in directories:
+        for section in SECTIONS:
+            for extension in EXTENSIONS:
+                path = os.path.join(directory, section + extension)
+                if os.path.isfile(path):
+                    paths.append(path)
+
+    return paths
+
+
+def get_digest(paths: List[str]) -> str:
+    """(str) Returns a hash of the names & contents of the files at 'paths', & REGISTRY_VERSION"""
+    digest = hashlib.sha256(str(REGISTRY_VERSION).encode('ascii'))
+
+    for path in paths:
+        with open(path, 'rb') as file:
+            contents = file.read()
+
+        digest.update(os.path.basename(os.path.dirname(path)).encode('utf-8') + b'\0')
+        digest.update(os.path.basename(path).encode('utf-8') + b'\0')
+        digest.update(len(contents).to_bytes(8, 'little'))
+        digest.update(contents)
+
+    return digest.hexdigest()
+
+
+def _read(path: str):
+    """Returns the data in the JSON or TOML file at 'path'
+
+    Raises:
+        ImportError: if the file is TOML & TOML can't be read (i.e. before Python 3.11)
+    """
+    if path.endswith('.toml'):
+        if tomllib is None:
+            raise ImportError(f"Reading TOML definitions, such as {path}, requires Python 3.11+")
+
+        with open(path, 'rb') as file:
+            return tomllib.load(file)
+
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def _section(path: str) -> str:
+    """(str) Returns the section that the definition file at 'path' belongs to"""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def compile_definitions(paths: List[str]) -> Registry:
+    """(Registry) Reads & compiles the definition files at 'paths', in order
+
+    Raises:
+        ValueError: if a definition is invalid
+    """
+    definitions = {'blocks': {}, 'items': {}}
+    recipes = []
+
+    for path in paths:
+        data = _read(path)
+        section = _section(path)
+
+        if section == 'recipes':
+            recipes.extend(_compile_recipe(path, recipe) for recipe in data.get('recipes', []))
+            continue
+
+        for id_, definition in data.items():
+            if not isinstance(definition, dict) or not isinstance(definition.get('kind'), str):
+                raise ValueError(f"{path}: {section[:-1]} {id_!r} has no kind")
+            definitions[section][id_] = definition
+
+    blocks = {}
+    # compiled break tables by the block they're defined on, so that references share them
+    break_tables = {}
+
+    for block_id, definition in definitions['blocks'].items():
+        block = dict(definition)
+        block.setdefault('id', block_id)
+        block.setdefault('colour', None)
+
+        owner = _find_break_table_owner(definitions['blocks'], block_id)
+        if owner not in break_tables:
+            table = definitions['blocks'][owner].get('break_table')
+            break_tables[owner] = None if table is None else {
+                item_id: (float(time), bool(correct)) for item_id, (time, correct) in table.items()}
+        block['break_table'] = break_tables[owner]
+
+        blocks[block_id] = block
+
+    items = {}
+    for item_id, definition in definitions['items'].items():
+        item = dict(definition)
+        item.setdefault('colour', None)
+        items[item_id] = item
+
+    block_colours = {block['id']: block['colour'] for block in blocks.values() if block['colour'] is not None}
+    item_colours = {item_id: item['colour'] for item_id, item in items.items() if item['colour'] is not None}
+
+    return Registry(blocks, items, recipes, block_colours, item_colours)
+
+
+def _find_break_table_owner(blocks: dict, block_id: str) -> str:
+    """(str) Returns the id of the block that defines the break table of a block, following
+    references to the break tables of other blocks
+
+    Raises:
+        ValueError: if a reference is to an undefined block, or is circular
+    """
+    seen = [block_id]
+    table = blocks[block_id].get('break_table')
+
+    while isinstance(table, str):
+        if table not in blocks:
+            raise ValueError(f"Block {seen[-1]!r} refers to the break table of undefined block {table!r}")
+        if table in seen:
+            raise ValueError(f"Circular break table references between blocks {seen}")
+
+        seen.append(table)
+        table = blocks[table].get('break_table')
+
+    return seen[-1]
+
+
+def _compile_recipe(path: str, recipe: dict) -> tuple:
+    """(tuple<tuple<tuple<str>>, tuple<str>, int, frozenset<str>>) Compiles a recipe definition
+
+    Raises:
+        ValueError: if the recipe is invalid
+    """
+    try:
+        pattern = tuple(tuple(cell or None for cell in row) for row in recipe['pattern'])
+        result = tuple(recipe['result'])
+    except (KeyError, TypeError):
+        raise ValueError(f"{path}: recipe {recipe!r} needs a pattern & a result")
+
+    if not pattern or len({len(row) for row in pattern}) != 1:
+        raise ValueError(f"{path}: recipe for {result} has rows of different lengths")
+
+    flags = frozenset(recipe.get('flags', ()))
+    if not flags <= {MIRRORED, SHAPELESS}:
+        raise ValueError(f"{path}: recipe for {result} has unknown flags {set(flags - {MIRRORED, SHAPELESS})}")
+
+    return pattern, result, int(recipe.get('count', 1)), flags
+
+
+def load_registry(data_path: str = DATA_PATH, cache_path: str = None) -> Registry:
+    """(Registry) Returns the compiled definitions in 'data_path' & its content packs
+
+    The compiled definitions are read from the cache at 'cache_path', if it was compiled from the
+    same definition files; otherwise, they are compiled & written to the cache.
+
+    Parameters:
+        data_path (str): The directory of the base definitions
+        cache_path (str): The cache file; defaults to __pycache__/registry.pickle in 'data_path'
+
+    Raises:
+        ValueError: if a definition is invalid
+    """
+    if cache_path is None:
+        cache_path = os.path.join(data_path, '__pycache__', 'registry.pickle')
+
+    paths = find_definition_files(data_path)
+    digest = get_digest(paths)
+
+    try:
+        with open(cache_path, 'rb') as file:
+            cached_digest, registry = pickle.load(file)
+        if cached_digest == digest:
+            return Registry(*registry)
+    except (OSError, EOFError, ValueError, TypeError, AttributeError, ImportError, pickle.UnpicklingError):
+        # missing or unreadable, so compile afresh
+        pass
+
+    registry = compile_definitions(paths)
+
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+        # written in full before replacing the old cache, so that readers never see part of it
+        temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'wb') as file:
+            pickle.dump((digest, tuple(registry)), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, cache_path)
+    except OSError as error:
+        print(f"Couldn't cache the registry at {cache_path}: {error}")
+
+    return registry
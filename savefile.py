@@ -0,0 +1,470 @@
+"""
+Compact binary save files for Ninedraft worlds
+
+A save file consists of:
+    1. A fixed-size header (see HEADER)
+    2. A dense table of chunk records, one for every chunk in the world in row-major order;
+       each record is the chunk's palette indices, as little-endian unsigned 16-bit integers
+    3. A side section of UTF-8 encoded JSON holding the block palette, the hitpoints of damaged
+       blocks, the player, all other dynamic things, and the hotbar & inventory
+
+Since every chunk record has a fixed size & position, a save file can be memory-mapped and
+its chunks read only when they are needed, or rewritten in place.
+"""
+
+import json
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import namedtuple
+from typing import Callable, Dict, Tuple
+
+from chunk import BlockPalette, CompactCells, PALETTE_TYPECODE
+from dropped_item import DroppedItem
+from grid import Grid, SelectableGrid, Stack
+from item import Item
+from mob import Mob
+from player import Player
+from toolitem import ToolItem
+from world import World
+
+SAVE_MAGIC = b'NDSV'
+SAVE_VERSION = 1
+
+# magic, version, chunk size, grid columns, grid rows, cell expanse, side section offset & length
+HEADER = struct.Struct('<4sHHIIIQQ')
+
+# Creates an item from its factory id; e.g. app.create_item
+ItemFactory = Callable[..., Item]
+
+SavedGame = namedtuple('SavedGame', ['world', 'player', 'hot_bar', 'inventory', 'save_file'])
+
+
+def _chunk_record_size(chunk_size: int) -> int:
+    """(int) Returns the size, in bytes, of each chunk record"""
+    return chunk_size * chunk_size * array(PALETTE_TYPECODE).itemsize
+
+
+def _chunk_offset(position: Tuple[int, int], grid_size: Tuple[int, int], chunk_size: int) -> int:
+    """(int) Returns the offset, in bytes, of the record for the chunk at 'position'"""
+    columns, _ = grid_size
+    chunk_columns = -(-columns // chunk_size)
+
+    column, row = position
+    return HEADER.size + (row * chunk_columns + column) * _chunk_record_size(chunk_size)
+
+
+def _chunk_count(grid_size: Tuple[int, int], chunk_size: int) -> int:
+    """(int) Returns the number of chunks in a world of 'grid_size'"""
+    columns, rows = grid_size
+    return -(-columns // chunk_size) * -(-rows // chunk_size)
+
+
+def _to_little_endian(cells: array) -> bytes:
+    """(bytes) Returns the little-endian representation of 'cells'"""
+    if sys.byteorder == 'big':
+        cells = array(cells.typecode, cells)
+        cells.byteswap()
+    return cells.tobytes()
+
+
+def _encode_stack(stack: Stack) -> list:
+    """(list) Returns the JSON-able form of 'stack'"""
+    item = stack.get_item()
+    durability = item.get_durability() if isinstance(item, ToolItem) else None
+    return [list(item.get_factory_id()), stack.get_quantity(), durability]
+
+
+def _decode_stack(data: list, item_factory: ItemFactory) -> Stack:
+    """(Stack) Returns the stack represented by JSON-able 'data'"""
+    factory_id, quantity, durability = data
+    item = item_factory(*factory_id)
+
+    if durability is not None:
+        item.set_durability(durability)
+
+    return Stack(item, quantity)
+
+
+def _encode_grid(grid: Grid) -> dict:
+    """(dict) Returns the JSON-able form of 'grid' & the stacks within it"""
+    data = {
+        'size': list(grid.get_size()),
+        'stacks': [[*position, _encode_stack(stack)] for position, stack in grid.items() if stack]
+    }
+
+    if isinstance(grid, SelectableGrid):
+        selected = grid.get_selected()
+        data['selected'] = list(selected) if selected else None
+
+    return data
+
+
+def _decode_grid(data: dict, item_factory: ItemFactory, grid_class=Grid) -> Grid:
+    """(Grid) Returns the grid represented by JSON-able 'data'"""
+    rows, columns = data['size']
+    grid = grid_class(rows=rows, columns=columns)
+
+    for row, column, stack in data['stacks']:
+        grid[row, column] = _decode_stack(stack, item_factory)
+
+    if data.get('selected'):
+        grid.select(tuple(data['selected']))
+
+    return grid
+
+
+def _encode_motion(thing) -> dict:
+    """(dict) Returns the JSON-able position & velocity of a dynamic 'thing'"""
+    velocity = thing.get_velocity()
+    return {'position': list(thing.get_position()), 'velocity': [velocity.x, velocity.y]}
+
+
+def _encode_thing(thing) -> dict:
+    """(dict) Returns the JSON-able form of a dropped item or mob"""
+    data = _encode_motion(thing)
+
+    if isinstance(thing, DroppedItem):
+        data['type'] = 'item'
+        data['stack'] = _encode_stack(Stack(thing.get_item(), 1))
+    else:
+        data['type'] = 'mob'
+        data['class'] = thing.__class__.__name__
+        data['id'] = thing.get_id()
+        data['size'] = list(thing.get_size())
+        data['health'] = thing.get_health()
+
+    return data
+
+
+def _get_dynamic_things(world: World):
+    """Yields each dropped item & mob in 'world', including those in suspended chunks"""
+    for thing in world.get_non_block_things():
+        if isinstance(thing, (DroppedItem, Mob)):
+            yield thing
+
+
+def encode_side_section(world: World, player: Player, hot_bar: Grid, inventory: Grid,
+                        chunk_hitpoints: Dict[Tuple[int, int], Dict[int, float]]) -> bytes:
+    """(bytes) Returns the encoded side section of a save file
+
+    Parameters:
+        chunk_hitpoints (dict<tuple<int, int>, dict<int, float>>):
+                Mapping of chunk position to the hitpoints of its damaged blocks
+    """
+    side = {
+        'palette': [list(factory_id) for factory_id in list(world.get_palette())[1:]],
+        'hitpoints': {f"{column},{row}": hitpoints for (column, row), hitpoints in chunk_hitpoints.items()
+                      if hitpoints},
+        'player': dict(_encode_motion(player), health=player.get_health(), food=player.get_food()),
+        'things': [_encode_thing(thing) for thing in _get_dynamic_things(world)],
+        'hot_bar': _encode_grid(hot_bar),
+        'inventory': _encode_grid(inventory),
+    }
+
+    return json.dumps(side, separators=(',', ':')).encode('utf-8')
+
+
+def save_game(path: str, world: World, player: Player, hot_bar: Grid, inventory: Grid):
+    """Saves the game to a new save file at 'path', replacing any existing file atomically
+
+    Parameters:
+        path (str): The path of the save file
+        world (World): The world to save, including all of its chunks & dynamic things
+        player (Player): The player to save
+        hot_bar (Grid): The player's hotbar
+        inventory (Grid): The player's inventory
+    """
+    grid_size = world.get_grid_size()
+    chunk_size = world.get_chunk_size()
+
+    # everything is about to be written, so nothing remains dirty
+    world.take_dirty_chunks()
+
+    records = bytearray(_chunk_count(grid_size, chunk_size) * _chunk_record_size(chunk_size))
+    chunk_hitpoints = {}
+
+    for chunk in world.get_chunks():
+        cells, hitpoints = chunk.encode(world.get_palette())
+
+        offset = _chunk_offset(chunk.get_position(), grid_size, chunk_size) - HEADER.size
+        records[offset:offset + _chunk_record_size(chunk_size)] = _to_little_endian(cells)
+        chunk_hitpoints[chunk.get_position()] = hitpoints
+
+    # encoding chunks may grow the palette, so the side section must be encoded last
+    side = encode_side_section(world, player, hot_bar, inventory, chunk_hitpoints)
+
+    columns, rows = grid_size
+    header = HEADER.pack(SAVE_MAGIC, SAVE_VERSION, chunk_size, columns, rows, world.get_cell_expanse(),
+                         HEADER.size + len(records), len(side))
+
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'wb') as file:
+        file.write(header)
+        file.write(records)
+        file.write(side)
+
+    os.replace(temporary_path, path)
+
+
+class SaveFile:
+    """A memory-mapped save file, from which chunks are read on demand"""
+
+    def __init__(self, path: str):
+        """Opens & memory-maps the save file at 'path'
+
+        Raises:
+            ValueError: if the file is not a save file, or is of an unsupported version
+        """
+        self._path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, self._chunk_size, columns, rows, self._cell_expanse,
+         side_offset, side_length) = HEADER.unpack_from(self._map, 0)
+
+        if magic != SAVE_MAGIC:
+            self.close()
+            raise ValueError(f"{path!r} is not a Ninedraft save file")
+
+        if version != SAVE_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported save file version {version} in {path!r}")
+
+        self._grid_size = columns, rows
+        self._side = json.loads(self._map[side_offset:side_offset + side_length].decode('utf-8'))
+
+        self._hitpoints = {}
+        for position, hitpoints in self._side['hitpoints'].items():
+            column, row = position.split(',')
+            self._hitpoints[int(column), int(row)] = {int(index): value for index, value in hitpoints.items()}
+
+    def get_path(self) -> str:
+        """(str) Returns the path of this save file"""
+        return self._path
+
+    def get_grid_size(self) -> Tuple[int, int]:
+        """(tuple<int, int>) Returns the (column, row) size of the saved world's grid"""
+        return self._grid_size
+
+    def get_chunk_size(self) -> int:
+        """(int) Returns the width/height of each chunk in the saved world, in cells"""
+        return self._chunk_size
+
+    def get_cell_expanse(self) -> int:
+        """(int) Returns the expanse (width/height) of each grid cell in the saved world"""
+        return self._cell_expanse
+
+    def get_palette(self) -> BlockPalette:
+        """(BlockPalette) Returns a new copy of the saved world's block palette"""
+        return BlockPalette(tuple(factory_id) for factory_id in self._side['palette'])
+
+    def get_side_data(self) -> dict:
+        """(dict) Returns the decoded side section"""
+        return self._side
+
+    def read_chunk(self, position: Tuple[int, int]) -> CompactCells:
+        """Reads the compact form of the saved chunk at 'position'; a chunk.ChunkLoader
+
+        Return:
+            tuple<array, dict<int, float>>: (palette indices, hitpoints of damaged blocks)
+        """
+        offset = _chunk_offset(position, self._grid_size, self._chunk_size)
+
+        cells = array(PALETTE_TYPECODE)
+        cells.frombytes(self._map[offset:offset + _chunk_record_size(self._chunk_size)])
+
+        if sys.byteorder == 'big':
+            cells.byteswap()
+
+        return cells, dict(self._hitpoints.get(position, {}))
+
+    def close(self):
+        """Closes this save file; chunks that have not yet been read can no longer be loaded"""
+        self._map.close()
+        self._file.close()
+
+
+def read_header(path: str) -> tuple:
+    """Reads the header of the save file at 'path'
+
+    Return:
+        tuple: (magic, version, chunk size, grid columns, grid rows, cell expanse,
+                side section offset, side section length); see HEADER
+    """
+    with open(path, 'rb') as file:
+        return HEADER.unpack(file.read(HEADER.size))
+
+
+class Autosaver:
+    """Incrementally saves a game to an existing save file at a regular interval
+
+    Only the chunks that have changed since the last save (see World.take_dirty_chunks) are
+    rewritten, in place, along with the side section. Changes are gathered on the calling
+    thread, which is cheap, while all file writing happens on a background thread.
+    """
+
+    def __init__(self, path: str, world: World, player: Player, hot_bar: Grid, inventory: Grid,
+                 interval: float = 30.):
+        """Constructor
+
+        Parameters:
+            path (str): The path of an existing save file of 'world' (see save_game)
+            world (World): The world to save
+            player (Player): The player to save
+            hot_bar (Grid): The player's hotbar
+            inventory (Grid): The player's inventory
+            interval (float): The minimum time between saves, in seconds
+
+        Raises:
+            ValueError: if the save file's layout doesn't match the world's
+        """
+        magic, version, chunk_size, columns, rows, cell_expanse, side_offset, _ = read_header(path)
+
+        if (magic, version, chunk_size, (columns, rows)) != (SAVE_MAGIC, SAVE_VERSION, world.get_chunk_size(),
+                                                              world.get_grid_size()):
+            raise ValueError(f"Save file {path!r} does not match the layout of {world!r}")
+
+        self._path = path
+        self._world = world
+        self._player = player
+        self._hot_bar = hot_bar
+        self._inventory = inventory
+        self._interval = interval
+
+        self._header = (magic, version, chunk_size, columns, rows, cell_expanse)
+        self._side_offset = side_offset
+
+        # Hitpoints of damaged blocks in every chunk that has been written since loading;
+        # hitpoints of other chunks are carried over from the save file's side section
+        with open(path, 'rb') as file:
+            file.seek(side_offset)
+            side = json.loads(file.read().decode('utf-8'))
+
+        self._hitpoints = {}
+        for position, hitpoints in side['hitpoints'].items():
+            column, row = position.split(',')
+            self._hitpoints[int(column), int(row)] = hitpoints
+
+        self._last_save = time.time()
+
+        self._writes = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="autosave", daemon=True)
+        self._writer.start()
+
+    def tick(self):
+        """Saves the game if at least 'interval' seconds have passed since the last save
+
+        Should be called regularly, e.g. once per frame"""
+        if time.time() - self._last_save >= self._interval:
+            self.save()
+
+    def save(self):
+        """Gathers the changes since the last save & queues them to be written in the background"""
+        self._last_save = time.time()
+
+        chunk_size = self._world.get_chunk_size()
+        grid_size = self._world.get_grid_size()
+
+        records = []
+        for position in self._world.take_dirty_chunks():
+            cells, hitpoints = self._world.get_chunk(position).encode(self._world.get_palette())
+
+            records.append((_chunk_offset(position, grid_size, chunk_size), _to_little_endian(cells)))
+            self._hitpoints[position] = dict(hitpoints)
+
+        side = encode_side_section(self._world, self._player, self._hot_bar, self._inventory, self._hitpoints)
+
+        self._writes.put((records, side))
+
+    def _write_loop(self):
+        """Writes queued changes to the save file, until None is queued"""
+        while True:
+            write = self._writes.get()
+
+            if write is None:
+                return
+
+            records, side = write
+
+            try:
+                with open(self._path, 'r+b') as file:
+                    for offset, data in records:
+                        file.seek(offset)
+                        file.write(data)
+
+                    file.seek(self._side_offset)
+                    file.write(side)
+                    file.truncate()
+
+                    file.seek(0)
+                    file.write(HEADER.pack(*self._header, self._side_offset, len(side)))
+            except OSError as error:
+                print(f"Autosave to {self._path!r} failed: {error}")
+            finally:
+                self._writes.task_done()
+
+    def flush(self):
+        """Blocks until all queued changes have been written"""
+        self._writes.join()
+
+    def close(self):
+        """Saves any remaining changes, and stops the background thread once they're written"""
+        self.save()
+        self._writes.put(None)
+        self._writer.join()
+
+
+def load_game(path: str, block_factory: Callable, item_factory: ItemFactory,
+              mob_classes: Dict[str, type], **world_options) -> SavedGame:
+    """Loads a game from the save file at 'path'
+
+    The world's chunks are read from the memory-mapped file only once they are first needed,
+    so the returned save file must be kept open for as long as the world is in use
+
+    Parameters:
+        path (str): The path of the save file
+        block_factory (callable): Creates a block from its factory id, e.g. app.create_block
+        item_factory (callable): Creates an item from its factory id, e.g. app.create_item
+        mob_classes (dict<str, type>): Mapping of class name to each Mob subclass that may be saved
+        world_options: Keyword arguments for World; grid size, cell expanse, chunk size, palette
+                       & loading are determined by the save file
+
+    Return:
+        SavedGame: The (world, player, hot_bar, inventory, save_file)
+    """
+    save_file = SaveFile(path)
+    side = save_file.get_side_data()
+
+    world = World(save_file.get_grid_size(), save_file.get_cell_expanse(), chunk_size=save_file.get_chunk_size(),
+                  palette=save_file.get_palette(), chunk_loader=save_file.read_chunk,
+                  block_factory=block_factory, **world_options)
+
+    player = Player()
+    world.add_player(player, *side['player']['position'])
+    player.set_velocity(side['player']['velocity'])
+    player.change_health(side['player']['health'] - player.get_health())
+    player.change_food(side['player']['food'] - player.get_food())
+
+    for data in side['things']:
+        if data['type'] == 'item':
+            thing = DroppedItem(_decode_stack(data['stack'], item_factory).get_item())
+            world.add_item(thing, *data['position'])
+        else:
+            thing = mob_classes[data['class']](data['id'], tuple(data['size']))
+            world.add_mob(thing, *data['position'])
+            thing.change_health(data['health'] - thing.get_health())
+
+        thing.set_velocity(data['velocity'])
+
+    world.update_active_chunks(*player.get_position())
+
+    hot_bar = _decode_grid(side['hot_bar'], item_factory, grid_class=SelectableGrid)
+    inventory = _decode_grid(side['inventory'], item_factory)
+
+    return SavedGame(world, player, hot_bar, inventory, save_file)
@@ -0,0 +1,772 @@
+"""
+Headless games of Ninedraft, which can be driven without any user interface
+
+A GameSession owns a game's world, player, hotbar & inventory, and implements the player's
+actions (mining, attacking, using & placing). It can be stepped as fast as possible or at a
+target rate, with input taken from a script; e.g. for load testing, bots, or server-side
+simulation on machines without a display.
+
+All randomness in a session (world generation, mob movement, mining luck & drops) comes from
+its seeded random number generator, so a session can be recorded (see InputRecorder) & replayed
+exactly, given the same seed & input at the same ticks.
+
+Run as a script to simulate a game headlessly:
+    python -m session --ticks 600 --script input.json
+    python -m session --seed 1 --record game.json
+    python -m session --replay game.json
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import shutil
+import time
+from typing import Callable, Iterable, List, Tuple
+
+import numpy as np
+import pymunk
+
+from chunk import BlockPalette, Chunk
+from content import (BLOCK_SIZE, GRID_WIDTH, GRID_HEIGHT, CHUNK_SIZE, SPAWN_CHUNK_RADIUS, WORLD_OPTIONS,
+                     MOB_CLASSES, TERRAIN_GENERATORS, DEFAULT_TERRAIN, GameData, create_block, create_item,
+                     load_simple_world)
+from core import positions_in_range
+from dropped_item import DroppedItem
+from generator import TerrainGenerator, TerrainLoader, generate_chunks
+from grid import Grid, SelectableGrid, Stack
+from item import Item, SimpleItem
+from player import Player
+from savefile import SaveFile, load_game
+from world import World
+
+# Names of the GameSession methods that are player input (see GameSession.perform)
+ACTIONS = {'move', 'jump', 'primary_action', 'secondary_action', 'select_hotbar_slot', 'run_effect'}
+
+# A scripted input: (tick, action, arguments), where action is one of ACTIONS and
+# is performed with arguments just before the given tick
+ScriptedInput = Tuple[int, str, list]
+
+RECORDING_VERSION = 1
+
+
+class InputRecorder:
+    """Compactly records the input to a session, from its first tick, so that it can be replayed
+
+    A recording consists of the session's seed (& save file, if it was loaded, or else the terrain &
+    size of its world), the number of
+    fixed time steps taken by each tick (run-length encoded, since this is almost always 1),
+    and each action performed, with the tick it was performed before.
+    """
+
+    def __init__(self, seed: int, save_path: str = None, terrain: str = DEFAULT_TERRAIN,
+                 grid_size: Tuple[int, int] = None):
+        """Constructor
+
+        Parameters:
+            seed (int): The seed of the recorded session's random number generator
+            save_path (str): The save file that the recorded session was loaded from, if any
+            terrain (str): The name of the generator of the recorded session's world, if it's new
+                           (see content.TERRAIN_GENERATORS)
+            grid_size (tuple<int, int>): The (column, row) size of the recorded session's world
+        """
+        self._seed = seed
+        self._save_path = save_path
+        self._terrain = terrain
+        self._grid_size = grid_size
+
+        # [substeps, number of consecutive ticks with that many substeps]
+        self._frames = []
+        self._inputs = []
+
+    def record_input(self, tick: int, action: str, arguments: tuple):
+        """Records that 'action' was performed with 'arguments' before 'tick'"""
+        self._inputs.append([tick, action, list(arguments)])
+
+    def record_tick(self, substeps: int):
+        """Records a tick that took 'substeps' fixed time steps"""
+        if self._frames and self._frames[-1][0] == substeps:
+            self._frames[-1][1] += 1
+        else:
+            self._frames.append([substeps, 1])
+
+    def to_json(self) -> dict:
+        """(dict) Returns this recording as JSON-serialisable data"""
+        return {
+            'version': RECORDING_VERSION,
+            'seed': self._seed,
+            'save': self._save_path,
+            'terrain': self._terrain,
+            'grid_size': list(self._grid_size) if self._grid_size is not None else None,
+            'frames': self._frames,
+            'inputs': self._inputs,
+        }
+
+    def save(self, path: str):
+        """Writes this recording to a JSON file at 'path'"""
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_json(), file, separators=(',', ':'))
+
+
+class GameSession:
+    """A game of Ninedraft: a world, its player, and the player's hotbar & inventory"""
+
+    def __init__(self, world: World, player: Player, hot_bar: SelectableGrid, inventory: Grid,
+                 seed: int, rng: random.Random = None, save_file: SaveFile = None, terrain: str = DEFAULT_TERRAIN):
+        """Constructor
+
+        Parameters:
+            world (World): The game world, which 'player' has been added to
+            player (Player): The player
+            hot_bar (SelectableGrid): The player's hotbar
+            inventory (Grid): The player's inventory
+            seed (int): The seed of this session's random number generator
+            rng (random.Random): This session's random number generator, if it has already been
+                                 used (e.g. to generate the world); defaults to one seeded with 'seed'
+            save_file (SaveFile): The save file that the world's chunks are loaded from, if any,
+                                  which is kept open for as long as this session
+            terrain (str): The name of the generator of the world's terrain, if it's new (see
+                           content.TERRAIN_GENERATORS)
+        """
+        self._world = world
+        self._player = player
+        self._hot_bar = hot_bar
+        self._inventory = inventory
+        self._save_file = save_file
+        self._terrain = terrain
+
+        self._seed = seed
+        self._rng = rng if rng is not None else random.Random(seed)
+
+        self._hands = create_item('hands')
+        self._data = GameData(world, player, self._rng)
+
+        self._recorder = None
+
+        # Called with the craft type of each crafting effect; crafting requires a user interface
+        self._crafting_handler = None
+
+        self._ticks = 0
+
+        self._world.add_collision_handler("player", "item", on_begin=self._handle_player_collide_item)
+
+    def get_world(self) -> World:
+        """(World) Returns the game world"""
+        return self._world
+
+    def get_player(self) -> Player:
+        """(Player) Returns the player"""
+        return self._player
+
+    def get_hot_bar(self) -> SelectableGrid:
+        """(SelectableGrid) Returns the player's hotbar"""
+        return self._hot_bar
+
+    def get_inventory(self) -> Grid:
+        """(Grid) Returns the player's inventory"""
+        return self._inventory
+
+    def get_game_data(self) -> GameData:
+        """(GameData) Returns the game data passed to World.step"""
+        return self._data
+
+    def get_ticks(self) -> int:
+        """(int) Returns the number of times this session has been stepped"""
+        return self._ticks
+
+    def get_seed(self) -> int:
+        """(int) Returns the seed of this session's random number generator"""
+        return self._seed
+
+    def start_recording(self, save_copy_path: str = None) -> InputRecorder:
+        """(InputRecorder) Starts recording the input to this session
+
+        If this session was loaded from a save file, its recording can only be replayed while
+        that save file is unchanged. Since the save file may be changed (e.g. by autosaving),
+        it can first be copied, so that the recording refers to the copy instead.
+
+        Parameters:
+            save_copy_path (str): Where to copy the save file that this session was loaded from,
+                                  or None to refer to the save file itself
+
+        Raises:
+            ValueError: if this session has already been stepped
+        """
+        if self._ticks:
+            raise ValueError("Recording must start before a session is first stepped")
+
+        save_path = self._save_file.get_path() if self._save_file is not None else None
+
+        if save_path is not None and save_copy_path is not None:
+            shutil.copyfile(save_path, save_copy_path)
+            save_path = save_copy_path
+
+        self._recorder = InputRecorder(self._seed, save_path, self._terrain, self._world.get_grid_size())
+        return self._recorder
+
+    def get_recorder(self) -> InputRecorder:
+        """(InputRecorder) Returns the recorder of this session's input, or None if it isn't recorded"""
+        return self._recorder
+
+    def get_digest(self) -> str:
+        """(str) Returns a digest of this session's state, for checking that a replay matches
+        what was recorded"""
+        digest = hashlib.sha256()
+
+        player = self._player
+        digest.update(repr((tuple(player.get_position()), tuple(player.get_velocity()),
+                            player.get_health(), player.get_food())).encode())
+
+        # blocks are digested by the factory ids of each chunk's cells, so that compact blocks
+        # needn't be materialised; chunks that haven't been loaded yet are still as they were
+        # generated or saved, so are left out
+        world = self._world
+        palette = world.get_palette()
+        for chunk in sorted(world.get_chunks(), key=Chunk.get_position):
+            if not chunk.is_loaded():
+                continue
+
+            cells, hitpoints = chunk.encode(palette)
+            digest.update(repr((chunk.get_position(), [palette.get_factory_id(index) for index in cells],
+                                sorted(hitpoints.items()))).encode())
+
+        for thing in world.get_non_block_things():
+            digest.update(repr((thing, tuple(thing.get_position()))).encode())
+
+        digest.update(repr(list(self._hot_bar.items())).encode())
+        digest.update(repr(list(self._inventory.items())).encode())
+
+        return digest.hexdigest()
+
+    def set_crafting_handler(self, handler: Callable[[str], None]):
+        """Sets the callback for crafting effects, which is called with the craft type
+        (e.g. 'basic' or 'crafting_table'); crafting effects are ignored if this is None"""
+        self._crafting_handler = handler
+
+    def perform(self, action: str, *arguments):
+        """Performs a player action (i.e. input), recording it if this session is being recorded
+
+        Parameters:
+            action (str): The name of the method to call; one of ACTIONS
+            arguments: The arguments to call it with
+
+        Raises:
+            ValueError: if action isn't one of ACTIONS
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action {action!r}")
+
+        if self._recorder is not None:
+            self._recorder.record_input(self._ticks, action, arguments)
+
+        getattr(self, action)(*arguments)
+
+    def step(self, time_delta: float = None, substeps: int = None) -> int:
+        """Advances the game by one tick
+
+        Parameters:
+            time_delta (float): The time elapsed since the last tick (see World.step)
+            substeps (int): If not None, the exact number of fixed time steps to take (see World.step)
+
+        Return:
+            int: The number of fixed time steps taken
+        """
+        self._world.update_active_chunks(*self._player.get_position())
+        substeps = self._world.step(self._data, time_delta, substeps=substeps)
+        self._ticks += 1
+
+        if self._recorder is not None:
+            self._recorder.record_tick(substeps)
+
+        return substeps
+
+    def run(self, ticks: int, rate: float = None, script: Iterable[ScriptedInput] = ()) -> float:
+        """Steps this session 'ticks' times, applying scripted input along the way
+
+        Parameters:
+            ticks (int): The number of ticks to run for
+            rate (float): The target number of ticks per second, or None to step as fast as
+                          possible. Either way, each tick simulates exactly one fixed time step
+            script (iterable<tuple<int, str, list>>): (tick, action, arguments) scripted inputs,
+                   in order of tick, where tick counts from the start of this session
+
+        Return:
+            float: The time taken, in seconds
+
+        Raises:
+            ValueError: if the script includes an action that isn't in ACTIONS
+        """
+        script = sorted(script, key=lambda scripted: scripted[0])
+        for _, action, _ in script:
+            if action not in ACTIONS:
+                raise ValueError(f"Unknown scripted action {action!r}")
+
+        start = time.perf_counter()
+        next_input = 0
+
+        for tick in range(ticks):
+            while next_input < len(script) and script[next_input][0] <= self._ticks:
+                _, action, arguments = script[next_input]
+                self.perform(action, *arguments)
+                next_input += 1
+
+            self.step(substeps=1)
+
+            if rate is not None:
+                delay = start + (tick + 1) / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+        return time.perf_counter() - start
+
+    def get_holding(self) -> Tuple[Item, Item]:
+        """(tuple<Item, Item>) Returns the (active, effective) items held by the player
+
+        The active item is the item selected in the hotbar (or the player's hands), and the
+        effective item is the item that is used to attack with"""
+        active_stack = self._hot_bar.get_selected_value()
+        active_item = active_stack.get_item() if active_stack else self._hands
+
+        effective_item = active_item if active_item.can_attack() else self._hands
+
+        return active_item, effective_item
+
+    def is_in_range(self, x: float, y: float) -> bool:
+        """(bool) Returns True iff the point ('x', 'y') is within range of the item the player holds"""
+        active_item, effective_item = self.get_holding()
+
+        pixel_range = active_item.get_attack_range() * self._world.get_cell_expanse()
+
+        return positions_in_range(self._player.get_position(), (x, y), pixel_range)
+
+    def select_hotbar_slot(self, slot: int):
+        """Selects the hotbar slot in column 'slot'"""
+        self._hot_bar.select((0, slot))
+
+    def move(self, dx: float, dy: float):
+        """Accelerates the player in the direction ('dx', 'dy')"""
+        velocity = self._player.get_velocity()
+        self._player.set_velocity((velocity.x + dx * 80, velocity.y + dy * 80))
+
+    def jump(self):
+        """Makes the player jump"""
+        velocity = self._player.get_velocity()
+
+        xvel = velocity[0] * 0.5
+        yvel = velocity[1] - 150
+
+        self._player.set_velocity((xvel, yvel))
+
+    def primary_action(self, x: float, y: float):
+        """Mines the block, or otherwise attacks the thing, at the point ('x', 'y'), if it is in range"""
+        if not self.is_in_range(x, y):
+            return
+
+        block = self._world.get_block(x, y)
+        if block:
+            self.mine_block(block, x, y)
+        else:
+            target = self._world.get_thing(x, y)
+            if target:
+                self.attack_mob(target, x, y)
+
+    def secondary_action(self, x: float, y: float):
+        """Uses the thing at the point ('x', 'y'), or otherwise places the active item there
+
+        Raises:
+            NotImplementedError: if the active item drops more than one thing when placed, or
+                                 would place a block into an occupied cell
+            KeyError: if the active item drops something of an unknown category when placed
+        """
+        target = self._world.get_thing(x, y)
+
+        if target:
+            # use this thing
+            print(f'using {target}')
+            effect = target.use()
+            print(f'used {target} and got {effect}')
+
+            if effect:
+                self.run_effect(effect)
+
+            return
+
+        # place active item
+        selected = self._hot_bar.get_selected()
+
+        if not selected:
+            return
+
+        stack = self._hot_bar[selected]
+        drops = stack.get_item().place()
+        print(f"Stack: {stack}, Drops: {drops}, GetItem: {stack.get_item()}")
+
+        stack.subtract(1)
+        if stack.get_quantity() == 0:
+            # remove from hotbar
+            self._hot_bar[selected] = None
+
+        if not drops:
+            return
+
+        # handling multiple drops would be somewhat finicky, so prevent it
+        if len(drops) > 1:
+            raise NotImplementedError("Cannot handle dropping more than 1 thing")
+
+        drop_category, drop_types = drops[0]
+
+        if drop_category == "block":
+            if not self.is_in_range(x, y):
+                # If trying to place outside range
+                return
+            existing_block = self._world.get_block(x, y)
+
+            if not existing_block:
+                self._world.add_block(create_block(drop_types[0]), x, y)
+            else:
+                raise NotImplementedError(
+                    "Automatically placing a block nearby if the target cell is full is not yet implemented")
+
+        elif drop_category == "effect":
+            self.run_effect(drop_types)
+
+        else:
+            raise KeyError(f"Unknown drop category {drop_category}")
+
+    def run_effect(self, effect):
+        """Applies an effect, such as ('food', 2) or ('crafting', 'basic')
+
+        Raises:
+            KeyError: if no effect is defined for 'effect'
+        """
+        if len(effect) == 2:
+            if effect[0] == "crafting":
+                craft_type = effect[1]
+
+                if craft_type == "basic":
+                    print("Can't craft much on a 2x2 grid :/")
+
+                elif craft_type == "crafting_table":
+                    print("Let's get our kraft® on! King of the brands")
+
+                if self._crafting_handler is not None:
+                    self._crafting_handler(craft_type)
+                return
+
+            elif effect[0] in ("food", "health"):
+                print(f"Effect: {effect}, Effect[0]: {effect[0]}")
+                stat, strength = effect
+
+                if self._player.get_food() < self._player.get_max_food():
+                    effect_to_change = "food"
+                else:
+                    effect_to_change = "health"
+                getattr(self._player, f"change_{effect_to_change}")(strength)
+
+                print(f"Gaining {strength} {effect_to_change}!")
+                return
+
+        raise KeyError(f"No effect defined for {effect}")
+
+    def mine_block(self, block, x: float, y: float):
+        """Mines 'block' with the item the player holds, removing it & dropping its drops if it breaks
+
+        Raises:
+            KeyError: if the block drops something of an unknown category
+        """
+        luck = self._rng.random()
+        active_item, effective_item = self.get_holding()
+
+        was_item_suitable, was_attack_successful = block.mine(effective_item, active_item, luck)
+        self._world.mark_block_changed(block)
+
+        effective_item.attack(was_attack_successful)
+
+        food_decrease_factor = -1
+        health_decrease_factor = -1
+
+        if block.is_mined():
+            if self._player.get_food() > 0:
+                # If the player still has food, decrease the food
+                self._player.change_food(food_decrease_factor)
+            else:
+                # If the player does not have food left, then decrease their health
+                self._player.change_health(health_decrease_factor)
+
+            drops = block.get_drops(luck, was_item_suitable)
+            self._world.remove_block(block)
+
+            if not drops:
+                return
+
+            self._drop(drops, block.get_position(), x, y)
+
+    def attack_mob(self, mob, x: float, y: float):
+        """Attacks 'mob', dropping its drops
+
+        Raises:
+            KeyError: if the mob drops something of an unknown category
+        """
+        self._drop(mob.get_drops(), mob.get_position(), x, y)
+
+    def _drop(self, drops: List[tuple], origin: Tuple[float, float], x: float, y: float):
+        """Adds 'drops' to the world: items are scattered around 'origin', and blocks are placed at
+        the point ('x', 'y')"""
+        x0, y0 = origin
+
+        for i, (drop_category, drop_types) in enumerate(drops):
+            print(f'Dropped {drop_category}, {drop_types}')
+
+            if drop_category == "item":
+                physical = DroppedItem(create_item(*drop_types))
+
+                # this is so bleh
+                x = x0 - BLOCK_SIZE // 2 + 5 + (i % 3) * 11 + self._rng.randint(0, 2)
+                y = y0 - BLOCK_SIZE // 2 + 5 + ((i // 3) % 3) * 11 + self._rng.randint(0, 2)
+
+                self._world.add_item(physical, x, y)
+            elif drop_category == "block":
+                self._world.add_block(create_block(*drop_types), x, y)
+            else:
+                raise KeyError(f"Unknown drop category {drop_category}")
+
+    def _handle_player_collide_item(self, player: Player, dropped_item: DroppedItem, data,
+                                    arbiter: pymunk.Arbiter):
+        """Callback to handle collision between the player and a (dropped) item. If the player has sufficient space in
+        their to pick up the item, the item will be removed from the game world.
+
+        Parameters:
+            player (Player): The player that was involved in the collision
+            dropped_item (DroppedItem): The (dropped) item that the player collided with
+            data (dict): data that was added with this collision handler (see data parameter in
+                         World.add_collision_handler)
+            arbiter (pymunk.Arbiter): Data about a collision
+                                      (see http://www.pymunk.org/en/latest/pymunk.html#pymunk.Arbiter)
+        Return:
+             bool: False (always ignore this type of collision)
+                   (more generally, collision callbacks return True iff the collision should be considered valid; i.e.
+                   returning False makes the world ignore the collision)
+        """
+        item = dropped_item.get_item()
+
+        if self._hot_bar.add_item(item):
+            print(f"Added 1 {item!r} to the hotbar")
+        elif self._inventory.add_item(item):
+            print(f"Added 1 {item!r} to the inventory")
+        else:
+            print(f"Found 1 {item!r}, but both hotbar & inventory are full")
+            return True
+
+        self._world.remove_item(dropped_item)
+        return False
+
+
+def _find_spawn(generator: TerrainGenerator, grid_size: Tuple[int, int], seed: int) -> Tuple[int, int]:
+    """(tuple<int, int>) Returns the (column, row) of the cell above the highest block in the middle
+    column of the world generated by 'generator', or of its top cell if the column is empty"""
+    columns, rows = grid_size
+    column = columns // 2
+
+    occupied = np.flatnonzero(generator.generate(grid_size, seed, (column, 0, 1, rows)).cells[:, 0])
+    return column, max((occupied[0] if len(occupied) else rows) - 1, 0)
+
+
+def new_session(seed: int = None, terrain: str = DEFAULT_TERRAIN, grid_size: Tuple[int, int] = None,
+                **world_options) -> GameSession:
+    """(GameSession) Returns a new game, in a world generated by the named terrain generator
+
+    The simple world is hand-made, & also has mobs (see content.load_simple_world); in any other
+    world, the player starts above the middle column. If only the chunks near the player are active,
+    those within SPAWN_CHUNK_RADIUS columns of chunks of the player are generated as the game
+    starts, & the rest once they're first needed; otherwise, the whole world is generated at once.
+    Either way, the terrain generated at once is split between worker processes when it's large
+    enough & there are enough processors (see generator.generate_regions).
+
+    Parameters:
+        seed (int): The seed for the session's random number generator, or None for a random seed
+        terrain (str): The name of the world's terrain generator (see content.TERRAIN_GENERATORS)
+        grid_size (tuple<int, int>): The (column, row) size of the world's grid; defaults to
+                                     (GRID_WIDTH, GRID_HEIGHT)
+        world_options: Keyword arguments for World; defaults to WORLD_OPTIONS
+
+    Raises:
+        ValueError: if there is no terrain generator named 'terrain'
+    """
+    if terrain not in TERRAIN_GENERATORS:
+        raise ValueError(f"Unknown terrain {terrain!r}; expected one of {sorted(TERRAIN_GENERATORS)}")
+
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    rng = random.Random(seed)
+
+    if grid_size is None:
+        grid_size = GRID_WIDTH, GRID_HEIGHT
+
+    grid_size = tuple(grid_size)
+    options = world_options or WORLD_OPTIONS
+
+    if terrain == 'simple':
+        world = World(grid_size, BLOCK_SIZE, chunk_size=CHUNK_SIZE, block_factory=create_block, **options)
+        load_simple_world(world, rng)
+        spawn = 250, 150
+    else:
+        generator = TERRAIN_GENERATORS[terrain]()
+        column, row = _find_spawn(generator, grid_size, seed)
+
+        if options.get('active_chunk_radius') is None:
+            world = World(grid_size, BLOCK_SIZE, chunk_size=CHUNK_SIZE, block_factory=create_block, **options)
+            generate_chunks(world, generator, seed)
+        else:
+            palette = BlockPalette()
+            loader = TerrainLoader(generator, grid_size, CHUNK_SIZE, seed, palette)
+
+            # every chunk within SPAWN_CHUNK_RADIUS columns of chunks of the spawn
+            first = max(column // CHUNK_SIZE - SPAWN_CHUNK_RADIUS, 0)
+            last = min(column // CHUNK_SIZE + SPAWN_CHUNK_RADIUS, (grid_size[0] - 1) // CHUNK_SIZE)
+            loader.pregenerate((i, j) for i in range(first, last + 1) for j in range(-(-grid_size[1] // CHUNK_SIZE)))
+
+            world = World(grid_size, BLOCK_SIZE, chunk_size=CHUNK_SIZE, block_factory=create_block, palette=palette,
+                          chunk_loader=loader, **options)
+
+        spawn = world.grid_to_xy_centre(column, row)
+
+    player = Player()
+    world.add_player(player, *spawn)
+
+    hot_bar = SelectableGrid(rows=1, columns=10)
+    hot_bar.select((0, 0))
+
+    starting_hotbar = [
+        Stack(create_item("dirt"), 20),
+        Stack(create_item("apple"), 4),
+        Stack(create_item("crafting_table"), 1)
+    ]
+
+    for i, item in enumerate(starting_hotbar):
+        hot_bar[0, i] = item
+
+    starting_inventory = [
+        ((1, 5), Stack(Item('dirt'), 10)),
+        ((0, 2), Stack(Item('wood'), 10)),
+        ((0, 0), Stack(SimpleItem('coal'), 4)),
+    ]
+
+    inventory = Grid(rows=3, columns=10)
+    for position, stack in starting_inventory:
+        inventory[position] = stack
+
+    return GameSession(world, player, hot_bar, inventory, seed, rng=rng, terrain=terrain)
+
+
+def load_session(path: str, seed: int = None, **world_options) -> GameSession:
+    """(GameSession) Returns the game saved in the save file at 'path' (see savefile.load_game)
+
+    Parameters:
+        seed (int): The seed for the session's random number generator, or None for a random seed
+        world_options: Keyword arguments for World; defaults to WORLD_OPTIONS
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+
+    saved = load_game(path, create_block, create_item, MOB_CLASSES, **(world_options or WORLD_OPTIONS))
+    return GameSession(saved.world, saved.player, saved.hot_bar, saved.inventory, seed,
+                       save_file=saved.save_file)
+
+
+def replay(path: str, **world_options) -> GameSession:
+    """(GameSession) Replays the recording at 'path' (see InputRecorder) as fast as possible,
+    returning the session in the state it was recorded in
+
+    Parameters:
+        world_options: Keyword arguments for World, which must match those of the recorded
+                       session; defaults to WORLD_OPTIONS
+
+    Raises:
+        ValueError: if the recording is of an unsupported version
+    """
+    with open(path, encoding='utf-8') as file:
+        recording = json.load(file)
+
+    if recording['version'] != RECORDING_VERSION:
+        raise ValueError(f"Cannot replay version {recording['version']} recordings")
+
+    if recording['save'] is not None:
+        session = load_session(recording['save'], recording['seed'], **world_options)
+    else:
+        session = new_session(recording['seed'], recording.get('terrain', DEFAULT_TERRAIN),
+                              recording.get('grid_size'), **world_options)
+
+    inputs = recording['inputs']
+    next_input = 0
+
+    for substeps, count in recording['frames']:
+        for _ in range(count):
+            while next_input < len(inputs) and inputs[next_input][0] <= session.get_ticks():
+                _, action, arguments = inputs[next_input]
+                session.perform(action, *arguments)
+                next_input += 1
+
+            session.step(substeps=substeps)
+
+    # input after the last tick
+    for _, action, arguments in inputs[next_input:]:
+        session.perform(action, *arguments)
+
+    return session
+
+
+def load_script(path: str) -> List[ScriptedInput]:
+    """(list<tuple<int, str, list>>) Reads scripted input from the JSON file at 'path'
+
+    The file holds a list of [tick, action, arguments] entries; e.g.
+        [[0, "move", [1, 0]], [30, "jump", []], [45, "primary_action", [100, 300]]]
+    """
+    with open(path, encoding='utf-8') as file:
+        return [(tick, action, arguments) for tick, action, arguments in json.load(file)]
+
+
+def main():
+    """Simulates a game headlessly, printing how long it took"""
+    parser = argparse.ArgumentParser(description="Simulate a game of Ninedraft without a user interface")
+    parser.add_argument('--ticks', type=int, default=600, help="number of ticks to simulate")
+    parser.add_argument('--rate', type=float, default=None,
+                        help="target ticks per second (default: as fast as possible)")
+    parser.add_argument('--script', default=None, help="JSON file of [tick, action, arguments] input")
+    parser.add_argument('--load', default=None, help="save file to load the game from")
+    parser.add_argument('--seed', type=int, default=None, help="seed for the game's random number generator")
+    parser.add_argument('--terrain', choices=sorted(TERRAIN_GENERATORS), default=DEFAULT_TERRAIN,
+                        help="generator of a new game's world")
+    parser.add_argument('--size', type=int, nargs=2, default=None, metavar=('COLUMNS', 'ROWS'),
+                        help="size of a new game's world, in cells")
+    parser.add_argument('--record', default=None, help="file to record the game's input to")
+    parser.add_argument('--replay', default=None, help="recording to replay, instead of simulating a new game")
+    args = parser.parse_args()
+
+    if args.replay:
+        start = time.perf_counter()
+        session = replay(args.replay)
+        elapsed = time.perf_counter() - start
+    else:
+        if args.load:
+            session = load_session(args.load, args.seed)
+        else:
+            session = new_session(args.seed, args.terrain, args.size)
+
+        if args.record:
+            session.start_recording(save_copy_path=f"{args.record}.sav")
+
+        script = load_script(args.script) if args.script else ()
+        elapsed = session.run(args.ticks, rate=args.rate, script=script)
+
+        if args.record:
+            session.get_recorder().save(args.record)
+
+    ticks = session.get_ticks()
+    print(f"Simulated {ticks} ticks in {elapsed:.3f}s ({ticks / elapsed:.1f} ticks/s)")
+    print(f"Player is at {tuple(session.get_player().get_position())}, "
+          f"with {session.get_player().get_health()} health & {session.get_player().get_food()} food")
+    print(f"State digest: {session.get_digest()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -24,3 +24,6 @@ def execute(cmd):
 
 for path in execute([sys.executable, "-m", "pip", "install", "pymunk"]):
     print(path, end="")
+
+for path in execute([sys.executable, "-m", "pip", "install", "numpy"]):
+    print(path, end="")
@@ -1,16 +1,13 @@
-from mob import Mob, Bird
-from game import WorldViewRouter, BoundaryWall
+from mob import Mob
 import cmath
-import random
-from block import Block, TrickCandleFlameBlock, ResourceBlock
-from dropped_item import DroppedItem
-from player import Player
 
 
 SHEEP_GRAVITY_FACTOR = 0
 SHEEP_X_SCALE=1.61803
 
 class Sheep(Mob):
+    __slots__ = ()
+
     def step(self, time_delta, game_data):
         """Advance this bird by one time step
 
@@ -20,7 +17,7 @@ class Sheep(Mob):
             # a random point on a movement circle (radius=tempo), scaled by the percentage
             # of health remaining
             health_percentage = self._health / self._max_health
-            z = cmath.rect(self._tempo * health_percentage, random.uniform(0, 2 * cmath.pi))
+            z = cmath.rect(self._tempo * health_percentage, game_data.rng.uniform(0, 2 * cmath.pi))
 
             # stretch that random point onto an ellipse that is wider on the x-axis
             dx, dy = z.real * SHEEP_X_SCALE, z.imag
@@ -34,20 +31,3 @@ class Sheep(Mob):
 
     def get_drops(self):
         return[('item', ("wool",))]
-
-class mobRouter(WorldViewRouter):
-    _routing_table = [
-        # (class, method name)
-        (Block, '_draw_block'),
-        (TrickCandleFlameBlock, '_draw_mayhem_block'),
-        (DroppedItem, '_draw_physical_item'),
-        (Player, '_draw_player'),
-        (Bird, '_draw_bird'),
-        (BoundaryWall, '_draw_undefined'),
-        (None.__class__, '_draw_undefined'),
-        (Sheep, '_draw_sheep')
-    ]
-
-    def _draw_sheep(self, instance, shape, view):
-        return [view.create_oval(shape.bb.left, shape.bb.top, shape.bb.right, shape.bb.bottom,
-                                 fill='white', tags=('mob', 'sheep'))]
\ No newline at end of file
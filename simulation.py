@@ -0,0 +1,134 @@
+"""
+Runs a world's simulation on a worker thread, decoupled from the tkinter render loop
+
+The worker thread steps the world at its own tick rate and, after each tick, publishes an
+immutable snapshot of where things are, which the tkinter thread draws from. Input is applied
+to the world by submitting commands, which the worker thread runs between ticks.
+"""
+
+import queue
+import threading
+import time
+import traceback
+from collections import namedtuple
+from typing import Callable, Tuple
+
+from session import GameSession
+
+# Immutable state of a world after a tick, for drawing
+#   tick (int): The number of ticks completed
+#   player_position (tuple<float, float>): The position of the player
+#   things (tuple<tuple<PhysicalThing, tuple<float, float, float, float>>>):
+#       (thing, (left, top, right, bottom) bounding box) for each non-block thing in the viewport
+WorldSnapshot = namedtuple('WorldSnapshot', ['tick', 'player_position', 'things'])
+
+# A command is run on the simulation thread between ticks, with no arguments
+Command = Callable[[], None]
+
+
+class SimulationThread(threading.Thread):
+    """Steps a world on a worker thread, at a fixed tick rate
+
+    Whenever the simulation thread uses the world, it holds 'lock'. Any other thread must also
+    hold 'lock' while it reads the world (or anything changed by stepping it), or else submit
+    a command instead.
+    """
+
+    def __init__(self, session: GameSession, interval: float, after_tick: Command = None):
+        """Constructor
+
+        Parameters:
+            session (GameSession): The game to simulate
+            interval (float): The time between ticks, in seconds
+            after_tick (callable): If not None, called on the simulation thread after each tick
+                                   (while holding 'lock'), e.g. to autosave
+        """
+        super().__init__(name="simulation", daemon=True)
+
+        self.lock = threading.RLock()
+
+        self._session = session
+        self._world = world = session.get_world()
+        self._player = player = session.get_player()
+        self._interval = interval
+        self._after_tick = after_tick
+
+        self._commands = queue.Queue()
+        self._stopped = threading.Event()
+
+        # (left, top, right, bottom) rectangle of the world to snapshot things from
+        self._viewport = (0, 0) + world.get_pixel_size()
+
+        self._snapshot = WorldSnapshot(0, player.get_position(), ())
+
+    def submit(self, command: Command):
+        """Runs 'command' on the simulation thread, before the next tick
+
+        May be called from any thread. Any exception raised by 'command' is printed, rather
+        than stopping the simulation"""
+        self._commands.put(command)
+
+    def get_snapshot(self) -> WorldSnapshot:
+        """(WorldSnapshot) Returns the snapshot published after the latest tick"""
+        return self._snapshot
+
+    def set_viewport(self, viewport: Tuple[float, float, float, float]):
+        """Sets the (left, top, right, bottom) rectangle of the world that snapshots include
+        things from"""
+        self._viewport = viewport
+
+    def stop(self):
+        """Stops the simulation after the current tick, & waits for it to finish"""
+        self._stopped.set()
+
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
+
+    def run(self):
+        next_tick = time.perf_counter()
+        tick = 0
+
+        while not self._stopped.is_set():
+            with self.lock:
+                self._run_commands()
+
+                self._session.step()
+
+                if self._after_tick is not None:
+                    self._after_tick()
+
+                tick += 1
+                self._snapshot = self._take_snapshot(tick)
+
+            # Ticks are scheduled relative to when they should have started; if the simulation
+            # falls behind, the world catches up on lost time with fixed steps instead
+            next_tick += self._interval
+            delay = next_tick - time.perf_counter()
+
+            if delay > 0:
+                self._stopped.wait(delay)
+            else:
+                next_tick = time.perf_counter()
+
+    def _run_commands(self):
+        """Runs every command submitted since the last tick"""
+        while True:
+            try:
+                command = self._commands.get_nowait()
+            except queue.Empty:
+                return
+
+            try:
+                command()
+            except Exception:
+                traceback.print_exc()
+
+    def _take_snapshot(self, tick: int) -> WorldSnapshot:
+        """(WorldSnapshot) Returns a snapshot of the world's current state"""
+        things = []
+
+        for thing in self._world.get_things_in_rect(*self._viewport, include_blocks=False):
+            bb = thing.get_shape().bb
+            things.append((thing, (bb.left, bb.top, bb.right, bb.bottom)))
+
+        return WorldSnapshot(tick, tuple(self._player.get_position()), tuple(things))
@@ -0,0 +1,9 @@
+"""
+Configures pytest for Ninedraft's tests, which import the game's modules from the top level of
+the repository, however pytest is run
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,106 @@
+"""
+Tests for matching crafting recipes, wherever they're placed on a grid & with their flags
+(see recipes.py & crafting.GridCrafter)
+"""
+
+import pytest
+
+from crafting import GridCrafter
+from grid import Stack
+from item import Item
+from recipes import MIRRORED, SHAPELESS, trim_pattern
+
+STICKS = Stack(Item('stick'), 4)
+AXE = Stack(Item('wood_axe'), 1)
+TORCH = Stack(Item('torch'), 4)
+BED = Stack(Item('bed'), 1)
+
+RECIPES = [
+    ((('wood', None),
+      ('wood', None)), STICKS),
+    ((('wood', 'wood'),
+      ('wood', 'stick'),
+      (None, 'stick')), AXE, {MIRRORED}),
+    ((('coal', 'stick'),), TORCH, {SHAPELESS}),
+    # too large for a 2x2 crafter, so ignored by one
+    ((('wool', 'wool', 'wool'),
+      ('wood', 'wood', 'wood')), BED),
+]
+
+
+def get_result(crafter, pattern):
+    recipe = crafter.find_match(pattern)
+    return recipe and recipe[1]
+
+
+def test_trim_pattern():
+    assert trim_pattern(((None, None, None),
+                         (None, 'wood', None),
+                         (None, 'stick', 'coal'))) == (('wood', None), ('stick', 'coal'))
+    assert trim_pattern((('wood',),)) == (('wood',),)
+    assert trim_pattern(((None, None), (None, None))) == ()
+
+
+@pytest.mark.parametrize('pattern', [
+    (('wood', None, None), ('wood', None, None), (None, None, None)),
+    ((None, None, None), (None, None, 'wood'), (None, None, 'wood')),
+    ((None, 'wood', None), (None, 'wood', None), (None, None, None)),
+])
+def test_match_anywhere(pattern):
+    assert get_result(GridCrafter(RECIPES, 3, 3), pattern) is STICKS
+
+
+def test_mirrored():
+    crafter = GridCrafter(RECIPES, 3, 3)
+
+    assert get_result(crafter, (('wood', 'wood', None),
+                                ('wood', 'stick', None),
+                                (None, 'stick', None))) is AXE
+    assert get_result(crafter, ((None, 'wood', 'wood'),
+                                (None, 'stick', 'wood'),
+                                (None, 'stick', None))) is AXE
+    # turned upside down is neither the pattern nor its mirror image
+    assert get_result(crafter, ((None, 'stick', None),
+                                ('wood', 'stick', None),
+                                ('wood', 'wood', None))) is None
+
+
+def test_not_mirrored():
+    crafter = GridCrafter([(((None, 'wood'), ('wood', 'wood')), STICKS)])
+
+    assert get_result(crafter, ((None, 'wood'), ('wood', 'wood'))) is STICKS
+    assert get_result(crafter, (('wood', None), ('wood', 'wood'))) is None
+
+
+@pytest.mark.parametrize('pattern', [
+    (('coal', 'stick'), (None, None)),
+    (('stick', 'coal'), (None, None)),
+    (('stick', None), (None, 'coal')),
+    ((None, 'coal'), (None, 'stick')),
+])
+def test_shapeless(pattern):
+    assert get_result(GridCrafter(RECIPES), pattern) is TORCH
+
+
+def test_shapeless_needs_exact_ingredients():
+    crafter = GridCrafter(RECIPES)
+
+    assert get_result(crafter, (('coal', 'stick'), ('coal', None))) is None
+    assert get_result(crafter, (('coal', None), (None, None))) is None
+
+
+def test_too_large_ignored():
+    assert get_result(GridCrafter(RECIPES, 3, 3), (('wool', 'wool', 'wool'),
+                                                   ('wood', 'wood', 'wood'),
+                                                   (None, None, None))) is BED
+    # the recipe doesn't fit, but sticks still match
+    assert get_result(GridCrafter(RECIPES), (('wood', None), ('wood', None))) is STICKS
+
+
+@pytest.mark.parametrize('recipe', [
+    (((None, None),), STICKS),
+    ((('wood',),), STICKS, {'rotated'}),
+])
+def test_invalid_recipes(recipe):
+    with pytest.raises(ValueError):
+        GridCrafter([recipe])
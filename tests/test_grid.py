@@ -0,0 +1,82 @@
+"""
+Tests for adding items to a Grid, against the original implementation of Grid.add_items, which
+searched the whole grid for stacks & empty cells
+"""
+
+import random
+
+import pytest
+
+from grid import Grid, Stack
+from item import Item
+
+# Items of a few ids, with small stacks so that stacks fill up
+ITEMS = [Item('dirt', 4), Item('wood', 3), Item('stone', 5)]
+
+
+def add_items_baseline(grid: Grid, stack: Stack):
+    """(Stack) Adds 'stack' to 'grid' as Grid.add_items originally did, returning what remains"""
+    for position, this_stack in grid.items():
+        if this_stack and this_stack.matches(stack):
+            this_stack.absorb(stack)
+            if stack.get_quantity() == 0:
+                break
+
+    if stack:
+        for position, this_stack in grid.items():
+            if this_stack is None:
+                grid[position] = this_stack = Stack(stack.get_item(), 0)
+                this_stack.absorb(stack)
+            if stack.get_quantity() == 0:
+                break
+
+    if stack and stack.get_quantity() > 0:
+        return stack
+
+
+def get_contents(grid: Grid):
+    """(list) Returns the (position, item id, quantity) of each stack in 'grid'"""
+    return [(position, stack.get_item().get_id(), stack.get_quantity())
+            for position, stack in grid.items() if stack]
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_add_items_matches_baseline(seed):
+    rng = random.Random(seed)
+    grid, baseline = Grid(rows=2, columns=3), Grid(rows=2, columns=3)
+
+    for _ in range(60):
+        if rng.random() < .7:
+            item = rng.choice(ITEMS)
+            quantity = rng.randint(1, item.get_max_stack_size())
+
+            remaining = grid.add_items(Stack(item, quantity))
+            baseline_remaining = add_items_baseline(baseline, Stack(item, quantity))
+
+            assert (remaining and remaining.get_quantity()) == \
+                   (baseline_remaining and baseline_remaining.get_quantity())
+        else:
+            # take some or all of a stack, or clear a cell, as the player does
+            position = rng.randrange(2), rng.randrange(3)
+            if rng.random() < .5:
+                grid.pop(position)
+                baseline.pop(position)
+            elif grid[position]:
+                taken = rng.randint(1, grid[position].get_quantity())
+                grid[position].subtract(taken)
+                baseline[position].subtract(taken)
+
+        assert get_contents(grid) == get_contents(baseline)
+
+
+def test_add_item_to_full_grid():
+    grid = Grid(rows=1, columns=2)
+
+    assert grid.add_items(Stack(ITEMS[0], 4)) is None
+    assert grid.add_items(Stack(ITEMS[1], 2)) is None
+
+    remaining = grid.add_items(Stack(ITEMS[0], 3))
+    assert remaining.get_quantity() == 3
+    assert not grid.add_item(ITEMS[2])
+    assert grid.add_item(ITEMS[1])
+    assert get_contents(grid) == [((0, 0), 'dirt', 4), ((0, 1), 'wood', 3)]
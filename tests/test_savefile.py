@@ -0,0 +1,48 @@
+"""
+Tests for saving a game & loading it again (see savefile.py)
+"""
+
+import pytest
+
+from content import WORLD_OPTIONS
+from savefile import SaveFile, save_game
+from session import new_session, load_session
+
+
+def save_session(session, path):
+    save_game(path, session.get_world(), session.get_player(), session.get_hot_bar(), session.get_inventory())
+
+
+def get_stacks(grid):
+    return [(position, stack.get_item().get_id(), stack.get_quantity()) for position, stack in grid.items() if stack]
+
+
+@pytest.mark.parametrize('terrain, grid_size', [('simple', None), ('noise', (96, 48))])
+@pytest.mark.parametrize('compact_blocks', [False, True])
+def test_round_trip(tmp_path, terrain, grid_size, compact_blocks):
+    options = dict(WORLD_OPTIONS, compact_blocks=compact_blocks)
+    session = new_session(3, terrain, grid_size, **options)
+    session.perform('move', 1, 0)
+    session.run(120)
+
+    path, resaved_path = tmp_path / 'game.sav', tmp_path / 'resaved.sav'
+    save_session(session, path)
+    loaded = load_session(path, **options)
+
+    assert loaded.get_world().get_grid_size() == session.get_world().get_grid_size()
+    assert tuple(loaded.get_player().get_position()) == tuple(session.get_player().get_position())
+    assert loaded.get_player().get_health() == session.get_player().get_health()
+    assert get_stacks(loaded.get_hot_bar()) == get_stacks(session.get_hot_bar())
+    assert get_stacks(loaded.get_inventory()) == get_stacks(session.get_inventory())
+
+    # everything that was saved is loaded, so saving again gives the same file
+    save_session(loaded, resaved_path)
+    assert resaved_path.read_bytes() == path.read_bytes()
+
+
+def test_not_a_save_file(tmp_path):
+    path = tmp_path / 'game.sav'
+    path.write_bytes(b'not a save file' * 10)
+
+    with pytest.raises(ValueError):
+        SaveFile(path)
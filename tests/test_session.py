@@ -0,0 +1,76 @@
+"""
+Tests for recording the input to a game & replaying it (see session.py)
+"""
+
+import pytest
+
+from content import WORLD_OPTIONS
+from savefile import save_game
+from session import new_session, load_session, replay
+
+# (tick, action, arguments) input to each recorded game
+SCRIPT = [
+    (0, 'move', [1, 0]),
+    (20, 'jump', []),
+    (40, 'move', [-1, 0]),
+    (60, 'select_hotbar_slot', [1]),
+    (80, 'primary_action', [260, 180]),
+    (90, 'move', [0, 0]),
+]
+
+
+def record(session, path, ticks=120):
+    """(GameSession) Runs 'session' with SCRIPT, recording its input to 'path'"""
+    session.start_recording(save_copy_path=f"{path}.sav")
+    session.run(ticks, script=SCRIPT)
+    session.get_recorder().save(path)
+    return session
+
+
+@pytest.mark.parametrize('terrain, grid_size', [('simple', None), ('noise', (128, 48))])
+@pytest.mark.parametrize('compact_blocks', [False, True])
+def test_replay_new_game(tmp_path, terrain, grid_size, compact_blocks):
+    options = dict(WORLD_OPTIONS, compact_blocks=compact_blocks)
+    path = tmp_path / 'game.json'
+    session = record(new_session(3, terrain, grid_size, **options), path)
+
+    assert replay(path, **options).get_digest() == session.get_digest()
+
+
+def test_replay_loaded_game(tmp_path):
+    session = new_session(5)
+    session.run(60)
+    save_path = tmp_path / 'game.sav'
+    save_game(save_path, session.get_world(), session.get_player(), session.get_hot_bar(),
+              session.get_inventory())
+
+    path = tmp_path / 'game.json'
+    recorded = record(load_session(save_path, 7), path)
+
+    # the recording refers to a copy of the save file, so it can still be replayed once the
+    # game is saved over
+    save_game(save_path, recorded.get_world(), recorded.get_player(), recorded.get_hot_bar(),
+              recorded.get_inventory())
+
+    assert replay(path).get_digest() == recorded.get_digest()
+
+
+def test_digest_changes_with_input(tmp_path):
+    moved, still = new_session(3), new_session(3)
+    moved.run(60, script=SCRIPT)
+    still.run(60)
+
+    assert moved.get_digest() != still.get_digest()
+
+
+def test_recording_starts_before_stepping():
+    session = new_session(3)
+    session.step()
+
+    with pytest.raises(ValueError):
+        session.start_recording()
+
+
+def test_unknown_terrain():
+    with pytest.raises(ValueError):
+        new_session(3, 'caves')
@@ -0,0 +1,86 @@
+"""
+Tests for adding blocks to a World in bulk (see World.add_cells_bulk)
+"""
+
+import numpy as np
+import pytest
+
+from chunk import PALETTE_DTYPE
+from content import BLOCK_SIZE, create_block
+from world import World
+
+# (columns, rows) size of each test world; chunks are 4x4, so cells span several chunks
+GRID_SIZE = 12, 8
+CHUNK_SIZE = 4
+
+FACTORY_IDS = [None, ('dirt',), ('stone',)]
+
+
+# Keyword arguments for World: blocks in every chunk, compact blocks, & chunks suspended (i.e.
+# holding cells instead of blocks) until they're near the player, of which there is none
+WORLD_OPTIONS = {
+    'blocks': {'mesh_blocks': True},
+    'compact': {'mesh_blocks': True, 'compact_blocks': True},
+    'suspended': {'mesh_blocks': True, 'active_chunk_radius': 1},
+}
+
+
+def create_world(options='blocks'):
+    return World(GRID_SIZE, BLOCK_SIZE, chunk_size=CHUNK_SIZE, block_factory=create_block,
+                 **WORLD_OPTIONS[options])
+
+
+def get_factory_ids(world):
+    """(dict<tuple<int, int>, tuple>) Returns the factory id of the block in each occupied cell,
+    whether or not its chunk is active"""
+    palette = world.get_palette()
+    factory_ids = {}
+
+    for chunk in world.get_chunks():
+        left, top = chunk.get_origin()
+        cells, _ = chunk.encode(palette)
+
+        for index, palette_index in enumerate(cells):
+            if palette_index:
+                row, column = divmod(index, CHUNK_SIZE)
+                factory_ids[left + column, top + row] = palette.get_factory_id(palette_index)
+
+    return factory_ids
+
+
+@pytest.mark.parametrize('options', sorted(WORLD_OPTIONS))
+def test_add_cells_bulk(options):
+    world = create_world(options)
+    cells = np.zeros((3, 6), PALETTE_DTYPE)
+    cells[0] = 1
+    cells[2, 1:5] = 2
+
+    world.add_cells_bulk(cells, FACTORY_IDS, column=2, row=3)
+
+    expected = {(2 + i, 3): ('dirt',) for i in range(6)}
+    expected.update({(3 + i, 5): ('stone',) for i in range(4)})
+    assert get_factory_ids(world) == expected
+
+
+@pytest.mark.parametrize('options', sorted(WORLD_OPTIONS))
+def test_add_cells_bulk_rolls_back_when_occupied(options):
+    world = create_world(options)
+    world.add_block_to_grid(create_block('wood'), 9, 6)
+    before = get_factory_ids(world)
+
+    # the occupied cell is in the last chunk that the cells span, so other chunks come first
+    cells = np.ones((4, 8), PALETTE_DTYPE)
+    with pytest.raises(ValueError):
+        world.add_cells_bulk(cells, FACTORY_IDS, column=2, row=3)
+
+    assert get_factory_ids(world) == before
+
+
+@pytest.mark.parametrize('position', [(-1, 0), (0, -1), (7, 0), (0, 6)])
+def test_add_cells_bulk_outside_grid(position):
+    world = create_world()
+
+    with pytest.raises(ValueError):
+        world.add_cells_bulk(np.ones((3, 6), PALETTE_DTYPE), FACTORY_IDS, *position)
+
+    assert get_factory_ids(world) == {}
@@ -1,14 +1,14 @@
 from item import Item, TOOL_DURABILITIES
 
 class ToolItem(Item):
+    __slots__ = ('_tool_type', '_durability', '_tool_material', '_max_durability')
+
     def __init__(self, item_id: str, tool_type: str, durability: float):
         super().__init__(id_ = item_id, max_stack=1)
         self._tool_type = tool_type
         self._durability = durability
-        
-        self._tool_materials = TOOL_DURABILITIES.keys()
 
-        for material in self._tool_materials:
+        for material in TOOL_DURABILITIES:
             if material in self._tool_type:
                 # Check if valid tool material, could subtract the tool_type string from item_id
                 # But that does not check if it is a valid tool.
@@ -19,8 +19,14 @@ class ToolItem(Item):
     def get_type(self):
         return self._tool_type
     
+    def get_factory_id(self):
+        return self._id, self._tool_material
+
     def get_durability(self):
         return self._durability
+
+    def set_durability(self, durability: float):
+        self._durability = durability
     
     def can_attack(self):
         if self.get_durability() != 0:
@@ -7,15 +7,19 @@ __version__ = "1.1.0"
 __date__ = "26/04/2019"
 __copyright__ = "The University of Queensland, 2019"
 
+import numpy as np
 import pymunk
 import time
-from typing import Tuple, Iterable
+from typing import Tuple, Iterable, List
 
 from physical_thing import BoundaryWall, PhysicalThing
 from player import Player
 from dropped_item import DroppedItem
 from block import Block
 from mob import Mob
+from mesher import greedy_rectangles, greedy_rectangles_from_keys
+from chunk import Chunk, BlockPalette, PALETTE_DTYPE
+from profiler import NULL_PROFILER
 
 # The intention with the following constants is to express a finite range of values that
 # can effectively be treated as their own type in this code. We have used collections of
@@ -66,7 +70,9 @@ class World:
     """
 
     def __init__(self, grid_size, cell_expanse, gravity=(0, 300), boundary_thickness=50,
-                 collision_types=None, thing_categories=None):
+                 collision_types=None, thing_categories=None, fixed_time_step=None, max_substeps=5,
+                 mesh_blocks=False, chunk_size=16, active_chunk_radius=None, block_factory=None,
+                 palette=None, chunk_loader=None, compact_blocks=False):
         """Creates a new world with four boundary walls
 
         Parameters:
@@ -80,6 +86,41 @@ class World:
             thing_categories (dict<str: int>):
                     Mapping of thing categories to unique powers of 2
                     Defaults to PHYSZICAL_THING_CATEGORIES constant
+            fixed_time_step (float):
+                    If not None, the world is advanced in fixed time steps of this many seconds,
+                    regardless of how much time passes between calls to step
+            max_substeps (int):
+                    The maximum number of fixed time steps taken by a single call to step; any
+                    further elapsed time is discarded, rather than trying to catch up on it
+            mesh_blocks (bool):
+                    If True, blocks do not collide individually; instead, contiguous blocks are
+                    merged into a few large collision shapes (see mesher.py). Blocks still
+                    remain the source of truth for mining, rendering & queries
+            chunk_size (int):
+                    The width/height of each square chunk of cells (see chunk.py). When meshing,
+                    each chunk is meshed independently, so changing a cell only rebuilds the
+                    shapes of its chunk
+            active_chunk_radius (int):
+                    If not None, only chunks within this many chunks of the point given to
+                    update_active_chunks are active; all others are suspended
+            block_factory (callable):
+                    Creates a block from its factory id (see Block.get_factory_id), e.g.
+                    app.create_block. Required to recreate the blocks of suspended chunks
+            palette (BlockPalette): The palette used to encode the blocks of suspended chunks
+            chunk_loader (callable):
+                    If not None, every chunk starts suspended, & reads its compact form from
+                    this loader on demand (see chunk.ChunkLoader & savefile.py). Palette
+                    indices are interpreted with 'palette'
+            compact_blocks (bool):
+                    If True, active chunks also keep their cells as palette indices, rather than
+                    holding a Block for every cell (see chunk.Chunk). A block is only created
+                    (materialised) when it's asked for, e.g. by get_block, & is kept until its
+                    chunk is suspended. Requires mesh_blocks & a block_factory. Friction isn't
+                    kept in compact form, so every block has a friction of 1
+
+        Raises:
+            ValueError: if active_chunk_radius, chunk_loader or compact_blocks is given without a
+                        block_factory, or compact_blocks is given without mesh_blocks
 
         """
         if collision_types is None:
@@ -99,8 +140,55 @@ class World:
 
         self._pixel_size = tuple(grid * cell_expanse for grid in grid_size)
 
+        if (active_chunk_radius is not None or chunk_loader is not None) and block_factory is None:
+            raise ValueError("A block_factory is required to suspend chunks")
+
+        if compact_blocks and (block_factory is None or not mesh_blocks):
+            raise ValueError("Compact blocks require a block_factory & mesh_blocks")
+
+        # Blocks are indexed by cell within dense chunks, so that cell-aligned lookups never
+        # need to query the physics engine
+        columns, rows = grid_size
+        self._chunk_size = chunk_size
+        self._compact_blocks = compact_blocks
+        self._chunks = {(i, j): Chunk((i, j), chunk_size, loader=chunk_loader, compact=compact_blocks)
+                        for i in range(-(-columns // chunk_size))
+                        for j in range(-(-rows // chunk_size))}
+        self._active_chunks = set() if chunk_loader else set(self._chunks)
+
+        self._active_chunk_radius = active_chunk_radius
+        self._block_factory = block_factory
+        self._palette = palette if palette is not None else BlockPalette()
+        # A shapeless block for each palette index, created on demand (see get_sample_block)
+        self._sample_blocks = {}
+        # The chunk containing the last point given to update_active_chunks
+        self._focus_chunk = None
+        # Positions of chunks whose blocks have changed since take_dirty_chunks was last called
+        self._dirty_chunks = set()
+
+        # Things that need to be stepped each time step, in insertion order
+        # (dict is used as an ordered set); static blocks & walls are never added
+        self._stepped_things = {}
+
+        self._mesh_blocks = mesh_blocks
+
+        # Times the phases of each step (see set_profiler)
+        self._profiler = NULL_PROFILER
+
         self._create_boundaries(boundary_thickness)
 
+        if chunk_loader is not None and active_chunk_radius is None:
+            # nothing will ever be suspended, so there's nothing to gain by loading lazily
+            self._activate_chunks(list(self._chunks.values()))
+
+        self._fixed_time_step = fixed_time_step
+        self._max_substeps = max_substeps
+
+        # Elapsed time that has not yet been simulated, in seconds
+        self._accumulator = 0.
+        # Positions of stepped things before the latest fixed time step, for interpolation
+        self._previous_positions = {}
+
         self._last_time = time.time()
 
     def _create_boundaries(self, thickness):
@@ -147,28 +235,108 @@ class World:
         """Returns the expanse (width/height) of each grid cell"""
         return self._cell_expanse
 
-    def step(self, game_data):
+    def step(self, game_data, time_delta=None, substeps=None):
         """Steps the game world forward by one time step
 
         1. Advances all things in the game world forward by one time step
-            step method is called on each thing, with:
+            step method is called on each steppable thing (see PhysicalThing.is_steppable), with:
                 - time_delta: the time (in seconds) since the last step
                 - game_data: the game_data parameter supplied to this method
         2. Applies/resolves physics
 
+        If this world has a fixed time step, the elapsed time is instead accumulated, and the
+        world is advanced by as many whole fixed time steps as have elapsed (at most
+        max_substeps). The leftover fraction of a time step is available from
+        get_interpolation_alpha.
+
         Parameters:
-            game_data (app.GameData): Arbitrary data to be passed on to all things
+            game_data (content.GameData): Arbitrary data to be passed on to all things
+            time_delta (float): The time (in seconds) to advance by, or None to use the
+                                wall-clock time elapsed since the previous step
+            substeps (int): If not None, this world (which must have a fixed time step) is
+                            advanced by exactly this many fixed time steps, regardless of the
+                            time elapsed; e.g. to replay a recorded game (see session.py)
+
+        Return:
+            int: The number of time steps that were simulated
+
+        Raises:
+            ValueError: if substeps is given, but this world doesn't have a fixed time step
         """
         now = time.time()
-        time_delta = now - self._last_time
-        for shape in self._space.shapes:
-            thing = shape.object
+        if time_delta is None:
+            time_delta = now - self._last_time
+        self._last_time = now
+
+        if self._fixed_time_step is None:
+            if substeps is not None:
+                raise ValueError("Only worlds with a fixed time step can be advanced by substeps")
+
+            self._advance(time_delta, game_data)
+            return 1
+
+        step_size = self._fixed_time_step
+
+        if substeps is None:
+            self._accumulator += time_delta
+            substeps = min(int(self._accumulator // step_size), self._max_substeps)
+            self._accumulator -= substeps * step_size
 
-            if thing:
+            if self._accumulator >= step_size:
+                # Too far behind to catch up; drop the excess rather than spiralling
+                self._accumulator %= step_size
+
+        for _ in range(substeps):
+            self._previous_positions = {thing: thing.get_position() for thing in self._stepped_things}
+            self._advance(step_size, game_data)
+
+        return substeps
+
+    def _advance(self, time_delta, game_data):
+        """Advances all steppable things & the physics simulation by 'time_delta' seconds"""
+        with self._profiler.phase('entities'):
+            # copied, since things may be removed from the world while stepping
+            for thing in list(self._stepped_things):
                 thing.step(time_delta, game_data)
 
-        self._space.step(time_delta)
-        self._last_time = now
+        with self._profiler.phase('physics'):
+            self._space.step(time_delta)
+
+    def set_profiler(self, profiler):
+        """Times the phases of each step with 'profiler' (see profiler.Profiler): stepping things
+        ('entities'), physics ('physics') and collision callbacks ('collisions', during physics)
+
+        Parameters:
+            profiler (Profiler): The profiler to use, or None to stop profiling
+        """
+        self._profiler = profiler if profiler is not None else NULL_PROFILER
+
+    def get_fixed_time_step(self):
+        """(float) Returns the fixed time step of this world, or None if it steps by elapsed time"""
+        return self._fixed_time_step
+
+    def get_interpolation_alpha(self) -> float:
+        """(float) Returns the fraction [0, 1) of a fixed time step that has elapsed but not yet been
+        simulated; 0 if this world does not have a fixed time step"""
+        if self._fixed_time_step is None:
+            return 0.
+        return self._accumulator / self._fixed_time_step
+
+    def get_interpolated_position(self, thing: PhysicalThing) -> Tuple[float, float]:
+        """(tuple<float, float>) Returns the (x, y) position of 'thing', interpolated between
+        its position before & after the latest fixed time step by the interpolation alpha
+
+        Useful for rendering smoothly when frames do not line up with fixed time steps"""
+        x, y = thing.get_position()
+        previous = self._previous_positions.get(thing)
+
+        if previous is None:
+            return x, y
+
+        alpha = self.get_interpolation_alpha()
+        previous_x, previous_y = previous
+
+        return previous_x + (x - previous_x) * alpha, previous_y + (y - previous_y) * alpha
 
     def xy_to_grid(self, x: float, y: float) -> Tuple[int, int]:
         """Converts pixel position (xy) to grid position"""
@@ -182,12 +350,18 @@ class World:
         """Converts grid position to pixel position of its centre"""
         return int((x + .5) * self._cell_expanse), int((y + .5) * self._cell_expanse)
 
+    def is_cell_in_grid(self, column: int, row: int) -> bool:
+        """(bool) Returns True iff the cell at ('column', 'row') is within the world grid"""
+        columns, rows = self._grid_size
+        return 0 <= column < columns and 0 <= row < rows
+
     def _wrap_callback(self, callback):
         """Wraps a pymunk collision callback into a more OOP form"""
 
         def wrapped_callback(arbiter, space, data):
             thing_a, thing_b = [s.object for s in arbiter.shapes]
-            return callback(thing_a, thing_b, data['data'], arbiter)
+            with self._profiler.phase('collisions'):
+                return callback(thing_a, thing_b, data['data'], arbiter)
 
         return wrapped_callback
 
@@ -213,19 +387,56 @@ class World:
     def get_all_things(self) -> Iterable[PhysicalThing]:
         """Yields all physical things in this world, including boundary walls
 
+        Blocks are yielded first, followed by all other things in the order they were added.
+        With compact blocks, every block in the active chunks is materialised.
+
+        Yield:
+            PhysicalThing
+        """
+        for position in self._active_chunks:
+            chunk = self._chunks[position]
+
+            if chunk.is_compact():
+                left, top = chunk.get_origin()
+                for column, row, _ in list(chunk.cells()):
+                    yield self.get_block_at_grid(left + column, top + row)
+                continue
+
+            for _, _, block in chunk.blocks():
+                yield block
+
+        for shape in self._space.shapes:
+            thing = shape.object
+
+            if thing and not isinstance(thing, Block):
+                yield thing
+
+    def get_non_block_things(self) -> Iterable[PhysicalThing]:
+        """Yields every physical thing in this world other than blocks, including boundary walls
+
+        Things in the physics space are yielded first, in the order they were added, followed by
+        the dynamic things kept with each suspended chunk. Unlike get_all_things, no blocks are
+        materialised, so this is cheap regardless of the size of the world.
+
         Yield:
             PhysicalThing
         """
         for shape in self._space.shapes:
             thing = shape.object
 
-            if thing:
+            if thing and not isinstance(thing, Block):
                 yield thing
 
+        for chunk in self._chunks.values():
+            yield from chunk.get_suspended_things()
+
     def add_thing(self, thing: PhysicalThing, x: float, y: float, size: Tuple[float, float], collision_type=None,
                   categories=None, mass: float = 1, friction: float = 1):
         """Adds a thing to the game world centred at the position ('x', 'y')
 
+        If the position is within a suspended chunk, the thing is kept with that chunk until
+        it is next activated
+
         Parameters:
             thing (PhysicalThing): The physical thing to add to the game world
             x (float): The x-coordinate at which to place the thing
@@ -258,10 +469,27 @@ class World:
         shape.friction = friction
 
         thing.set_shape(shape)
+
+        column, row = self.xy_to_grid(x, y)
+        chunk = self._chunks.get((column // self._chunk_size, row // self._chunk_size))
+
+        if chunk is not None and not chunk.is_active():
+            # added to the space when its chunk is next activated
+            chunk.add_suspended_thing(thing)
+            return
+
         self._space.add(body, shape)
 
+        self._register_stepped(thing)
+
+    def _register_stepped(self, thing: PhysicalThing):
+        """Registers 'thing' to be stepped each time step, iff it is steppable"""
+        if thing.is_steppable():
+            self._stepped_things[thing] = None
+
     def remove_thing(self, thing: PhysicalThing):
         """Removes a thing from the world"""
+        self._stepped_things.pop(thing, None)
         self._space.remove(thing.get_shape())
 
     def add_player(self, player: Player, x: float, y: float, mass: float = 50, friction: float = .5):
@@ -281,9 +509,11 @@ class World:
 
         self._space.add(body, shape)
 
+        self._register_stepped(player)
+
     def remove_player(self, player: Player):
         """Removes the player from the game world"""
-        self._space.remove(player.get_shape())
+        self.remove_thing(player)
 
     def add_block_to_grid(self, block: Block, column: int, row: int, friction: float = 1.):
         """Adds a block to the game world at the grid cell centred at ('column', 'row')
@@ -293,23 +523,459 @@ class World:
             column (int): The column of the grid cell at which to place the block
             row (int): The row of the grid cell at which to place the block
             friction (float): The friction on the surface of the block
+
+        Raises:
+            ValueError: if the cell is outside the grid, or is already occupied by a block
+        """
+        self.add_blocks_bulk([(block, column, row)], friction=friction)
+
+    def add_blocks_bulk(self, blocks: Iterable[Tuple[Block, int, int]], friction: float = 1.):
+        """Adds many blocks to the game world at once
+
+        Equivalent to calling add_block_to_grid for each block, except that all shapes are
+        registered with the physics space (or mesher) in a single batch
+
+        Blocks placed into a suspended chunk are stored in compact form (see chunk.py), and
+        are recreated by the block factory when that chunk is next activated
+
+        Parameters:
+            blocks (iterable<tuple<Block, int, int>>):
+                    (block, column, row) triples; see add_block_to_grid
+            friction (float): The friction on the surface of each block
+
+        Raises:
+            ValueError: if any cell is outside the grid, or is already occupied by a block;
+                        in which case, no blocks are added
+        """
+        placed = []
+
+        try:
+            for block, column, row in blocks:
+                self._place_block(block, column, row, friction)
+                placed.append((block, column, row))
+        except ValueError:
+            for block, column, row in placed:
+                self._clear_cell(column, row)
+                self._stepped_things.pop(block, None)
+            raise
+
+        active = [(block, column, row) for block, column, row in placed
+                  if self._get_chunk(column, row).is_active()]
+
+        if self._mesh_blocks:
+            for chunk in {self._get_chunk(column, row) for _, column, row in active}:
+                self._rebuild_mesh(chunk)
+        elif active:
+            self._space.add(*(block.get_shape() for block, _, _ in active))
+
+    def add_cells_bulk(self, cells: np.ndarray, factory_ids: List[tuple], column: int = 0, row: int = 0,
+                       friction: float = 1.):
+        """Adds blocks to the game world from an array of cells, all at once (e.g. from a terrain
+        generator; see generator.py)
+
+        Cells are copied directly into chunks that hold them in compact form (i.e. suspended
+        chunks, or all chunks with compact blocks), without creating any blocks. Blocks for all
+        other chunks are created by the block factory & added as by add_blocks_bulk.
+
+        Parameters:
+            cells (np.ndarray): A (rows, columns) array of indices into 'factory_ids', where 0 is
+                                an empty cell, which leaves the cell in the world unchanged
+            factory_ids (list<tuple>): The factory id of the block for each index; the first is
+                                       ignored, since index 0 is empty
+            column (int): The column of the grid cell at which to place the top-left cell
+            row (int): The row of the grid cell at which to place the top-left cell
+            friction (float): The friction on the surface of each block
+
+        Raises:
+            ValueError: if this world has no block_factory, 'cells' doesn't fit within the grid,
+                        or any cell is already occupied by a block; in which case, no blocks are
+                        added
         """
+        if self._block_factory is None:
+            raise ValueError("A block_factory is required to add cells")
+
+        rows, columns = cells.shape
+        grid_columns, grid_rows = self._grid_size
+
+        if column < 0 or row < 0 or column + columns > grid_columns or row + rows > grid_rows:
+            raise ValueError(f"{columns}x{rows} cells at {(column, row)} don't fit within the "
+                             f"{self._grid_size} grid")
+
+        # from the given indices to this world's palette indices
+        lookup = np.array([0] + [self._palette.get_index(tuple(factory_id)) for factory_id in factory_ids[1:]],
+                          dtype=PALETTE_DTYPE)
+        cells = lookup[cells]
+
+        # (chunk, local column, local row, cells) for each chunk that any block is added to
+        size = self._chunk_size
+        regions = []
+
+        for j in range(row // size, (row + rows - 1) // size + 1):
+            for i in range(column // size, (column + columns - 1) // size + 1):
+                chunk = self._chunks[i, j]
+                left, top = chunk.get_origin()
+
+                first_column, first_row = max(left, column), max(top, row)
+                last_column, last_row = min(left + size, column + columns), min(top + size, row + rows)
+
+                region = cells[first_row - row:last_row - row, first_column - column:last_column - column]
+                if region.any():
+                    regions.append((chunk, first_column - left, first_row - top, region))
+
+        # checked beforehand, so that nothing is added if any cell is occupied
+        for chunk, local_column, local_row, region in regions:
+            height, width = region.shape
+
+            if chunk.has_cells():
+                existing = chunk.get_cells()[local_row:local_row + height, local_column:local_column + width]
+                occupied = np.argwhere((existing != 0) & (region != 0)).tolist()
+            else:
+                occupied = [(j, i) for j, i in np.argwhere(region).tolist()
+                            if chunk.get_block(local_column + i, local_row + j) is not None]
+
+            if occupied:
+                left, top = chunk.get_origin()
+                j, i = occupied[0]
+                raise ValueError(f"Cell {(left + local_column + i, top + local_row + j)} is already occupied")
+
+        blocks = []
+
+        for chunk, local_column, local_row, region in regions:
+            left, top = chunk.get_origin()
+            self._dirty_chunks.add(chunk.get_position())
+
+            if not chunk.has_cells():
+                blocks.extend((self._block_factory(*self._palette.get_factory_id(palette_index)),
+                               left + local_column + i, top + local_row + j)
+                              for (j, i), palette_index in zip(np.argwhere(region).tolist(),
+                                                               region[region != 0].tolist()))
+                continue
+
+            chunk.write_cells(local_column, local_row, region)
+
+            if not chunk.is_active():
+                continue
+
+            # blocks that change over time are always materialised, so that they're stepped
+            steppable = [index for index in np.unique(region[region != 0]).tolist()
+                         if self.get_sample_block(index).is_steppable()]
+
+            for j, i in np.argwhere(np.isin(region, steppable)).tolist():
+                self.get_block_at_grid(left + local_column + i, top + local_row + j)
+
+            self._rebuild_mesh(chunk)
+
+        if blocks:
+            self.add_blocks_bulk(blocks, friction=friction)
+
+    def _get_chunk(self, column: int, row: int) -> Chunk:
+        """(Chunk) Returns the chunk containing the cell at ('column', 'row')"""
+        return self._chunks[column // self._chunk_size, row // self._chunk_size]
+
+    def _place_block(self, block: Block, column: int, row: int, friction: float):
+        """Records 'block' in the cell at ('column', 'row'), without adding any shapes to the
+        physics space
+
+        Raises:
+            ValueError: if the cell is outside the grid, or is already occupied by a block
+        """
+        if not self.is_cell_in_grid(column, row):
+            raise ValueError(f"Cell {(column, row)} is outside the {self._grid_size} grid")
+
+        chunk = self._get_chunk(column, row)
+        size = self._chunk_size
+        local_column, local_row = column % size, row % size
+
+        self._dirty_chunks.add(chunk.get_position())
+
+        if chunk.has_cells():
+            if chunk.get_cell(local_column, local_row):
+                raise ValueError(f"Cell {(column, row)} is already occupied")
+
+            chunk.set_cell(local_column, local_row, self._palette.get_index(block.get_factory_id()))
+
+            # blocks that change over time are always materialised, so that they're stepped
+            if chunk.is_active() and block.is_steppable():
+                self._create_block_shape(block, column, row, friction)
+                chunk.set_block(local_column, local_row, block)
+                self._register_stepped(block)
+
+            return
+
+        existing = chunk.get_block(local_column, local_row)
+        if existing is not None:
+            raise ValueError(f"Cell {(column, row)} is already occupied by {existing!r}")
+
+        self._create_block_shape(block, column, row, friction)
+
+        chunk.set_block(local_column, local_row, block)
+        self._register_stepped(block)
+
+    def _clear_cell(self, column: int, row: int):
+        """Empties the cell at ('column', 'row'), without removing any shapes from the physics space"""
+        chunk = self._get_chunk(column, row)
+        size = self._chunk_size
 
+        self._dirty_chunks.add(chunk.get_position())
+
+        if chunk.has_cells():
+            chunk.set_cell(column % size, row % size, 0)
+        else:
+            chunk.set_block(column % size, row % size, None)
+
+    def _create_block_shape(self, block: Block, column: int, row: int, friction: float):
+        """Creates & sets the shape of 'block' in the cell at ('column', 'row')"""
+        shape = self._create_cell_shape(column, row, 1, 1, friction)
+        shape.object = block
+        shape.group = 2
+
+        block.set_shape(shape)
+
+        if self._mesh_blocks:
+            # never added to the space, so its bounding box must be cached manually
+            shape.cache_bb()
+
+    def _create_cell_shape(self, column: int, row: int, width: int, height: int, friction: float):
+        """(pymunk.Poly) Creates a static block shape covering 'width' x 'height' cells, with its
+        top-left cell at ('column', 'row')"""
         left = column * self._cell_expanse
-        right = (column + 1) * self._cell_expanse
+        right = (column + width) * self._cell_expanse
         top = row * self._cell_expanse
-        bottom = (row + 1) * self._cell_expanse
+        bottom = (row + height) * self._cell_expanse
 
         shape = pymunk.Poly(self._space.static_body, [(left, top), (left, bottom), (right, bottom), (right, top)])
-        shape.object = block
-        shape.group = 2
+        shape.object = None
 
         shape.friction = friction
         shape.collision_type = self._collision_types['block']
         shape.filter = pymunk.ShapeFilter(categories=self._thing_categories["block"])
 
-        block.set_shape(shape)
-        self._space.add(shape)
+        return shape
+
+    def _get_mesh_key(self, column: int, row: int):
+        """Returns the key used to decide which cells may be merged by the mesher
+
+        Cells are only merged with cells of equal friction, & empty cells are never covered"""
+        if self._compact_blocks:
+            # friction isn't kept in compact form, so every block has the default friction
+            size = self._chunk_size
+            if self._chunks[column // size, row // size].get_cell(column % size, row % size):
+                return 1.
+            return None
+
+        block = self.get_block_at_grid(column, row)
+
+        if block is not None:
+            return block.get_shape().friction
+
+    def _rebuild_mesh(self, chunk: Chunk):
+        """Replaces the merged collision shapes of the active 'chunk' with ones that match its blocks"""
+        old_shapes = chunk.get_shapes()
+        if old_shapes:
+            self._space.remove(*old_shapes)
+
+        columns, rows = self._grid_size
+        left, top = chunk.get_origin()
+        size = self._chunk_size
+
+        width, height = min(size, columns - left), min(size, rows - top)
+
+        if chunk.is_compact():
+            # every block has the same friction, so cells are only merged by whether they're occupied
+            occupied = chunk.get_cells()[:height, :width] != 0
+
+            if not occupied.any():
+                rectangles = []
+            elif occupied.all():
+                rectangles = [(left, top, width, height)]
+            else:
+                rectangles = greedy_rectangles_from_keys(left, top, np.where(occupied, 1., None).tolist())
+        else:
+            rectangles = greedy_rectangles(left, top, width, height, self._get_mesh_key)
+
+        shapes = []
+        for column, row, span_x, span_y in rectangles:
+            friction = self._get_mesh_key(column, row)
+            shapes.append(self._create_cell_shape(column, row, span_x, span_y, friction))
+
+        if shapes:
+            self._space.add(*shapes)
+
+        chunk.set_shapes(shapes)
+
+    def get_chunk_size(self) -> int:
+        """(int) Returns the width/height of each chunk, in cells"""
+        return self._chunk_size
+
+    def get_chunks(self) -> Iterable[Chunk]:
+        """Yields every chunk in this world, both active & suspended"""
+        yield from self._chunks.values()
+
+    def get_chunks_in_rect(self, left: float, top: float, right: float, bottom: float) -> List[Chunk]:
+        """(list<Chunk>) Returns all active chunks that overlap the rectangle bounded by
+        ('left', 'top') & ('right', 'bottom')"""
+        columns, rows = self._grid_size
+        size = self._chunk_size
+
+        first_column, first_row = self.xy_to_grid(left, top)
+        last_column, last_row = self.xy_to_grid(right, bottom)
+
+        first_column, first_row = max(first_column, 0) // size, max(first_row, 0) // size
+        last_column, last_row = min(last_column, columns - 1) // size, min(last_row, rows - 1) // size
+
+        return [self._chunks[i, j]
+                for i in range(first_column, last_column + 1)
+                for j in range(first_row, last_row + 1)
+                if (i, j) in self._active_chunks]
+
+    def mark_block_changed(self, block: Block):
+        """Records that 'block' has changed in place (e.g. it was damaged), so that its chunk is
+        considered dirty"""
+        column, row = self.xy_to_grid(*block.get_position())
+
+        if self.is_cell_in_grid(column, row):
+            self._dirty_chunks.add(self._get_chunk(column, row).get_position())
+
+    def take_dirty_chunks(self) -> set:
+        """(set<tuple<int, int>>) Returns the positions of all chunks whose blocks have changed since
+        this method was last called, and resets them to clean"""
+        dirty, self._dirty_chunks = self._dirty_chunks, set()
+        return dirty
+
+    def get_chunk(self, position: Tuple[int, int]) -> Chunk:
+        """(Chunk) Returns the chunk at the (column, row) 'position', in chunks"""
+        return self._chunks[position]
+
+    def get_palette(self) -> BlockPalette:
+        """(BlockPalette) Returns the palette used to encode the blocks of suspended chunks"""
+        return self._palette
+
+    def is_compact(self) -> bool:
+        """(bool) Returns True iff this world keeps the cells of active chunks in compact form"""
+        return self._compact_blocks
+
+    def get_sample_block(self, palette_index: int) -> Block:
+        """(Block) Returns a block with the given palette index, shared by all callers, which isn't
+        in this world & has no shape
+
+        Useful for the properties that every block with the same factory id shares (e.g. its
+        colour), without materialising a block for every cell (see compact_blocks)"""
+        block = self._sample_blocks.get(palette_index)
+
+        if block is None:
+            factory_id = self._palette.get_factory_id(palette_index)
+            block = self._sample_blocks[palette_index] = self._block_factory(*factory_id)
+
+        return block
+
+    def update_active_chunks(self, x: float, y: float):
+        """Activates every chunk within the active chunk radius of the point ('x', 'y'), and
+        suspends all other chunks
+
+        Suspended chunks keep their blocks in compact form, and take any dynamic things
+        (except players) within them out of the physics space until they are activated again.
+        Does nothing if this world has no active chunk radius.
+        """
+        if self._active_chunk_radius is None:
+            return
+
+        column, row = self.xy_to_grid(x, y)
+        focus = column // self._chunk_size, row // self._chunk_size
+
+        if focus == self._focus_chunk:
+            return
+
+        self._focus_chunk = focus
+
+        focus_x, focus_y = focus
+        radius = self._active_chunk_radius
+
+        wanted = {(i, j) for i in range(focus_x - radius, focus_x + radius + 1)
+                  for j in range(focus_y - radius, focus_y + radius + 1)
+                  if (i, j) in self._chunks}
+
+        self._suspend_chunks([self._chunks[position] for position in self._active_chunks - wanted])
+        self._activate_chunks([self._chunks[position] for position in wanted - self._active_chunks])
+
+    def _suspend_chunks(self, chunks: [Chunk]):
+        """Suspends each chunk in 'chunks', removing their shapes & things from the physics space"""
+        if not chunks:
+            return
+
+        suspending = {chunk.get_position(): [] for chunk in chunks}
+
+        for thing in self._stepped_things:
+            if isinstance(thing, (Block, Player)):
+                continue
+
+            column, row = self.xy_to_grid(*thing.get_position())
+            position = column // self._chunk_size, row // self._chunk_size
+
+            if position in suspending:
+                suspending[position].append(thing)
+
+        removed = []
+
+        for chunk in chunks:
+            for _, _, block in chunk.blocks():
+                self._stepped_things.pop(block, None)
+
+                if not self._mesh_blocks:
+                    removed.append(block.get_shape())
+
+            removed.extend(chunk.get_shapes())
+            chunk.set_shapes([])
+
+            things = suspending[chunk.get_position()]
+            for thing in things:
+                self._stepped_things.pop(thing)
+
+                shape = thing.get_shape()
+                removed.extend((shape.body, shape))
+
+            chunk.suspend(self._palette, things)
+            self._active_chunks.discard(chunk.get_position())
+
+        if removed:
+            self._space.remove(*removed)
+
+    def _activate_chunks(self, chunks: [Chunk]):
+        """Activates each chunk in 'chunks', adding their shapes & things to the physics space"""
+        added = []
+
+        for chunk in chunks:
+            left, top = chunk.get_origin()
+
+            for column, row, block in chunk.activate(self._palette, self._block_factory):
+                self._create_block_shape(block, left + column, top + row, 1.)
+                self._register_stepped(block)
+
+                if not self._mesh_blocks:
+                    added.append(block.get_shape())
+
+            if chunk.is_compact():
+                # blocks that change over time are always materialised, so that they're stepped
+                steppable = {index for index in chunk.get_palette_indices()
+                             if self.get_sample_block(index).is_steppable()}
+
+                if steppable:
+                    for column, row, palette_index in list(chunk.cells()):
+                        if palette_index in steppable:
+                            self.get_block_at_grid(left + column, top + row)
+
+            for thing in chunk.take_suspended_things():
+                shape = thing.get_shape()
+                added.extend((shape.body, shape))
+                self._register_stepped(thing)
+
+            self._active_chunks.add(chunk.get_position())
+
+        if added:
+            self._space.add(*added)
+
+        if self._mesh_blocks:
+            for chunk in chunks:
+                self._rebuild_mesh(chunk)
 
     def add_block(self, block: Block, x: float, y: float, *args, **kwargs):
         """Adds a block to the game world at the grid cell that contains ('x', 'y')
@@ -323,20 +989,102 @@ class World:
         """
         return self.add_block_to_grid(block, *self.xy_to_grid(x, y), *args, **kwargs)
 
+    def get_block_at_grid(self, column: int, row: int):
+        """(Block) Returns the block in the cell at ('column', 'row'), or None if the cell is empty
+        or in a suspended chunk
+
+        With compact blocks, the block is materialised if it hasn't been already"""
+        if not self.is_cell_in_grid(column, row):
+            return None
+
+        size = self._chunk_size
+        chunk = self._chunks[column // size, row // size]
+        block = chunk.get_block(column % size, row % size)
+
+        if block is None and self._compact_blocks and chunk.is_active():
+            block = chunk.materialise(column % size, row % size, self._palette, self._block_factory)
+
+            if block is not None:
+                self._create_block_shape(block, column, row, 1.)
+                self._register_stepped(block)
+
+        return block
+
     def get_block(self, x, y):
-        """(Block) Returns a block on the point ('x', 'y'), or None if there is no block there
+        """(Block) Returns a block on the point ('x', 'y'), or None if there is no block there"""
+        return self.get_block_at_grid(*self.xy_to_grid(x, y))
+
+    def get_blocks_in_rect(self, left: float, top: float, right: float, bottom: float) -> [Block]:
+        """(list<Block>) Returns all blocks in cells that overlap the rectangle bounded by
+        ('left', 'top') & ('right', 'bottom')"""
+        columns, rows = self._grid_size
 
-        Note: It is technically possible for multiple blocks to overlap, in which case
-              this method will return one of those. This should never happen, though.
+        first_column, first_row = self.xy_to_grid(left, top)
+        last_column, last_row = self.xy_to_grid(right, bottom)
+
+        blocks = []
+        for column in range(max(first_column, 0), min(last_column + 1, columns)):
+            for row in range(max(first_row, 0), min(last_row + 1, rows)):
+                block = self.get_block_at_grid(column, row)
+                if block is not None:
+                    blocks.append(block)
+
+        return blocks
+
+    def get_things_in_rect(self, left: float, top: float, right: float, bottom: float,
+                           include_blocks: bool = True) -> Iterable[PhysicalThing]:
+        """Yields all things that overlap the rectangle bounded by ('left', 'top') & ('right', 'bottom'),
+        excluding boundary walls
+
+        Blocks are yielded first, followed by all other things
+
+        Parameters:
+            include_blocks (bool): If False, blocks are excluded
+
+        Yield:
+            PhysicalThing
         """
-        blocks = self._space.point_query((x, y), 0, pymunk.ShapeFilter(mask=self._thing_categories["block"]))
+        if include_blocks:
+            yield from self.get_blocks_in_rect(left, top, right, bottom)
 
-        if blocks:
-            return blocks[0].shape.object
+        # blocks are looked up from the grid, so they're excluded from the query
+        queries = self._space.bb_query(pymunk.BB(left, top, right, bottom), pymunk.ShapeFilter(
+            mask=pymunk.ShapeFilter.ALL_MASKS ^ (self._thing_categories["wall"] | self._thing_categories["block"])))
+
+        for shape in queries:
+            if shape.object is not None:
+                yield shape.object
 
     def remove_block(self, block: Block):
         """Removes a block from the game world"""
-        self.remove_thing(block)
+        self.remove_blocks_bulk([block])
+
+    def remove_blocks_bulk(self, blocks: Iterable[Block]):
+        """Removes many blocks from the game world at once
+
+        Equivalent to calling remove_block for each block, except that all shapes are
+        removed from the physics space (or mesher) in a single batch"""
+        chunks = set()
+        shapes = []
+
+        for block in blocks:
+            column, row = self.xy_to_grid(*block.get_position())
+
+            if self.get_block_at_grid(column, row) is block:
+                self._clear_cell(column, row)
+
+            self._stepped_things.pop(block, None)
+
+            if self._mesh_blocks:
+                chunks.add(self._get_chunk(column, row))
+            else:
+                shapes.append(block.get_shape())
+
+        for chunk in chunks:
+            self._rebuild_mesh(chunk)
+
+        if shapes:
+            self._space.remove(*shapes)
 
     def add_item(self, item: DroppedItem, x: float, y: float, size: Tuple[float, float] = (8, 8),
                  mass: float = 2, friction: float = 1.):
@@ -373,11 +1121,20 @@ class World:
         self.remove_thing(mob)
 
     def get_things(self, x: float, y: float) -> [PhysicalThing]:
-        """(list<PhysicalThing>) Returns all things on the point ('x', 'y')"""
+        """(list<PhysicalThing>) Returns all things on the point ('x', 'y')
+
+        The block on the point, if any, is always first"""
+        # blocks are looked up from the grid, so they're excluded from the query
         queries = self._space.point_query((x, y), 0, pymunk.ShapeFilter(
-            mask=pymunk.ShapeFilter.ALL_MASKS ^ self._thing_categories["wall"]))
+            mask=pymunk.ShapeFilter.ALL_MASKS ^ (self._thing_categories["wall"] | self._thing_categories["block"])))
 
-        return [q.shape.object for q in queries]
+        things = [q.shape.object for q in queries]
+
+        block = self.get_block(x, y)
+        if block is not None:
+            things.insert(0, block)
+
+        return things
 
     def get_thing(self, x: float, y: float) -> PhysicalThing:
         """(PhysicalThing) Returns a thing on the point ('x', 'y'), or None if there is no thing there